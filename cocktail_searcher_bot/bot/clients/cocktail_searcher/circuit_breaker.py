@@ -0,0 +1,93 @@
+import time
+from enum import Enum
+
+from bot.clients.cocktail_searcher import exceptions
+
+
+class EndpointFamily(str, Enum):
+    COCKTAILS = 'cocktails'
+    RECIPES = 'recipes'
+    TELEGRAM_USERS = 'telegram-users'
+    FAVORITES = 'favorites'
+
+    def __str__(self):
+        return self.value
+
+
+class CircuitState(str, Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __str__(self):
+        return self.value
+
+
+class CircuitBreaker:
+    """Предохранитель запросов к группе эндпоинтов внешнего API
+
+    После failure_threshold ошибок подряд предохранитель размыкается и отклоняет запросы без обращения к внешнему API.
+    По истечении recovery_timeout секунд предохранитель пропускает не более half_open_max_calls пробных запросов:
+    успешный пробный запрос замыкает предохранитель, неуспешный - снова размыкает.
+
+    Attributes:
+        failure_threshold: количество ошибок подряд, после которого предохранитель размыкается
+        recovery_timeout: время в секундах, по истечении которого разомкнутый предохранитель пропускает пробные запросы
+        half_open_max_calls: максимальное количество одновременных пробных запросов
+        state: состояние предохранителя
+        rejected: количество отклоненных запросов
+    """
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CircuitState.CLOSED
+        self.rejected = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_calls = 0
+
+    def before_request(self):
+        """Проверяет, может ли быть выполнен запрос
+
+        Raises:
+            CircuitOpenError: возбуждаемое исключение в случае разомкнутого предохранителя
+        """
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_timeout:
+                self.rejected += 1
+                raise exceptions.CircuitOpenError('The circuit breaker is open')
+            self.state = CircuitState.HALF_OPEN
+            self._trial_calls = 0
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._trial_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                raise exceptions.CircuitOpenError('The circuit breaker is half-open, trial requests limit reached')
+            self._trial_calls += 1
+
+    def record_success(self):
+        """Фиксирует успешное выполнение запроса"""
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+
+    def record_failure(self):
+        """Фиксирует ошибку выполнения запроса"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._open()
+            return
+
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """Освобождает пробный запрос, прерванный без результата"""
+        if self.state == CircuitState.HALF_OPEN and self._trial_calls:
+            self._trial_calls -= 1
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._failures = 0
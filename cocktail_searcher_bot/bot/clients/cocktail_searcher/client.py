@@ -1,11 +1,13 @@
 from enum import Enum
+from http import HTTPStatus
 from typing import Optional, Dict, Any, Union, List
 from urllib.parse import urljoin
 
-from httpx import AsyncClient
-from pydantic import parse_raw_as
+from httpx import AsyncClient, Limits, TransportError, HTTPStatusError
 
-from bot.clients.cocktail_searcher.decorators import request_exception_handler
+from bot.clients.cocktail_searcher.circuit_breaker import CircuitBreaker, EndpointFamily
+from bot.clients.cocktail_searcher.decoding import decode_response
+from bot.clients.cocktail_searcher.decorators import request_exception_handler, request_retry_handler
 from bot.clients.cocktail_searcher.models import (
     PagePagination,
     Cocktail,
@@ -13,7 +15,9 @@ from bot.clients.cocktail_searcher.models import (
     TelegramUser,
     TelegramUserFavorite,
 )
+from bot.clients.cocktail_searcher.retry import RetryPolicy, RetryBudget
 from config import settings
+from utils.singleflight import SingleFlight
 
 
 class HttpMethod(str, Enum):
@@ -28,7 +32,19 @@ class HttpMethod(str, Enum):
 
 
 class CocktailSearcherClient:
-    """Клиент Cocktail Searcher API"""
+    """Клиент Cocktail Searcher API
+
+    Attributes:
+        http_client: общий HTTP-клиент с пулом соединений, разделяемый всеми экземплярами клиента. Открывается при
+            запуске диспетчера и закрывается при его остановке
+        in_flight_requests: выполняющиеся GET-запросы. Одновременные одинаковые GET-запросы разделяют один HTTP-запрос,
+            количество объединенных запросов доступно в in_flight_requests.shared
+        retry_policy: политика повтора идемпотентных запросов, завершившихся ошибкой соединения или ошибкой сервера
+        circuit_breakers: предохранители запросов, сгруппированные по группам эндпоинтов
+        strict_decoding: валидировать ответы полностью. Иначе ответы, уже соответствующие моделям, декодируются без
+            валидации
+    """
+    http_client: Optional[AsyncClient] = None
 
     def __init__(self):
         self.base_url = settings.COCKTAIL_SEARCHER_URL
@@ -37,6 +53,25 @@ class CocktailSearcherClient:
         self.favorites_path = '/api/v1/favorites/'
         self.telegram_user_path = '/api/v1/telegram-users/'
         self.telegram_user_favorites_path = '/api/v1/telegram-users/{id}/favorites/'
+        self.in_flight_requests = SingleFlight()
+        self.retry_policy = RetryPolicy(
+            max_retries=settings.COCKTAIL_SEARCHER_MAX_RETRIES,
+            backoff_base=settings.COCKTAIL_SEARCHER_RETRY_BACKOFF_BASE,
+            backoff_max=settings.COCKTAIL_SEARCHER_RETRY_BACKOFF_MAX,
+            budget=RetryBudget(
+                ratio=settings.COCKTAIL_SEARCHER_RETRY_BUDGET_RATIO,
+                max_tokens=settings.COCKTAIL_SEARCHER_RETRY_BUDGET_MAX_TOKENS
+            )
+        )
+        self.circuit_breakers = {
+            endpoint: CircuitBreaker(
+                failure_threshold=settings.COCKTAIL_SEARCHER_CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=settings.COCKTAIL_SEARCHER_CIRCUIT_RECOVERY_TIMEOUT,
+                half_open_max_calls=settings.COCKTAIL_SEARCHER_CIRCUIT_HALF_OPEN_MAX_CALLS
+            )
+            for endpoint in EndpointFamily
+        }
+        self.strict_decoding = settings.COCKTAIL_SEARCHER_STRICT_DECODING
 
     async def get_cocktails(self,
                             search: Optional[str] = None,
@@ -58,9 +93,14 @@ class CocktailSearcherClient:
         """
         params = {'search': search, 'page': page, 'page_size': page_size}
 
-        response = await self._request(HttpMethod.GET, urljoin(self.base_url, self.cocktails_path), params)
+        response = await self._request(
+            HttpMethod.GET,
+            urljoin(self.base_url, self.cocktails_path),
+            params,
+            endpoint=EndpointFamily.COCKTAILS
+        )
 
-        return PagePagination[Cocktail].parse_raw(response)
+        return decode_response(PagePagination[Cocktail], response, self.strict_decoding)
 
     async def get_cocktail_recipe(self, cocktail_id: int) -> List[CookingStage]:
         """Получает рецепт приготовления коктейля
@@ -77,10 +117,11 @@ class CocktailSearcherClient:
         """
         response = await self._request(
             HttpMethod.GET,
-            urljoin(self.base_url, self.cocktail_recipe_path.format(id=cocktail_id))
+            urljoin(self.base_url, self.cocktail_recipe_path.format(id=cocktail_id)),
+            endpoint=EndpointFamily.RECIPES
         )
 
-        return parse_raw_as(List[CookingStage], response)
+        return decode_response(List[CookingStage], response, self.strict_decoding)
 
     async def get_telegram_users(self,
                                  chat_id: Optional[int] = None,
@@ -101,9 +142,14 @@ class CocktailSearcherClient:
         """
         params = {'chat_id': chat_id, 'page': page, 'page_size': page_size}
 
-        response = await self._request(HttpMethod.GET, urljoin(self.base_url, self.telegram_user_path), params)
+        response = await self._request(
+            HttpMethod.GET,
+            urljoin(self.base_url, self.telegram_user_path),
+            params,
+            endpoint=EndpointFamily.TELEGRAM_USERS
+        )
 
-        return PagePagination[TelegramUser].parse_raw(response)
+        return decode_response(PagePagination[TelegramUser], response, self.strict_decoding)
 
     async def create_telegram_user(self, chat_id: int) -> TelegramUser:
         """Создает пользователя Telegram
@@ -120,9 +166,14 @@ class CocktailSearcherClient:
         """
         data = {'chat_id': chat_id}
 
-        response = await self._request(HttpMethod.POST, urljoin(self.base_url, self.telegram_user_path), data=data)
+        response = await self._request(
+            HttpMethod.POST,
+            urljoin(self.base_url, self.telegram_user_path),
+            data=data,
+            endpoint=EndpointFamily.TELEGRAM_USERS
+        )
 
-        return TelegramUser.parse_raw(response)
+        return decode_response(TelegramUser, response, self.strict_decoding)
 
     async def get_favorite_cocktails(self,
                                      telegram_user_id: int,
@@ -148,10 +199,11 @@ class CocktailSearcherClient:
         response = await self._request(
             HttpMethod.GET,
             urljoin(self.base_url, self.telegram_user_favorites_path.format(id=telegram_user_id)),
-            params
+            params,
+            endpoint=EndpointFamily.FAVORITES
         )
 
-        return PagePagination[TelegramUserFavorite].parse_raw(response)
+        return decode_response(PagePagination[TelegramUserFavorite], response, self.strict_decoding)
 
     async def add_cocktail_to_favorites(self, telegram_user_id: int, cocktail_id: int):
         """Добавляет коктейль в избранное
@@ -167,7 +219,12 @@ class CocktailSearcherClient:
         """
         data = {'telegram_user': telegram_user_id, 'cocktail': cocktail_id}
 
-        await self._request(HttpMethod.POST, urljoin(self.base_url, self.favorites_path), data=data)
+        await self._request(
+            HttpMethod.POST,
+            urljoin(self.base_url, self.favorites_path),
+            data=data,
+            endpoint=EndpointFamily.FAVORITES
+        )
 
     async def remove_cocktail_from_favorites(self, favorite_id: int):
         """Удаляет избранный коктейль
@@ -179,19 +236,66 @@ class CocktailSearcherClient:
             TransportError: возбуждаемое исключение в случае ошибки соединения
             NotFoundError: возбуждаемое исключение в случае попытки удаления несуществующей записи избранного
         """
-        await self._request(HttpMethod.DELETE, urljoin(self.base_url, f'{self.favorites_path}{favorite_id}/'))
+        await self._request(
+            HttpMethod.DELETE,
+            urljoin(self.base_url, f'{self.favorites_path}{favorite_id}/'),
+            endpoint=EndpointFamily.FAVORITES
+        )
+
+    @classmethod
+    async def open_http_client(cls):
+        """Открывает общий HTTP-клиент с пулом соединений"""
+        if cls.http_client is not None:
+            return
+
+        limits = Limits(
+            max_connections=settings.COCKTAIL_SEARCHER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.COCKTAIL_SEARCHER_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.COCKTAIL_SEARCHER_KEEPALIVE_EXPIRY,
+        )
+        cls.http_client = AsyncClient(limits=limits)
+
+    @classmethod
+    async def close_http_client(cls):
+        """Закрывает общий HTTP-клиент и все соединения пула"""
+        if cls.http_client is None:
+            return
+
+        http_client, cls.http_client = cls.http_client, None
+        await http_client.aclose()
 
-    @staticmethod
     @request_exception_handler
-    async def _request(method: HttpMethod,
+    async def _request(self,
+                       method: HttpMethod,
                        url: str,
                        params: Optional[Dict[str, Any]] = None,
-                       data: Union[Dict[str, Any], str, None] = None) -> str:
+                       data: Union[Dict[str, Any], str, None] = None,
+                       *,
+                       endpoint: EndpointFamily) -> bytes:
+        params = {key: value for key, value in params.items() if value is not None} if params else None
+
+        if method == HttpMethod.GET:
+            request_key = (url, tuple(sorted(params.items())) if params else ())
+            return await self.in_flight_requests.run(
+                request_key,
+                lambda: self._send_request(method, url, params, endpoint=endpoint)
+            )
+
+        return await self._send_request(method, url, params, data, endpoint=endpoint)
+
+    @request_retry_handler
+    async def _send_request(self,
+                            method: HttpMethod,
+                            url: str,
+                            params: Optional[Dict[str, Any]] = None,
+                            data: Union[Dict[str, Any], str, None] = None,
+                            *,
+                            endpoint: EndpointFamily) -> bytes:
         request_arguments = {
             'method': method,
             'url': url,
             'headers': {'Authorization': f'Token {settings.COCKTAIL_SEARCHER_API_TOKEN}'},
-            'params': {key: value for key, value in params.items() if value is not None} if params else None
+            'params': params
         }
 
         if isinstance(data, dict):
@@ -199,8 +303,28 @@ class CocktailSearcherClient:
         else:
             request_arguments['data'] = data
 
-        async with AsyncClient() as client:
-            response = await client.request(**request_arguments)
+        circuit_breaker = self.circuit_breakers[endpoint]
+        circuit_breaker.before_request()
+        try:
+            if self.http_client is None:
+                async with AsyncClient() as client:
+                    response = await client.request(**request_arguments)
+            else:
+                response = await self.http_client.request(**request_arguments)
             response.raise_for_status()
-
-            return response.text
+        except TransportError:
+            circuit_breaker.record_failure()
+            raise
+        except HTTPStatusError as ex:
+            if ex.response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+            raise
+        except BaseException:
+            circuit_breaker.release()
+            raise
+
+        circuit_breaker.record_success()
+
+        return response.content
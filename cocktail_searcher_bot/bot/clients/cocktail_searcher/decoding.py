@@ -0,0 +1,86 @@
+from functools import lru_cache
+from inspect import isclass
+from typing import Any, Callable, Type, TypeVar, Union, get_args, get_origin
+
+import orjson
+from pydantic import AnyUrl, BaseModel, parse_obj_as
+from pydantic.fields import ModelField
+
+DecodedType = TypeVar('DecodedType')
+
+PRIMITIVE_TYPES = (int, float, str, bool)
+
+
+def decode_response(decoded_type: Type[DecodedType], content: Union[bytes, str], strict: bool = False) -> DecodedType:
+    """
+    Декодирует ответ Cocktail Searcher API
+
+    Ответ разбирается orjson. В быстром режиме объекты моделей создаются без валидации: проверяется только наличие
+    полей и типы значений, которые уже приведены к нужным типам в JSON. Поля-ссылки валидируются валидатором поля,
+    поэтому имеют те же типы, что и в строгом режиме. Если ответ не соответствует моделям, например содержит значения,
+    требующие приведения типов, он валидируется полностью, как в строгом режиме.
+
+    Args:
+        decoded_type: тип декодируемого ответа
+        content: тело ответа
+        strict: валидировать ответ полностью
+
+    Raises:
+        ValidationError: возбуждаемое исключение в случае несоответствия ответа типу
+    """
+    data = orjson.loads(content)
+    if not strict:
+        try:
+            return _get_builder(decoded_type)(data)
+        except (KeyError, TypeError):
+            pass
+
+    return parse_obj_as(decoded_type, data)
+
+
+@lru_cache(maxsize=None)
+def _get_builder(decoded_type: Any) -> Callable[[Any], Any]:
+    if get_origin(decoded_type) is list:
+        item_builder = _get_builder(get_args(decoded_type)[0])
+        return lambda items: [item_builder(item) for item in _check_type(items, list)]
+
+    if isclass(decoded_type) and issubclass(decoded_type, BaseModel):
+        return _get_model_builder(decoded_type)
+
+    if decoded_type in PRIMITIVE_TYPES:
+        return lambda value: _check_type(value, decoded_type)
+
+    raise TypeError(f'Fast decoding of {decoded_type} is not supported')
+
+
+def _get_model_builder(model: Type[BaseModel]) -> Callable[[Any], BaseModel]:
+    field_builders = [
+        (name, field.alias, _get_field_builder(field)) for name, field in model.__fields__.items()
+    ]
+    fields_set = frozenset(model.__fields__)
+
+    def build(data: Any) -> BaseModel:
+        values = {name: build_field(_check_type(data, dict)[alias]) for name, alias, build_field in field_builders}
+        return model.construct(set(fields_set), **values)
+
+    return build
+
+
+def _get_field_builder(field: ModelField) -> Callable[[Any], Any]:
+    if not (isclass(field.outer_type_) and issubclass(field.outer_type_, AnyUrl)):
+        return _get_builder(field.outer_type_)
+
+    def build(value: Any) -> Any:
+        url, errors = field.validate(_check_type(value, str), {}, loc=field.alias)
+        if errors:
+            raise TypeError(f'Invalid URL {value!r}')
+        return url
+
+    return build
+
+
+def _check_type(value: Any, expected_type: type) -> Any:
+    if type(value) is not expected_type:
+        raise TypeError(f'Expected {expected_type.__name__}, got {type(value).__name__}')
+
+    return value
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from http import HTTPStatus
 
@@ -19,8 +20,34 @@ def request_exception_handler(func):
                 raise exceptions.BadRequestError(ex, errors=json.loads(ex.response.text))
             if ex.response.status_code == HTTPStatus.NOT_FOUND:
                 raise exceptions.NotFoundError(ex)
-            raise exceptions.ResponseError(ex)
+            raise exceptions.ResponseError(ex, status_code=ex.response.status_code)
         except HTTPError as ex:
             raise exceptions.CocktailSearcherClientError(ex)
 
     return wrapper
+
+
+def request_retry_handler(func):
+    """Обработчик повторов HTTP-запросов согласно политике повторов клиента"""
+
+    async def wrapper(client, method, *args, **kwargs):
+        retry_policy = client.retry_policy
+        if retry_policy.budget is not None:
+            retry_policy.budget.deposit()
+
+        attempt = 0
+        while True:
+            try:
+                return await func(client, method, *args, **kwargs)
+            except (TransportError, HTTPStatusError) as ex:
+                reason = retry_policy.get_retry_reason(method, ex)
+                if reason is None or attempt >= retry_policy.max_retries:
+                    raise
+                if retry_policy.budget is not None and not retry_policy.budget.withdraw():
+                    raise
+
+            attempt += 1
+            retry_policy.retries[reason] += 1
+            await asyncio.sleep(retry_policy.get_backoff(attempt))
+
+    return wrapper
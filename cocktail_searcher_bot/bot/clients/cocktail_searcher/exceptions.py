@@ -1,3 +1,4 @@
+from http import HTTPStatus
 from typing import Any, Optional
 
 
@@ -9,12 +10,27 @@ class TransportError(CocktailSearcherClientError):
     """Базовый класс для всех исключений, возникающих на уровне Transport API"""
 
 
+class CircuitOpenError(TransportError):
+    """Запрос отклонен разомкнутым предохранителем без обращения к внешнему API"""
+
+
 class ResponseError(CocktailSearcherClientError):
-    """Базовая ошибка HTTP статуса"""
+    """Базовая ошибка HTTP статуса
+
+    Attributes:
+        status_code: код HTTP статуса ответа, если известен
+    """
+    status_code: Optional[int] = None
+
+    def __init__(self, *args: Any, status_code: Optional[int] = None):
+        if status_code is not None:
+            self.status_code = status_code
+        super().__init__(*args)
 
 
 class BadRequestError(ResponseError):
     """Неправильный, некорректный запрос"""
+    status_code = HTTPStatus.BAD_REQUEST
 
     def __init__(self, message: Any, errors: Optional[dict]):
         self.errors = errors
@@ -23,3 +39,4 @@ class BadRequestError(ResponseError):
 
 class NotFoundError(ResponseError):
     """Не найдено"""
+    status_code = HTTPStatus.NOT_FOUND
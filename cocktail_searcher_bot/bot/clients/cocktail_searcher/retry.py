@@ -0,0 +1,96 @@
+import random
+from collections import Counter
+from http import HTTPStatus
+from typing import Optional
+
+from httpx import TransportError, HTTPStatusError
+
+
+class RetryBudget:
+    """Бюджет повторных запросов
+
+    Каждый запрос пополняет бюджет на ratio токенов, каждый повтор расходует один токен. Таким образом повторы
+    составляют не более доли ratio от общего числа запросов и не умножают нагрузку на внешний API во время сбоя.
+
+    Attributes:
+        ratio: количество токенов, которым запрос пополняет бюджет
+        max_tokens: максимальное количество токенов бюджета
+        tokens: текущее количество токенов бюджета
+        exhausted: количество повторов, не выполненных из-за исчерпания бюджета
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.exhausted = 0
+
+    def deposit(self):
+        """Пополняет бюджет за выполненный запрос"""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Расходует токен бюджета на повтор запроса
+
+        Returns:
+            Признак того, что повтор разрешен
+        """
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+class RetryPolicy:
+    """Политика повтора идемпотентных HTTP-запросов с экспоненциальной задержкой и полным джиттером
+
+    Attributes:
+        max_retries: максимальное количество повторов запроса
+        backoff_base: базовая задержка перед повтором в секундах
+        backoff_max: максимальная задержка перед повтором в секундах
+        budget: бюджет повторов. Если не указан, количество повторов ограничено только max_retries
+        retries: количество выполненных повторов, сгруппированное по причинам
+    """
+    idempotent_methods = frozenset({'GET', 'DELETE'})
+
+    def __init__(self,
+                 max_retries: int = 0,
+                 backoff_base: float = 0.0,
+                 backoff_max: float = 0.0,
+                 budget: Optional[RetryBudget] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.budget = budget
+        self.retries: Counter = Counter()
+
+    def get_retry_reason(self, method: str, exception: Exception) -> Optional[str]:
+        """Получает причину повтора запроса
+
+        Args:
+            method: HTTP-метод запроса
+            exception: исключение, возбужденное при выполнении запроса
+
+        Returns:
+            Причина повтора или None, если запрос не подлежит повтору
+        """
+        if str(method) not in self.idempotent_methods:
+            return None
+        if isinstance(exception, TransportError):
+            return type(exception).__name__
+        if isinstance(exception, HTTPStatusError):
+            status_code = exception.response.status_code
+            if status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+                return f'HTTP {status_code}'
+
+        return None
+
+    def get_backoff(self, attempt: int) -> float:
+        """Получает задержку перед повтором
+
+        Args:
+            attempt: номер повтора, начиная с 1
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
@@ -4,6 +4,7 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 
 from bot.helplers import clear_previous_paginated_message_markup
+from config import settings
 
 router = Router()
 
@@ -12,10 +13,11 @@ router = Router()
 async def start_command(message: Message, state: FSMContext):
     message_text = "Привет! Я бот Cocktail Searcher 🤖\n\n" \
                    "Моя задача - помочь вам найти любимый коктейль 🍹"
-    reply_markup = InlineKeyboardMarkup(
-        inline_keyboard=[[InlineKeyboardButton(text='Поиск', callback_data='search')],
-                         [InlineKeyboardButton(text='Избранное', callback_data='favorites')]]
-    )
+    inline_keyboard = [[InlineKeyboardButton(text='Поиск', callback_data='search')],
+                       [InlineKeyboardButton(text='Избранное', callback_data='favorites')]]
+    if settings.COCKTAIL_CATALOG_ENABLED:
+        inline_keyboard.insert(1, [InlineKeyboardButton(text='Что приготовить?', callback_data='ingredients_search')])
+    reply_markup = InlineKeyboardMarkup(inline_keyboard=inline_keyboard)
     await clear_previous_paginated_message_markup(state)
     await state.clear()
     await message.answer(message_text, reply_markup=reply_markup)
@@ -5,12 +5,16 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery
 
 from bot.services.cocktail_searcher import exceptions as css_exceptions
-from bot.services.cocktail_searcher.service import CocktailSearcherService, RecipeCallback, RemoveFavorite
+from bot.services.cocktail_searcher.service import (
+    cocktail_searcher_service,
+    RecipeCallback,
+    SimilarCallback,
+    RemoveFavorite,
+)
 from bot.states import FavoriteStates
 from utils.aiogram.types import PaginationCallback
 
 router = Router()
-cocktail_searcher_service = CocktailSearcherService()
 
 
 @router.callback_query(Text('favorites'))
@@ -55,7 +59,22 @@ async def recipe_button_handler(callback: CallbackQuery, callback_data: RecipeCa
     await state.set_state(FavoriteStates.RECIPE_COCKTAIL_DISPLAY_STATE)
 
 
+@router.callback_query(SimilarCallback.filter(), FavoriteStates.COCKTAIL_DISPLAY_STATE)
+async def similar_cocktails_button_handler(callback: CallbackQuery, callback_data: SimilarCallback, state: FSMContext):
+    try:
+        answer = cocktail_searcher_service.get_similar_cocktails_message(callback_data.cocktail_id)
+    except css_exceptions.CocktailNotFoundError:
+        return await callback.answer('Похожих коктейлей не нашлось', show_alert=True)
+    except css_exceptions.CatalogUnavailableError:
+        return await callback.answer('Похожие коктейли пока недоступны. Попробуйте позже', show_alert=True)
+
+    await callback.message.edit_text(answer.text, reply_markup=answer.reply_markup, parse_mode=answer.parse_mode)
+    await callback.answer()
+    await state.set_state(FavoriteStates.SIMILAR_COCKTAILS_DISPLAY_STATE)
+
+
 @router.callback_query(F.data == 'back', FavoriteStates.RECIPE_COCKTAIL_DISPLAY_STATE)
+@router.callback_query(F.data == 'back', FavoriteStates.SIMILAR_COCKTAILS_DISPLAY_STATE)
 async def back_to_cocktail_button_handler(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
     telegram_user_id = data['telegram_user_id']
@@ -72,12 +91,12 @@ async def back_to_cocktail_button_handler(callback: CallbackQuery, state: FSMCon
 async def remove_from_favorites_button_handler(callback: CallbackQuery,
                                                callback_data: RemoveFavorite,
                                                state: FSMContext):
-    await cocktail_searcher_service.remove_cocktail_from_favorites(callback_data.favorite_id)
-
     data = await state.get_data()
     telegram_user_id = data['telegram_user_id']
     page = data['page']
 
+    await cocktail_searcher_service.remove_cocktail_from_favorites(callback_data.favorite_id, telegram_user_id)
+
     try:
         answer = await cocktail_searcher_service.get_favorite_cocktail_message(telegram_user_id, page - 1 or 1)
     except css_exceptions.CocktailNotFoundError:
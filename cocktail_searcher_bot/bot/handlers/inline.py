@@ -0,0 +1,23 @@
+from aiogram.dispatcher.router import Router
+from aiogram.types import InlineQuery
+
+from bot.services.cocktail_searcher.service import cocktail_searcher_service
+from config import settings
+from utils.debouncer import Debouncer
+
+router = Router()
+
+inline_query_debouncer = Debouncer(settings.COCKTAIL_INLINE_DEBOUNCE_DELAY)
+
+
+@router.inline_query()
+async def inline_search_handler(inline_query: InlineQuery):
+    if not await inline_query_debouncer.wait(inline_query.from_user.id):
+        return
+
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    answer = cocktail_searcher_service.get_inline_search_results(inline_query.query, offset)
+
+    await inline_query.answer(
+        answer.results, cache_time=settings.COCKTAIL_INLINE_CACHE_TIME, next_offset=answer.next_offset
+    )
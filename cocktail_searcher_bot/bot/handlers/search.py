@@ -4,13 +4,19 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, CallbackQuery
 
 from bot.helplers import clear_previous_paginated_message_markup
+from bot.services.catalog.text import split_ingredients
 from bot.services.cocktail_searcher import exceptions as cocktail_searcher_service_exceptions
-from bot.services.cocktail_searcher.service import CocktailSearcherService, RecipeCallback, AddFavoriteCallback
+from bot.services.cocktail_searcher.dtos import TelegramMessage
+from bot.services.cocktail_searcher.service import (
+    cocktail_searcher_service,
+    RecipeCallback,
+    SimilarCallback,
+    AddFavoriteCallback,
+)
 from bot.states import SearchStates
 from utils.aiogram.types import PaginationCallback
 
 router = Router()
-cocktail_searcher_service = CocktailSearcherService()
 
 
 @router.callback_query(F.data == 'search')
@@ -27,19 +33,58 @@ async def process_entered_search_query_handler(message: Message, state: FSMConte
         await clear_previous_paginated_message_markup(state)
         await state.set_state(SearchStates.QUERY_INPUT_STATE)
 
+    # В состоянии хранится введенный текст: запрос нормализуется сервисом, и синонимы не применяются повторно
     search_query = message.text
     page = 1
 
     try:
-        answer = await cocktail_searcher_service.get_cocktail_message(search_query, page)
+        answer = await cocktail_searcher_service.get_cocktail_message(search_query, page, message.chat.id)
     except cocktail_searcher_service_exceptions.CocktailNotFoundError:
         return await message.answer('К сожалению, мне не удалось найти такие коктейли. Попробуйте изменить ваш запрос')
 
     message = await message.answer(answer.text, reply_markup=answer.reply_markup, parse_mode=answer.parse_mode)
-    await state.update_data(search_query=search_query, page=page, paginated_message_id=message.message_id)
+    await state.update_data(
+        search_query=search_query, ingredients=None, page=page, paginated_message_id=message.message_id
+    )
     await state.set_state(SearchStates.COCKTAIL_DISPLAY_STATE)
 
 
+@router.callback_query(F.data == 'ingredients_search')
+async def ingredients_search_button_handler(callback: CallbackQuery, state: FSMContext):
+    await callback.message.edit_text('Перечислите через запятую ингредиенты, которые у вас есть')
+    await state.set_state(SearchStates.INGREDIENTS_INPUT_STATE)
+
+
+@router.message(SearchStates.INGREDIENTS_INPUT_STATE)
+async def process_entered_ingredients_handler(message: Message, state: FSMContext):
+    ingredients = split_ingredients(message.text or '')
+    if not ingredients:
+        return await message.answer('Перечислите через запятую ингредиенты, которые у вас есть')
+    page = 1
+
+    try:
+        answer = await cocktail_searcher_service.get_ingredient_cocktail_message(ingredients, page, message.chat.id)
+    except cocktail_searcher_service_exceptions.CocktailNotFoundError:
+        return await message.answer('К сожалению, из этих ингредиентов ничего не приготовить. '
+                                    'Попробуйте добавить другие ингредиенты')
+    except cocktail_searcher_service_exceptions.CatalogUnavailableError:
+        return await message.answer('Поиск по ингредиентам пока недоступен. Попробуйте позже')
+
+    message = await message.answer(answer.text, reply_markup=answer.reply_markup, parse_mode=answer.parse_mode)
+    await state.update_data(
+        search_query=None, ingredients=ingredients, page=page, paginated_message_id=message.message_id
+    )
+    await state.set_state(SearchStates.COCKTAIL_DISPLAY_STATE)
+
+
+async def get_search_result_message(data: dict, page: int, chat_id: int) -> TelegramMessage:
+    """Получает сообщение с коктейлем страницы результатов последнего поиска, сохраненного в данных FSM"""
+    if ingredients := data.get('ingredients'):
+        return await cocktail_searcher_service.get_ingredient_cocktail_message(ingredients, page, chat_id)
+
+    return await cocktail_searcher_service.get_cocktail_message(data['search_query'], page, chat_id)
+
+
 @router.callback_query(PaginationCallback.filter(), SearchStates.COCKTAIL_DISPLAY_STATE)
 async def cocktail_pagination_callback_handler(callback: CallbackQuery,
                                                callback_data: PaginationCallback,
@@ -47,10 +92,9 @@ async def cocktail_pagination_callback_handler(callback: CallbackQuery,
     page = callback_data.page
 
     data = await state.get_data()
-    search_query = data['search_query']
     await state.update_data(page=page)
 
-    answer = await cocktail_searcher_service.get_cocktail_message(search=search_query, page=page)
+    answer = await get_search_result_message(data, page, callback.message.chat.id)
 
     await callback.message.edit_text(answer.text, reply_markup=answer.reply_markup, parse_mode=answer.parse_mode)
     await callback.answer()
@@ -68,13 +112,27 @@ async def recipe_button_handler(callback: CallbackQuery, callback_data: RecipeCa
     await state.set_state(SearchStates.RECIPE_DISPLAY_STATE)
 
 
+@router.callback_query(SimilarCallback.filter(), SearchStates.COCKTAIL_DISPLAY_STATE)
+async def similar_cocktails_button_handler(callback: CallbackQuery, callback_data: SimilarCallback, state: FSMContext):
+    try:
+        answer = cocktail_searcher_service.get_similar_cocktails_message(callback_data.cocktail_id)
+    except cocktail_searcher_service_exceptions.CocktailNotFoundError:
+        return await callback.answer('Похожих коктейлей не нашлось', show_alert=True)
+    except cocktail_searcher_service_exceptions.CatalogUnavailableError:
+        return await callback.answer('Похожие коктейли пока недоступны. Попробуйте позже', show_alert=True)
+
+    await callback.message.edit_text(answer.text, reply_markup=answer.reply_markup, parse_mode=answer.parse_mode)
+    await callback.answer()
+    await state.set_state(SearchStates.SIMILAR_DISPLAY_STATE)
+
+
 @router.callback_query(F.data == 'back', SearchStates.RECIPE_DISPLAY_STATE)
+@router.callback_query(F.data == 'back', SearchStates.SIMILAR_DISPLAY_STATE)
 async def back_to_cocktail_button_handler(callback: CallbackQuery, state: FSMContext):
     data = await state.get_data()
-    search_query = data['search_query']
     page = data['page']
 
-    answer = await cocktail_searcher_service.get_cocktail_message(search_query, page)
+    answer = await get_search_result_message(data, page, callback.message.chat.id)
 
     await callback.message.edit_text(answer.text, reply_markup=answer.reply_markup, parse_mode=answer.parse_mode)
     await callback.answer()
@@ -82,19 +140,8 @@ async def back_to_cocktail_button_handler(callback: CallbackQuery, state: FSMCon
 
 
 @router.callback_query(AddFavoriteCallback.filter(), SearchStates.COCKTAIL_DISPLAY_STATE)
-async def add_to_favorites_button_handler(callback: CallbackQuery,
-                                          callback_data: AddFavoriteCallback,
-                                          state: FSMContext):
-    data = await state.get_data()
-    telegram_user_id = data.get('telegram_user_id')
-
-    if not telegram_user_id:
-        telegram_user_chat_id = callback.from_user.id
-        try:
-            telegram_user_id = await cocktail_searcher_service.get_telegram_user_id(telegram_user_chat_id)
-        except cocktail_searcher_service_exceptions.TelegramUserNotFoundError:
-            telegram_user_id = await cocktail_searcher_service.create_telegram_user(telegram_user_chat_id)
-        await state.update_data(telegram_user_id=telegram_user_id)
+async def add_to_favorites_button_handler(callback: CallbackQuery, callback_data: AddFavoriteCallback):
+    telegram_user_id = await cocktail_searcher_service.get_or_create_telegram_user_id(callback.from_user.id)
 
     try:
         await cocktail_searcher_service.add_cocktail_to_favorites(telegram_user_id, callback_data.cocktail_id)
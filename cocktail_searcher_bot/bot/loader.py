@@ -1,16 +1,59 @@
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.base import BaseStorage
 
+from bot.clients.cocktail_searcher.client import CocktailSearcherClient
 from bot.handlers.commands import router as commands_router
 from bot.handlers.exceptions import router as exception_router
 from bot.handlers.favorites import router as favorites_router
+from bot.handlers.inline import router as inline_router
 from bot.handlers.search import router as search_router
+from bot.services.cocktail_searcher.service import cocktail_searcher_service
 from config import settings
+from utils.aiogram.context import BufferedFSMContextMiddleware
+from utils.aiogram.storage import BoundedMemoryStorage, KeyLockEventIsolation, KeyValueStorage
+from utils.resp import RespClient
+
+
+def create_fsm_storage() -> BaseStorage:
+    """
+    Создает хранилище FSM, выбранное настройкой FSM_STORAGE
+
+    Хранилище redis разделяется всеми репликами бота и сохраняет состояние пользователей при перезапуске. Хранилище
+    memory ограничено по количеству записей и их объему, записи неактивных пользователей удаляются.
+    """
+    if settings.FSM_STORAGE == 'redis':
+        if not settings.FSM_REDIS_URL:
+            raise ValueError('FSM_REDIS_URL is required for the redis FSM storage')
+        return KeyValueStorage(
+            RespClient.from_url(settings.FSM_REDIS_URL, max_connections=settings.FSM_REDIS_MAX_CONNECTIONS),
+            prefix=settings.FSM_REDIS_KEY_PREFIX,
+            state_ttl=settings.FSM_STATE_TTL
+        )
+
+    return BoundedMemoryStorage(
+        maxsize=settings.FSM_MEMORY_MAXSIZE, max_bytes=settings.FSM_MEMORY_MAX_BYTES, state_ttl=settings.FSM_STATE_TTL
+    )
+
 
 bot = Bot(token=settings.TELEGRAM_API_TOKEN)
 
-dispatcher = Dispatcher(storage=MemoryStorage())
+fsm_storage = create_fsm_storage()
+# Встроенное middleware FSM заменяется буферизующим, которое читает и записывает состояние один раз за событие.
+# Буферизованное состояние записывается целиком, поэтому события одного пользователя обрабатываются последовательно.
+# Хранилище закрывается при остановке обработчиком, который Dispatcher регистрирует сам
+dispatcher = Dispatcher(storage=fsm_storage, disable_fsm=True)
+dispatcher.fsm = BufferedFSMContextMiddleware(
+    storage=fsm_storage, events_isolation=KeyLockEventIsolation(), strategy=dispatcher.fsm.strategy
+)
+dispatcher.update.outer_middleware(dispatcher.fsm)
 dispatcher.include_router(commands_router)
 dispatcher.include_router(search_router)
 dispatcher.include_router(favorites_router)
+if settings.COCKTAIL_CATALOG_ENABLED:
+    # Inline-поиск выполняется только по локальному каталогу
+    dispatcher.include_router(inline_router)
 dispatcher.include_router(exception_router)
+dispatcher.startup.register(CocktailSearcherClient.open_http_client)
+dispatcher.startup.register(cocktail_searcher_service.startup)
+dispatcher.shutdown.register(cocktail_searcher_service.shutdown)
+dispatcher.shutdown.register(CocktailSearcherClient.close_http_client)
@@ -0,0 +1,2 @@
+class CatalogSnapshotError(Exception):
+    """Снимок каталога коктейлей поврежден или имеет неподдерживаемый формат"""
@@ -0,0 +1,219 @@
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
+from typing import AbstractSet, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+from bot.clients.cocktail_searcher.models import Cocktail
+from bot.services.catalog.ingredients import IngredientIndex
+from bot.services.catalog.records import CocktailRecord
+from bot.services.catalog.similarity import SimilarityIndex
+from bot.services.catalog.text import tokenize, trigrams
+
+NAME_WEIGHT = 3.0
+INGREDIENT_WEIGHT = 2.0
+CATEGORY_WEIGHT = 1.0
+
+EXACT_MATCH_QUALITY = 1.0
+PREFIX_MATCH_QUALITY = 0.7
+FUZZY_MATCH_QUALITY = 0.5
+
+SEARCH_CACHE_MAXSIZE = 1024
+
+
+class CatalogIndex:
+    """Поисковый индекс каталога коктейлей в памяти процесса
+
+    Инвертированный индекс строится по основам слов названия коктейля, названий его категорий и ингредиентов.
+    Каждое слово запроса должно совпасть с термином индекса полностью или как префикс, а при отсутствии таких
+    совпадений - нечетко, по сходству триграмм. Индекс не изменяется после построения, поэтому упорядоченные
+    результаты последних search_cache_maxsize запросов кэшируются в индексе и заменяются вместе с ним.
+
+    Коктейли каталога хранятся компактными записями, модели коктейлей создаются по записям только для отображения.
+
+    Attributes:
+        records: записи коктейлей каталога в порядке, возвращаемом внешним API
+        fuzzy_threshold: минимальное сходство триграмм (коэффициент Сёренсена) для нечеткого совпадения
+        postings: веса совпадения термина с коктейлями, сгруппированные по терминам и позициям коктейлей в каталоге.
+            Если не указаны, строятся по коктейлям каталога
+        ingredients: индекс коктейлей каталога по ингредиентам
+        similar: индекс похожих коктейлей, хранящий по similar_top_k похожих коктейлей. Ближайшие соседи
+            similar_neighbours, если указаны, не вычисляются повторно
+        search_cache_maxsize: максимальное количество запросов, результаты которых кэшируются
+    """
+
+    def __init__(self,
+                 records: Sequence[CocktailRecord],
+                 fuzzy_threshold: float = 0.5,
+                 postings: Optional[Dict[str, Dict[int, float]]] = None,
+                 similar_top_k: int = 5,
+                 similar_neighbours: Optional[array] = None,
+                 search_cache_maxsize: int = SEARCH_CACHE_MAXSIZE):
+        self.records = list(records)
+        self.fuzzy_threshold = fuzzy_threshold
+        self.search_cache_maxsize = search_cache_maxsize
+        if postings is None:
+            postings = defaultdict(dict)
+            for position, record in enumerate(self.records):
+                self._index_record(postings, position, record)
+        self.postings = dict(postings)
+        self.ingredients = IngredientIndex(self.records)
+        self.similar = SimilarityIndex(self.records, similar_top_k, similar_neighbours)
+
+        self._all_records = tuple(self.records)
+        self._search_results: OrderedDict[Tuple[str, ...], Tuple[CocktailRecord, ...]] = OrderedDict()
+        self._terms = sorted(self.postings)
+        self._trigram_terms: Dict[str, Set[str]] = defaultdict(set)
+        self._term_trigram_counts: Dict[str, int] = {}
+        for term in self._terms:
+            term_trigrams = trigrams(term)
+            self._term_trigram_counts[term] = len(term_trigrams)
+            for trigram in term_trigrams:
+                self._trigram_terms[trigram].add(term)
+
+    @classmethod
+    def from_cocktails(cls, cocktails: Sequence[Cocktail], **kwargs) -> 'CatalogIndex':
+        """Строит индекс по моделям коктейлей
+
+        Args:
+            cocktails: коктейли каталога
+            **kwargs: параметры индекса
+        """
+        return cls([CocktailRecord.from_cocktail(cocktail) for cocktail in cocktails], **kwargs)
+
+    def update(self, records: Sequence[CocktailRecord], changed_ids: AbstractSet[int]) -> 'CatalogIndex':
+        """Строит индекс обновленного каталога, переиспользуя данные неизмененных коктейлей
+
+        Веса терминов неизмененных коктейлей переносятся из текущего индекса, термины добавленных и измененных
+        коктейлей индексируются заново. Похожие коктейли переносятся, если порядок коктейлей каталога и признаки
+        сходства измененных коктейлей не изменились, например при изменении только названий и изображений. Иначе они
+        вычисляются заново, так как веса TF-IDF и нормы векторов признаков зависят от всего каталога.
+
+        Args:
+            records: записи коктейлей обновленного каталога
+            changed_ids: идентификаторы добавленных и измененных коктейлей
+
+        Returns:
+            Новый индекс каталога с параметрами текущего индекса
+        """
+        records = list(records)
+        previous_positions = {record.id: position for position, record in enumerate(self.records)}
+        moved_positions = {}
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        for position, record in enumerate(records):
+            previous_position = previous_positions.get(record.id)
+            if previous_position is None or record.id in changed_ids:
+                self._index_record(postings, position, record)
+            else:
+                moved_positions[previous_position] = position
+        for term, term_postings in self.postings.items():
+            for previous_position, weight in term_postings.items():
+                position = moved_positions.get(previous_position)
+                if position is not None:
+                    postings[term][position] = weight
+
+        similar_neighbours = None
+        if (
+            len(records) == len(self.records)
+            and all(record.id == previous_record.id for record, previous_record in zip(records, self.records))
+            and all(
+                SimilarityIndex.get_features(record) == SimilarityIndex.get_features(self.records[position])
+                for position, record in enumerate(records) if record.id in changed_ids
+            )
+        ):
+            similar_neighbours = self.similar.neighbours
+
+        return CatalogIndex(
+            records,
+            fuzzy_threshold=self.fuzzy_threshold,
+            postings=postings,
+            similar_top_k=self.similar.top_k,
+            similar_neighbours=similar_neighbours,
+            search_cache_maxsize=self.search_cache_maxsize
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def search(self, query: Optional[str] = None) -> Tuple[CocktailRecord, ...]:
+        """Ищет коктейли, соответствующие запросу
+
+        Args:
+            query: строка запроса поиска коктейлей. Если не указана, возвращаются все коктейли каталога
+
+        Returns:
+            Записи коктейлей, упорядоченные по убыванию релевантности
+        """
+        tokens = tuple(tokenize(query)) if query else ()
+        if not tokens:
+            return self._all_records
+
+        results = self._search_results.get(tokens)
+        if results is not None:
+            self._search_results.move_to_end(tokens)
+            return results
+
+        results = self._search(tokens)
+        self._search_results[tokens] = results
+        if len(self._search_results) > self.search_cache_maxsize:
+            self._search_results.popitem(last=False)
+
+        return results
+
+    def _search(self, tokens: Tuple[str, ...]) -> Tuple[CocktailRecord, ...]:
+        scores: Optional[Dict[int, float]] = None
+        for token in tokens:
+            token_scores = self._match(token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {position: score + token_scores[position]
+                          for position, score in scores.items() if position in token_scores}
+            if not scores:
+                return ()
+
+        return tuple(self.records[position] for position in sorted(scores, key=lambda position: (-scores[position],
+                                                                                               position)))
+
+    @classmethod
+    def _index_record(cls, postings: Dict[str, Dict[int, float]], position: int, record: CocktailRecord):
+        cls._index_text(postings, position, record.name, NAME_WEIGHT)
+        for category_name in record.category_names:
+            cls._index_text(postings, position, category_name, CATEGORY_WEIGHT)
+        for ingredient_name in record.ingredient_names:
+            cls._index_text(postings, position, ingredient_name, INGREDIENT_WEIGHT)
+
+    @staticmethod
+    def _index_text(postings: Dict[str, Dict[int, float]], position: int, text: str, weight: float):
+        for term in tokenize(text):
+            term_postings = postings[term]
+            term_postings[position] = max(term_postings.get(position, 0.0), weight)
+
+    def _match(self, token: str) -> Dict[int, float]:
+        matches: Dict[int, float] = {}
+        for term in self._prefix_terms(token):
+            self._merge_postings(matches, term, EXACT_MATCH_QUALITY if term == token else PREFIX_MATCH_QUALITY)
+
+        if not matches:
+            for term, similarity in self._fuzzy_terms(token):
+                self._merge_postings(matches, term, FUZZY_MATCH_QUALITY * similarity)
+
+        return matches
+
+    def _merge_postings(self, matches: Dict[int, float], term: str, quality: float):
+        for position, weight in self.postings[term].items():
+            matches[position] = max(matches.get(position, 0.0), weight * quality)
+
+    def _prefix_terms(self, prefix: str) -> Iterator[str]:
+        for i in range(bisect_left(self._terms, prefix), len(self._terms)):
+            term = self._terms[i]
+            if not term.startswith(prefix):
+                break
+            yield term
+
+    def _fuzzy_terms(self, token: str) -> Iterator[Tuple[str, float]]:
+        token_trigrams = trigrams(token)
+        common_trigrams = Counter(term for trigram in token_trigrams for term in self._trigram_terms.get(trigram, ()))
+        for term, common_count in common_trigrams.items():
+            similarity = 2 * common_count / (len(token_trigrams) + self._term_trigram_counts[term])
+            if similarity >= self.fuzzy_threshold:
+                yield term, similarity
@@ -0,0 +1,185 @@
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import AbstractSet, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Set, Union, overload
+
+from bot.services.catalog.records import CocktailRecord
+from bot.services.catalog.text import tokenize
+
+
+class IngredientMatch(NamedTuple):
+    record: CocktailRecord
+    missing_ingredients: List[str]
+
+
+class IngredientMatches(Sequence[IngredientMatch]):
+    """Найденные по ингредиентам коктейли в порядке ранжирования
+
+    Недостающие ингредиенты коктейля перечисляются только при обращении к нему, например для показываемой страницы.
+    """
+
+    def __init__(self,
+                 records: Sequence[CocktailRecord],
+                 positions: List[int],
+                 cocktail_ingredients: List[Dict[str, str]],
+                 available_ingredients: AbstractSet[str]):
+        self._records = records
+        self._positions = positions
+        self._cocktail_ingredients = cocktail_ingredients
+        self._available_ingredients = available_ingredients
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @overload
+    def __getitem__(self, index: int) -> IngredientMatch:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[IngredientMatch]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[IngredientMatch, List[IngredientMatch]]:
+        if isinstance(index, slice):
+            return [self._build_match(position) for position in self._positions[index]]
+
+        return self._build_match(self._positions[index])
+
+    def _build_match(self, position: int) -> IngredientMatch:
+        return IngredientMatch(self._records[position], [
+            name for ingredient, name in self._cocktail_ingredients[position].items()
+            if ingredient not in self._available_ingredients
+        ])
+
+
+class IngredientIndex:
+    """Индекс коктейлей по ингредиентам для поиска коктейлей, которые можно приготовить из имеющихся ингредиентов
+
+    Каждому ингредиенту соответствует битовое множество позиций коктейлей каталога, в состав которых он входит.
+    Количество имеющихся ингредиентов каждого коктейля подсчитывается побитовым сложением этих множеств в битовых
+    срезах счетчика, поэтому поиск выполняет несколько побитовых операций над множествами вместо обхода каталога.
+    Ингредиенты каталога по префиксам слов находятся двоичным поиском в отсортированном списке слов ингредиентов.
+
+    Attributes:
+        records: записи коктейлей каталога
+    """
+
+    def __init__(self, records: Sequence[CocktailRecord]):
+        self.records = records
+        self._all_cocktails = (1 << len(records)) - 1
+        self._ingredient_cocktails: Dict[str, int] = defaultdict(int)
+        token_ingredients: Dict[str, Set[str]] = defaultdict(set)
+        self._ingredient_count_cocktails: Dict[int, int] = defaultdict(int)
+        self._cocktail_ingredients: List[Dict[str, str]] = []
+        # Названия ингредиентов повторяются во многих коктейлях, поэтому каждое название разбирается на слова один раз
+        ingredient_name_tokens: Dict[str, List[str]] = {}
+        for position, record in enumerate(records):
+            ingredients = {}
+            for ingredient_name in record.ingredient_names:
+                tokens = ingredient_name_tokens.get(ingredient_name)
+                if tokens is None:
+                    tokens = ingredient_name_tokens[ingredient_name] = tokenize(ingredient_name)
+                if tokens:
+                    ingredient = ' '.join(tokens)
+                    ingredients.setdefault(ingredient, ingredient_name)
+                    for token in tokens:
+                        token_ingredients[token].add(ingredient)
+            for ingredient in ingredients:
+                self._ingredient_cocktails[ingredient] |= 1 << position
+            self._ingredient_count_cocktails[len(ingredients)] |= 1 << position
+            self._cocktail_ingredients.append(ingredients)
+        self._tokens = sorted(token_ingredients)
+        self._token_ingredients = [frozenset(token_ingredients[token]) for token in self._tokens]
+
+    def resolve(self, ingredient: str) -> Set[str]:
+        """Получает ингредиенты каталога, соответствующие названию ингредиента
+
+        Ингредиент каталога соответствует названию, если каждое слово названия является префиксом одного из слов
+        ингредиента каталога. Например, «ром» соответствует ингредиентам «Белый ром» и «Темный ром».
+
+        Args:
+            ingredient: название ингредиента
+        """
+        catalog_ingredients = None
+        for token in tokenize(ingredient):
+            token_ingredients = set().union(*self._prefix_ingredients(token))
+            catalog_ingredients = token_ingredients if catalog_ingredients is None \
+                else catalog_ingredients & token_ingredients
+            if not catalog_ingredients:
+                return set()
+
+        return catalog_ingredients or set()
+
+    def search(self, ingredients: Iterable[str], max_missing: int = 0) -> IngredientMatches:
+        """Ищет коктейли, которые можно приготовить из имеющихся ингредиентов
+
+        Args:
+            ingredients: названия имеющихся ингредиентов
+            max_missing: максимальное количество недостающих ингредиентов коктейля
+
+        Returns:
+            Коктейли, упорядоченные по возрастанию количества недостающих ингредиентов и убыванию доли имеющихся
+        """
+        available_ingredients = set().union(*(self.resolve(ingredient) for ingredient in ingredients))
+        count_bits = self._count_cocktail_ingredients(available_ingredients)
+
+        # Коктейли с одинаковыми количествами ингредиентов и недостающих ингредиентов ранжируются одинаково, поэтому
+        # сортируются группы, а позиции внутри группы уже упорядочены
+        ranked_groups = []
+        for missing_count in range(max_missing + 1):
+            for ingredient_count, cocktails in self._ingredient_count_cocktails.items():
+                available_count = ingredient_count - missing_count
+                if available_count <= 0:
+                    continue
+                matched_cocktails = cocktails & self._count_equals(count_bits, available_count)
+                if matched_cocktails:
+                    rank = (missing_count, -available_count / ingredient_count)
+                    ranked_groups.append((rank, list(self._iter_positions(matched_cocktails))))
+        ranked_groups.sort(key=itemgetter(0))
+
+        ranked_positions: List[int] = []
+        for _, rank_groups in groupby(ranked_groups, key=itemgetter(0)):
+            positions = [group_positions for _, group_positions in rank_groups]
+            ranked_positions.extend(positions[0] if len(positions) == 1 else heapq.merge(*positions))
+
+        return IngredientMatches(self.records, ranked_positions, self._cocktail_ingredients, available_ingredients)
+
+    def _prefix_ingredients(self, prefix: str) -> Iterator[AbstractSet[str]]:
+        for i in range(bisect_left(self._tokens, prefix), len(self._tokens)):
+            if not self._tokens[i].startswith(prefix):
+                break
+            yield self._token_ingredients[i]
+
+    def _count_cocktail_ingredients(self, ingredients: Iterable[str]) -> List[int]:
+        count_bits: List[int] = []
+        for ingredient in ingredients:
+            carry = self._ingredient_cocktails.get(ingredient, 0)
+            for bit, bit_cocktails in enumerate(count_bits):
+                if not carry:
+                    break
+                count_bits[bit], carry = bit_cocktails ^ carry, bit_cocktails & carry
+            if carry:
+                count_bits.append(carry)
+
+        return count_bits
+
+    def _count_equals(self, count_bits: List[int], count: int) -> int:
+        if count >> len(count_bits):
+            return 0
+
+        cocktails = self._all_cocktails
+        for bit, bit_cocktails in enumerate(count_bits):
+            cocktails &= bit_cocktails if count >> bit & 1 else ~bit_cocktails
+
+        return cocktails
+
+    @staticmethod
+    def _iter_positions(cocktails: int) -> Iterator[int]:
+        # Поиск единичных битов в двоичной записи выполняется за один проход, а не за проход на каждый найденный бит
+        bits = bin(cocktails)[:1:-1]
+        position = bits.find('1')
+        while position != -1:
+            yield position
+            position = bits.find('1', position + 1)
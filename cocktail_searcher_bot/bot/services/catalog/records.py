@@ -0,0 +1,111 @@
+import sys
+from array import array
+from typing import List, NamedTuple, Tuple
+
+from bot.clients.cocktail_searcher.models import Category, Cocktail, Composition
+
+
+class CocktailRecord(NamedTuple):
+    """Компактное представление коктейля в локальном каталоге
+
+    В отличие от моделей коктейля, запись не содержит отдельных объектов категорий и элементов состава: названия
+    категорий, ингредиентов и единиц измерения хранятся кортежами интернированных строк, общих для всех коктейлей
+    каталога, а количества ингредиентов - массивом целых чисел.
+
+    Attributes:
+        id: идентификатор коктейля
+        name: название коктейля
+        image_url: ссылка на изображение коктейля
+        category_names: названия категорий коктейля
+        ingredient_names: названия ингредиентов состава коктейля
+        amounts: количества ингредиентов состава коктейля
+        unit_names: названия единиц измерения ингредиентов состава коктейля
+    """
+    id: int
+    name: str
+    image_url: str
+    category_names: Tuple[str, ...]
+    ingredient_names: Tuple[str, ...]
+    amounts: array
+    unit_names: Tuple[str, ...]
+
+    @classmethod
+    def create(cls,
+               cocktail_id: int,
+               name: str,
+               image_url: str,
+               category_names: List[str],
+               composition: List[Tuple[str, int, str]]) -> 'CocktailRecord':
+        """Создает запись коктейля, интернируя названия категорий, ингредиентов и единиц измерения
+
+        Args:
+            cocktail_id: идентификатор коктейля
+            name: название коктейля
+            image_url: ссылка на изображение коктейля
+            category_names: названия категорий коктейля
+            composition: состав коктейля - названия ингредиентов, их количества и единицы измерения
+        """
+        ingredient_names, amounts, unit_names = zip(*composition) if composition else ((), (), ())
+
+        return cls(
+            cocktail_id,
+            name,
+            str(image_url),
+            tuple(sys.intern(category_name) for category_name in category_names),
+            tuple(sys.intern(ingredient_name) for ingredient_name in ingredient_names),
+            array('l', amounts),
+            tuple(sys.intern(unit_name) for unit_name in unit_names),
+        )
+
+    @classmethod
+    def from_cocktail(cls, cocktail: Cocktail) -> 'CocktailRecord':
+        """Создает запись коктейля по модели коктейля
+
+        Args:
+            cocktail: коктейль
+        """
+        return cls.create(
+            cocktail.id,
+            cocktail.name,
+            cocktail.image_url,
+            [category.name for category in cocktail.categories],
+            [(item.ingredient_name, item.amount, item.unit_name) for item in cocktail.composition]
+        )
+
+    @property
+    def composition(self) -> List[Tuple[str, int, str]]:
+        """Состав коктейля - названия ингредиентов, их количества и единицы измерения"""
+        return list(zip(self.ingredient_names, self.amounts, self.unit_names))
+
+    def to_cocktail(self) -> Cocktail:
+        """Создает модель коктейля по записи"""
+        # Запись создается из провалидированных моделей или снимка каталога, поэтому модели создаются без валидации
+        return Cocktail.construct(
+            id=self.id,
+            name=self.name,
+            image_url=self.image_url,
+            categories=[Category.construct(name=category_name) for category_name in self.category_names],
+            composition=[
+                Composition.construct(ingredient_name=ingredient_name, amount=amount, unit_name=unit_name)
+                for ingredient_name, amount, unit_name in self.composition
+            ]
+        )
+
+    def describes(self, cocktail: Cocktail) -> bool:
+        """Проверяет, что модель коктейля совпадает с записью по содержимому
+
+        Args:
+            cocktail: коктейль
+        """
+        return (
+            cocktail.id == self.id
+            and cocktail.name == self.name
+            and cocktail.image_url == self.image_url
+            and len(cocktail.categories) == len(self.category_names)
+            and all(category.name == name for category, name in zip(cocktail.categories, self.category_names))
+            and len(cocktail.composition) == len(self.ingredient_names)
+            and all(
+                (item.ingredient_name, item.amount, item.unit_name) == composition
+                for item, composition in zip(cocktail.composition, self.composition)
+            )
+        )
@@ -0,0 +1,135 @@
+import heapq
+import math
+from array import array
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set
+
+from bot.services.catalog.records import CocktailRecord
+from bot.services.catalog.text import tokenize
+
+CATEGORY_FEATURE_WEIGHT = 0.5
+MAX_CANDIDATES = 100
+NO_NEIGHBOUR = -1
+
+
+class SimilarityIndex:
+    """Индекс похожих коктейлей
+
+    Каждый коктейль представляется разреженным TF-IDF вектором своих ингредиентов и категорий, нормированным по
+    длине. Сходство коктейлей - косинус угла между векторами. Скалярные произведения вычисляются только для пар
+    коктейлей с общими ингредиентами или категориями, как при умножении разреженной матрицы на транспонированную.
+    Ближайшие соседи всех коктейлей вычисляются при построении индекса и хранятся плоским массивом, поэтому получение
+    похожих коктейлей не требует вычислений.
+
+    Сходство вычисляется не более чем с max_candidates коктейлями-кандидатами, которые подбираются по общим признакам,
+    начиная с самых редких. Повсеместные ингредиенты (лед, сахар) имеют минимальный вес TF-IDF и без ограничения
+    сделали бы построение индекса квадратичным по размеру каталога. В сходство с кандидатами входят все признаки.
+
+    Attributes:
+        records: записи коктейлей каталога
+        top_k: количество хранимых похожих коктейлей каждого коктейля
+        max_candidates: максимальное количество коктейлей, с которыми вычисляется сходство каждого коктейля
+        neighbours: позиции похожих коктейлей в каталоге, по top_k на каждый коктейль в порядке убывания сходства.
+            Недостающие соседи обозначаются значением NO_NEIGHBOUR. Если не указаны, вычисляются по коктейлям каталога
+    """
+
+    def __init__(self,
+                 records: Sequence[CocktailRecord],
+                 top_k: int,
+                 neighbours: Optional[array] = None,
+                 max_candidates: int = MAX_CANDIDATES):
+        self.records = records
+        self.top_k = top_k
+        self.max_candidates = max_candidates
+        self.neighbours = neighbours if neighbours is not None else self._compute_neighbours()
+        self._positions = {record.id: position for position, record in enumerate(records)}
+
+    def similar(self, cocktail_id: int) -> List[CocktailRecord]:
+        """Получает похожие коктейли
+
+        Args:
+            cocktail_id: идентификатор коктейля
+
+        Returns:
+            Записи похожих коктейлей в порядке убывания сходства. Если коктейль отсутствует в каталоге, возвращается
+            пустой список
+        """
+        position = self._positions.get(cocktail_id)
+        if position is None:
+            return []
+
+        return [
+            self.records[neighbour]
+            for neighbour in self.neighbours[position * self.top_k:(position + 1) * self.top_k]
+            if neighbour != NO_NEIGHBOUR
+        ]
+
+    @staticmethod
+    def get_features(record: CocktailRecord) -> Dict[str, float]:
+        """Получает признаки коктейля, по которым вычисляется сходство, с их весами до применения IDF
+
+        Args:
+            record: запись коктейля
+        """
+        features = {}
+        for category_name in record.category_names:
+            features[f'category:{" ".join(tokenize(category_name))}'] = CATEGORY_FEATURE_WEIGHT
+        for ingredient_name in record.ingredient_names:
+            features[f'ingredient:{" ".join(tokenize(ingredient_name))}'] = 1.0
+
+        return features
+
+    def _compute_neighbours(self) -> array:
+        vectors = self._build_vectors()
+        feature_cocktails: Dict[str, List[int]] = defaultdict(list)
+        for position, vector in enumerate(vectors):
+            for feature in vector:
+                feature_cocktails[feature].append(position)
+
+        neighbours = array('l')
+        for position, vector in enumerate(vectors):
+            similarities = {}
+            for candidate in self._find_candidates(position, vector, feature_cocktails):
+                candidate_vector = vectors[candidate]
+                similarities[candidate] = sum(
+                    vector[feature] * candidate_vector[feature] for feature in vector.keys() & candidate_vector.keys()
+                )
+            top_neighbours = heapq.nsmallest(self.top_k, similarities, key=lambda other: (-similarities[other], other))
+            neighbours.extend(top_neighbours)
+            neighbours.extend([NO_NEIGHBOUR] * (self.top_k - len(top_neighbours)))
+
+        return neighbours
+
+    def _find_candidates(self,
+                         position: int,
+                         vector: Dict[str, float],
+                         feature_cocktails: Dict[str, List[int]]) -> Set[int]:
+        candidates: Set[int] = set()
+        for feature in sorted(vector, key=lambda feature: (len(feature_cocktails[feature]), feature)):
+            for candidate in feature_cocktails[feature]:
+                if candidate != position:
+                    candidates.add(candidate)
+                    if len(candidates) >= self.max_candidates:
+                        return candidates
+
+        return candidates
+
+    def _build_vectors(self) -> List[Dict[str, float]]:
+        cocktail_features = [self.get_features(record) for record in self.records]
+
+        document_frequencies: Dict[str, int] = defaultdict(int)
+        for features in cocktail_features:
+            for feature in features:
+                document_frequencies[feature] += 1
+
+        cocktail_count = len(self.records)
+        vectors = []
+        for features in cocktail_features:
+            vector = {
+                feature: weight * (math.log((1 + cocktail_count) / (1 + document_frequencies[feature])) + 1)
+                for feature, weight in features.items()
+            }
+            norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+            vectors.append({feature: weight / norm for feature, weight in vector.items()} if norm else {})
+
+        return vectors
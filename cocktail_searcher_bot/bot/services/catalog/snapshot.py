@@ -0,0 +1,207 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Union
+
+from bot.services.catalog.exceptions import CatalogSnapshotError
+from bot.services.catalog.index import CatalogIndex
+from bot.services.catalog.records import CocktailRecord
+
+SNAPSHOT_MAGIC = b'CSCS'
+SNAPSHOT_VERSION = 4
+SNAPSHOT_HEADER = struct.Struct('<4sHdQ32s')
+SNAPSHOT_SECTIONS = struct.Struct('<Q7Q')
+SECTION_ALIGNMENT = 8
+
+
+class CatalogSnapshot(NamedTuple):
+    created_at: float
+    index: CatalogIndex
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self._refs: Dict[str, int] = {}
+
+    def ref(self, string: str) -> int:
+        ref = self._refs.get(string)
+        if ref is None:
+            ref = self._refs[string] = len(self.strings)
+            self.strings.append(string)
+
+        return ref
+
+
+def write_snapshot(path: Union[str, Path], index: CatalogIndex):
+    """Записывает снимок каталога коктейлей и его поискового индекса
+
+    Снимок состоит из заголовка (сигнатура, версия формата, время создания, размер и SHA-256 данных), таблицы
+    размеров секций и секций данных. Строки каталога и терминов хранятся один раз в JSON-таблице строк, а записи
+    коктейлей, термины, позиции и веса индекса и похожие коктейли - массивами 64-битных little-endian чисел,
+    выровненными по 8 байт. Файл снимка заменяется атомарно.
+
+    Args:
+        path: путь к файлу снимка
+        index: поисковый индекс каталога
+    """
+    strings = _StringTable()
+    records = array('q')
+    for record in index.records:
+        records.extend((record.id, strings.ref(record.name), strings.ref(record.image_url),
+                        len(record.category_names)))
+        records.extend(strings.ref(category_name) for category_name in record.category_names)
+        records.append(len(record.ingredient_names))
+        for ingredient_name, amount, unit_name in record.composition:
+            records.extend((strings.ref(ingredient_name), amount, strings.ref(unit_name)))
+
+    terms = array('q')
+    posting_offsets = array('q', [0])
+    posting_positions = array('q')
+    posting_weights = array('d')
+    for term, term_postings in index.postings.items():
+        terms.append(strings.ref(term))
+        posting_positions.extend(term_postings.keys())
+        posting_weights.extend(term_postings.values())
+        posting_offsets.append(len(posting_positions))
+
+    sections = [
+        json.dumps(strings.strings, ensure_ascii=False, separators=(',', ':')).encode(),
+        *(_to_bytes(section) for section in (
+            records, terms, posting_offsets, posting_positions, posting_weights, array('q', index.similar.neighbours)
+        )),
+    ]
+    payload = b''.join([
+        SNAPSHOT_SECTIONS.pack(index.similar.top_k, *(len(section) for section in sections)),
+        *(section + bytes(-len(section) % SECTION_ALIGNMENT) for section in sections),
+    ])
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, time.time(), len(payload), hashlib.sha256(payload).digest()
+    )
+
+    path = Path(path)
+    temporary_path = path.with_name(f'{path.name}.tmp')
+    with open(temporary_path, 'wb') as file:
+        file.write(header)
+        file.write(payload)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def read_snapshot(path: Union[str, Path], fuzzy_threshold: float) -> CatalogSnapshot:
+    """Читает снимок каталога коктейлей, отображая файл в память
+
+    Контрольная сумма проверяется по отображению файла без копирования. Числовые секции читаются через memoryview
+    отображения без разбора, разбирается только таблица строк.
+
+    Args:
+        path: путь к файлу снимка
+        fuzzy_threshold: минимальное сходство триграмм для нечеткого совпадения в восстановленном индексе
+
+    Returns:
+        Время создания снимка и восстановленный поисковый индекс
+
+    Raises:
+        OSError: возбуждаемое исключение в случае ошибки чтения файла
+        CatalogSnapshotError: возбуждаемое исключение в случае поврежденного снимка или снимка другой версии формата
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size < SNAPSHOT_HEADER.size:
+            raise CatalogSnapshotError('The snapshot is truncated')
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            magic, version, created_at, payload_size, checksum = SNAPSHOT_HEADER.unpack_from(mapping)
+            if magic != SNAPSHOT_MAGIC:
+                raise CatalogSnapshotError('The file is not a catalog snapshot')
+            if version != SNAPSHOT_VERSION:
+                raise CatalogSnapshotError(f'Unsupported snapshot version {version}')
+            if len(mapping) != SNAPSHOT_HEADER.size + payload_size:
+                raise CatalogSnapshotError('The snapshot is truncated')
+            # Все представления отображения должны быть освобождены до его закрытия, поэтому они не покидают
+            # _read_index
+            index = _read_index(mapping, checksum, fuzzy_threshold)
+
+    return CatalogSnapshot(created_at, index)
+
+
+def _read_index(mapping: mmap.mmap, checksum: bytes, fuzzy_threshold: float) -> CatalogIndex:
+    views: List[memoryview] = []
+    try:
+        view = memoryview(mapping)
+        payload = view[SNAPSHOT_HEADER.size:]
+        views.extend((view, payload))
+        if hashlib.sha256(payload).digest() != checksum:
+            raise CatalogSnapshotError('The snapshot checksum does not match')
+        if len(payload) < SNAPSHOT_SECTIONS.size:
+            raise CatalogSnapshotError('The snapshot is truncated')
+
+        similar_top_k, *section_sizes = SNAPSHOT_SECTIONS.unpack_from(payload)
+        sections = []
+        offset = SNAPSHOT_SECTIONS.size
+        for section_size in section_sizes:
+            sections.append(payload[offset:offset + section_size])
+            offset += section_size + -section_size % SECTION_ALIGNMENT
+        views.extend(sections)
+        if offset != len(payload):
+            raise CatalogSnapshotError('The snapshot sections do not match the payload size')
+        strings_section, *array_sections = sections
+        strings = json.loads(bytes(strings_section))
+        records, terms, posting_offsets, posting_positions, posting_weights, neighbours = [
+            _from_bytes(section, typecode) for section, typecode in zip(array_sections, 'qqqqdq')
+        ]
+        views.extend((records, terms, posting_offsets, posting_positions, posting_weights, neighbours))
+
+        # Данные снимка проверены контрольной суммой, поэтому записи создаются без валидации
+        cocktail_records = []
+        fields = iter(records.tolist())
+        for cocktail_id in fields:
+            name, image_url, category_count = strings[next(fields)], strings[next(fields)], next(fields)
+            category_names = [strings[next(fields)] for _ in range(category_count)]
+            composition = [
+                (strings[next(fields)], next(fields), strings[next(fields)]) for _ in range(next(fields))
+            ]
+            cocktail_records.append(CocktailRecord.create(cocktail_id, name, image_url, category_names, composition))
+
+        posting_bounds = posting_offsets.tolist()
+        postings = {
+            strings[term]: dict(zip(posting_positions[start:end], posting_weights[start:end]))
+            for term, start, end in zip(terms, posting_bounds, posting_bounds[1:])
+        }
+        similar_neighbours = array('l', neighbours)
+    finally:
+        for view in views:
+            view.release()
+
+    return CatalogIndex(
+        cocktail_records,
+        fuzzy_threshold=fuzzy_threshold,
+        postings=postings,
+        similar_top_k=similar_top_k,
+        similar_neighbours=similar_neighbours
+    )
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def _from_bytes(section: memoryview, typecode: str) -> memoryview:
+    if len(section) % SECTION_ALIGNMENT:
+        raise CatalogSnapshotError('The snapshot section is misaligned')
+    if sys.byteorder != 'little':
+        values = array(typecode)
+        values.frombytes(section)
+        values.byteswap()
+        return memoryview(values)
+
+    return section.cast(typecode)
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional, NamedTuple, Set
+
+from bot.clients.cocktail_searcher.client import CocktailSearcherClient
+from bot.clients.cocktail_searcher.models import Cocktail, PagePagination
+from bot.services.catalog.index import CatalogIndex
+from bot.services.catalog.records import CocktailRecord
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogChanges(NamedTuple):
+    added: Set[int]
+    changed: Set[int]
+    removed: Set[int]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class CatalogSynchronizer:
+    """Синхронизатор локального каталога коктейлей с внешним API
+
+    Каталог загружается постранично, страницы после первой запрашиваются параллельно, но не более max_concurrency
+    одновременно. Изменения определяются сравнением хэшей содержимого коктейлей с предыдущей синхронизацией. Если
+    каталог изменился, в отдельном потоке строится новый индекс, а записи, веса терминов и, если возможно, похожие
+    коктейли неизмененных коктейлей переиспользуются из предыдущего. Предыдущий индекс не изменяется, поэтому читатели
+    никогда не блокируются и не видят частично примененных изменений.
+
+    Attributes:
+        page_size: количество коктейлей на странице запроса к внешнему API
+        max_concurrency: максимальное количество одновременных запросов страниц
+        fuzzy_threshold: минимальное сходство триграмм для нечеткого совпадения в построенном индексе
+        similar_top_k: количество похожих коктейлей, вычисляемых для каждого коктейля построенного индекса
+        syncs: количество успешных синхронизаций
+        failures: количество синхронизаций, завершившихся ошибкой
+        last_synced_at: время последней успешной синхронизации по монотонным часам
+        last_duration: длительность последней успешной синхронизации в секундах
+        last_changes: изменения, обнаруженные последней успешной синхронизацией
+    """
+
+    def __init__(self, page_size: int, max_concurrency: int, fuzzy_threshold: float, similar_top_k: int):
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.fuzzy_threshold = fuzzy_threshold
+        self.similar_top_k = similar_top_k
+        self.syncs = 0
+        self.failures = 0
+        self.last_synced_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_changes = CatalogChanges(set(), set(), set())
+        self._hashes: Dict[int, bytes] = {}
+
+    @property
+    def staleness(self) -> Optional[float]:
+        """Время в секундах, прошедшее с последней успешной синхронизации"""
+        if self.last_synced_at is None:
+            return None
+
+        return time.monotonic() - self.last_synced_at
+
+    def restore(self, index: CatalogIndex):
+        """Принимает восстановленный индекс каталога за результат предыдущей синхронизации
+
+        Args:
+            index: индекс каталога, восстановленный из снимка
+        """
+        self._hashes = {record.id: self._hash_record(record) for record in index.records}
+
+    async def sync(self, api_client: CocktailSearcherClient, index: Optional[CatalogIndex]) -> CatalogIndex:
+        """Синхронизирует каталог коктейлей с внешним API
+
+        Args:
+            api_client: клиент внешнего API
+            index: текущий индекс каталога
+
+        Returns:
+            Новый индекс каталога либо текущий индекс, если каталог не изменился
+
+        Raises:
+            TransportError: возбуждаемое исключение в случае ошибки соединения с внешним API
+            ResponseError: возбуждаемое исключение в случае ошибочного ответа внешнего API
+        """
+        try:
+            return await self._sync(api_client, index)
+        except Exception:
+            self.failures += 1
+            raise
+
+    async def _sync(self, api_client: CocktailSearcherClient, index: Optional[CatalogIndex]) -> CatalogIndex:
+        started_at = time.monotonic()
+        cocktails = await self._fetch_catalog(api_client)
+        records = [CocktailRecord.from_cocktail(cocktail) for cocktail in cocktails]
+        hashes = {record.id: self._hash_record(record) for record in records}
+        changes = CatalogChanges(
+            added=hashes.keys() - self._hashes.keys(),
+            changed={cocktail_id for cocktail_id, content_hash in hashes.items()
+                     if self._hashes.get(cocktail_id, content_hash) != content_hash},
+            removed=self._hashes.keys() - hashes.keys(),
+        )
+        if index is None:
+            index = await asyncio.to_thread(
+                CatalogIndex, records, fuzzy_threshold=self.fuzzy_threshold, similar_top_k=self.similar_top_k
+            )
+        elif changes:
+            previous_records = {record.id: record for record in index.records}
+            # Поток построения удерживает GIL и лишь периодически уступает его циклу событий, поэтому обработка
+            # событий во время построения замедляется. Время построения ограничено SimilarityIndex.max_candidates
+            index = await asyncio.to_thread(
+                index.update,
+                [record if record.id in changes.added or record.id in changes.changed
+                 else previous_records.get(record.id, record) for record in records],
+                changes.added | changes.changed
+            )
+
+        self._hashes = hashes
+        self.syncs += 1
+        self.last_synced_at = time.monotonic()
+        self.last_duration = self.last_synced_at - started_at
+        self.last_changes = changes
+        logger.info('Cocktail catalog synchronized in %.3f s: %s cocktails, %s added, %s changed, %s removed',
+                    self.last_duration, len(index), len(changes.added), len(changes.changed), len(changes.removed))
+
+        return index
+
+    async def _fetch_catalog(self, api_client: CocktailSearcherClient) -> List[Cocktail]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_page(page: int) -> PagePagination[Cocktail]:
+            async with semaphore:
+                return await api_client.get_cocktails(page=page, page_size=self.page_size)
+
+        first_page = await fetch_page(1)
+        pages = [first_page, *await asyncio.gather(*(
+            fetch_page(page) for page in range(2, first_page.total_pages + 1)
+        ))]
+
+        cocktails = {}
+        for response in pages:
+            for cocktail in response.results:
+                cocktails.setdefault(cocktail.id, cocktail)
+
+        return list(cocktails.values())
+
+    @staticmethod
+    def _hash_record(record: CocktailRecord) -> bytes:
+        return hashlib.blake2b(repr(record).encode(), digest_size=16).digest()
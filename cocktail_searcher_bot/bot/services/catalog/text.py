@@ -0,0 +1,149 @@
+import re
+import unicodedata
+from typing import Dict, List, Mapping, Optional, Set
+
+RE_WORD = re.compile(r'\w+')
+RE_INGREDIENT_SEPARATOR = re.compile(r'[,;\n]')
+RE_CYRILLIC = re.compile(r'[а-я]')
+RE_LATIN = re.compile(r'[a-z]')
+
+LATIN_TO_CYRILLIC_HOMOGLYPHS = str.maketrans('aceopxykmth', 'асеорхукмтн')
+CYRILLIC_TO_LATIN_HOMOGLYPHS = str.maketrans('асеорхукмтн', 'aceopxykmth')
+
+RUSSIAN_ENDINGS = (
+    'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ая', 'яя', 'ое', 'ее', 'ые', 'ие', 'ый', 'ий', 'ой', 'ей', 'ом', 'ем', 'ам', 'ям', 'ах', 'ях', 'ов', 'ев',
+    'ую', 'юю',
+    'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+)
+MIN_STEM_LENGTH = 3
+
+
+def normalize_text(text: str) -> str:
+    """Приводит текст к нормализованному виду
+
+    Текст приводится к форме NFKC и нижнему регистру без учета регистра символов, «ё» заменяется на «е». Похожие
+    латинские и кириллические буквы внутри слова приводятся к алфавиту, буквы которого в слове преобладают.
+
+    Args:
+        text: исходный текст
+    """
+    text = unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+
+    return RE_WORD.sub(_fold_homoglyphs, text)
+
+
+def _fold_homoglyphs(match: re.Match) -> str:
+    word = match.group()
+    cyrillic_count = len(RE_CYRILLIC.findall(word))
+    if not cyrillic_count:
+        return word
+
+    latin_count = len(RE_LATIN.findall(word))
+    if not latin_count:
+        return word
+
+    if cyrillic_count >= latin_count:
+        return word.translate(LATIN_TO_CYRILLIC_HOMOGLYPHS)
+
+    return word.translate(CYRILLIC_TO_LATIN_HOMOGLYPHS)
+
+
+def normalize_search_query(search: Optional[str], synonyms: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """Приводит строку запроса поиска к нормализованному виду
+
+    Помимо нормализации текста, пробельные символы схлопываются, а слова, найденные в таблице синонимов, заменяются
+    на их основную форму.
+
+    Args:
+        search: строка запроса поиска
+        synonyms: таблица синонимов, сопоставляющая слову его основную форму
+
+    Returns:
+        Нормализованная строка запроса или None, если запрос пуст
+    """
+    if search is None:
+        return None
+
+    words = normalize_text(search).split()
+    if synonyms:
+        words = [synonyms.get(word, word) for word in words]
+
+    return ' '.join(words) or None
+
+
+def normalize_synonyms(synonyms: Mapping[str, str]) -> Dict[str, str]:
+    """Нормализует таблицу синонимов поисковых запросов
+
+    Цепочки синонимов разрешаются до конечной основной формы, поэтому повторная нормализация запроса его не изменяет.
+    В цикле синонимов основной формой становится слово, с которого начат обход цикла.
+
+    Args:
+        synonyms: таблица синонимов, сопоставляющая слову его основную форму
+    """
+    canonical_words = {normalize_text(word): normalize_text(canonical).split() for word, canonical in synonyms.items()}
+    resolved_words: Dict[str, List[str]] = {}
+
+    def resolve(word: str, visited: Set[str]) -> List[str]:
+        if word in resolved_words:
+            return resolved_words[word]
+        if word not in canonical_words or word in visited:
+            return [word]
+
+        visited.add(word)
+        resolved_words[word] = [
+            resolved_word
+            for canonical_word in canonical_words[word]
+            for resolved_word in resolve(canonical_word, visited)
+        ]
+        visited.remove(word)
+
+        return resolved_words[word]
+
+    return {word: ' '.join(resolve(word, set())) for word in canonical_words}
+
+
+def stem(word: str) -> str:
+    """Отсекает от слова типичное окончание русского языка
+
+    Args:
+        word: нормализованное слово
+    """
+    for ending in RUSSIAN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[:-len(ending)]
+
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на основы нормализованных слов
+
+    Args:
+        text: исходный текст
+    """
+    return [stem(word) for word in RE_WORD.findall(normalize_text(text))]
+
+
+def trigrams(term: str) -> Set[str]:
+    """Получает триграммы термина, дополненного пробелами по краям
+
+    Args:
+        term: термин
+    """
+    padded_term = f'  {term} '
+    return {padded_term[i:i + 3] for i in range(len(padded_term) - 2)}
+
+
+def split_ingredients(text: str) -> List[str]:
+    """Разбивает перечисление ингредиентов через запятую, точку с запятой или перевод строки
+
+    Args:
+        text: перечисление ингредиентов
+    """
+    ingredients = {}
+    for ingredient in RE_INGREDIENT_SEPARATOR.split(text):
+        if ingredient := ' '.join(ingredient.split()):
+            ingredients.setdefault(normalize_text(ingredient), ingredient)
+
+    return list(ingredients.values())
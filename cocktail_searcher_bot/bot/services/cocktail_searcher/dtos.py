@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Optional, List
 
-from aiogram.types import InlineKeyboardMarkup
+from aiogram.types import InlineKeyboardMarkup, InlineQueryResultArticle
+
+from bot.clients.cocktail_searcher.models import CookingStage
 
 
 class ParseMode(str, Enum):
@@ -14,8 +16,25 @@ class ParseMode(str, Enum):
         return self.value
 
 
+class CocktailView(str, Enum):
+    SEARCH = 'search'
+    FAVORITE = 'favorite'
+
+
 @dataclass
 class TelegramMessage:
     text: str
     reply_markup: Optional[InlineKeyboardMarkup] = None
     parse_mode: Optional[ParseMode] = None
+
+
+@dataclass
+class CocktailRecipe:
+    stages: List[CookingStage]
+    text: Optional[str] = None
+
+
+@dataclass
+class InlineSearchResults:
+    results: List[InlineQueryResultArticle]
+    next_offset: str = ''
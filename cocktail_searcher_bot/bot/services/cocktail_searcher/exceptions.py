@@ -10,6 +10,10 @@ class CocktailNotFoundError(CocktailSearcherServiceError):
     """Коктейль не найден"""
 
 
+class CatalogUnavailableError(CocktailSearcherServiceError):
+    """Локальный каталог коктейлей не загружен"""
+
+
 class CocktailAlreadyInFavoritesError(CocktailSearcherServiceError):
     """Коктейль уже есть в избранном"""
 
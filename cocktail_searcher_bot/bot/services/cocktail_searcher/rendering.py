@@ -0,0 +1,67 @@
+import hashlib
+import os
+from typing import Optional
+
+from jinja2 import ChoiceLoader, Environment, ModuleLoader, PackageLoader, select_autoescape
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), 'templates')
+COMPILED_TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), 'compiled_templates')
+COMPILED_TEMPLATES_VERSION_FILE = 'VERSION'
+
+
+def get_templates_version() -> str:
+    """Вычисляет версию шаблонов сообщений по их именам и содержимому"""
+    templates_hash = hashlib.blake2b(digest_size=8)
+    for template_name in sorted(os.listdir(TEMPLATES_PATH)):
+        templates_hash.update(template_name.encode())
+        with open(os.path.join(TEMPLATES_PATH, template_name), 'rb') as template_file:
+            templates_hash.update(template_file.read())
+
+    return templates_hash.hexdigest()
+
+
+TEMPLATES_VERSION = get_templates_version()
+
+
+def create_environment(compiled_templates_path: Optional[str] = COMPILED_TEMPLATES_PATH) -> Environment:
+    """
+    Создает окружение Jinja2 для шаблонов сообщений
+
+    Если шаблоны предварительно скомпилированы в модули Python текущей версии шаблонов, они загружаются из модулей без
+    разбора и компиляции исходных шаблонов. Иначе шаблоны компилируются при первом обращении.
+
+    Args:
+        compiled_templates_path: путь к каталогу скомпилированных шаблонов
+    """
+    loader = PackageLoader(__name__, 'templates')
+    compiled_templates_version = _read_compiled_templates_version(compiled_templates_path) \
+        if compiled_templates_path is not None else None
+    if compiled_templates_version == TEMPLATES_VERSION:
+        loader = ChoiceLoader([ModuleLoader(compiled_templates_path), loader])
+
+    return Environment(loader=loader, autoescape=select_autoescape())
+
+
+def compile_templates(compiled_templates_path: str = COMPILED_TEMPLATES_PATH):
+    """
+    Компилирует шаблоны сообщений в модули Python
+
+    Args:
+        compiled_templates_path: путь к каталогу скомпилированных шаблонов
+    """
+    create_environment(None).compile_templates(compiled_templates_path, zip=None, ignore_errors=False)
+    version_path = os.path.join(compiled_templates_path, COMPILED_TEMPLATES_VERSION_FILE)
+    with open(version_path, 'w', encoding='utf-8') as version_file:
+        version_file.write(TEMPLATES_VERSION)
+
+
+def _read_compiled_templates_version(compiled_templates_path: str) -> Optional[str]:
+    try:
+        with open(os.path.join(compiled_templates_path, COMPILED_TEMPLATES_VERSION_FILE), encoding='utf-8') as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+if __name__ == '__main__':
+    compile_templates()
@@ -1,25 +1,54 @@
-from typing import Optional, List
+import asyncio
+import logging
+import os
+import time
+from http import HTTPStatus
+from typing import Optional, List, Tuple, Dict, Hashable, Callable, Awaitable
 
 from aiogram.filters.callback_data import CallbackData
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from jinja2 import Environment, select_autoescape, PackageLoader
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, InlineQueryResultArticle, InputTextMessageContent
 
 from bot.clients.cocktail_searcher import exceptions as cs_exception
 from bot.clients.cocktail_searcher.client import CocktailSearcherClient
-from bot.clients.cocktail_searcher.models import Cocktail, CookingStage
+from bot.clients.cocktail_searcher.models import Cocktail, CookingStage, PagePagination, TelegramUserFavorite
+from bot.services.catalog.exceptions import CatalogSnapshotError
+from bot.services.catalog.index import CatalogIndex
+from bot.services.catalog.records import CocktailRecord
+from bot.services.catalog.snapshot import read_snapshot, write_snapshot
+from bot.services.catalog.text import normalize_search_query, normalize_synonyms
+from bot.services.catalog.sync import CatalogSynchronizer
 from bot.services.cocktail_searcher import exceptions
-from bot.services.cocktail_searcher.dtos import TelegramMessage, ParseMode
+from bot.services.cocktail_searcher.dtos import (
+    TelegramMessage,
+    ParseMode,
+    CocktailRecipe,
+    InlineSearchResults,
+    CocktailView,
+)
+from bot.services.cocktail_searcher.rendering import TEMPLATES_VERSION, create_environment
+from bot.services.cocktail_searcher.store import CocktailStore
+from config import settings
 from utils.aiogram.types import InlinePaginationKeyboardMarkup
+from utils.cache import TTLCache, NegativeCache
+from utils.prefetcher import Prefetcher
 
-jinja2 = Environment(loader=PackageLoader(__name__, 'templates'), autoescape=select_autoescape())
+logger = logging.getLogger(__name__)
+
+jinja2 = create_environment()
 
 COCKTAIL_PAGE_SIZE = 1
 
+BACK_REPLY_MARKUP = InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text='Назад', callback_data='back')]])
+
 
 class RecipeCallback(CallbackData, prefix='recipe'):
     cocktail_id: int
 
 
+class SimilarCallback(CallbackData, prefix='similar'):
+    cocktail_id: int
+
+
 class AddFavoriteCallback(CallbackData, prefix='add_favorite'):
     cocktail_id: int
 
@@ -28,37 +57,345 @@ class RemoveFavorite(CallbackData, prefix='remove_favorite'):
     favorite_id: int
 
 
+def render_cocktail_card(cocktail: Cocktail) -> str:
+    return jinja2.get_template('cocktail.html').render(cocktail=cocktail, missing_ingredients=None)
+
+
 class CocktailSearcherService:
     def __init__(self):
         self.api_client = CocktailSearcherClient()
+        self.cocktail_store = CocktailStore(
+            maxsize=settings.COCKTAIL_ENTITY_STORE_MAXSIZE,
+            render_card=render_cocktail_card
+        )
+        self.cocktails_cache = TTLCache(
+            maxsize=settings.COCKTAIL_CACHE_MAXSIZE,
+            ttl=settings.COCKTAIL_CACHE_TTL,
+            stale_ttl=settings.COCKTAIL_CACHE_STALE_TTL,
+            is_stale_error=self._is_external_api_failure
+        )
+        self.empty_searches_cache = NegativeCache(
+            capacity=settings.COCKTAIL_EMPTY_SEARCH_CACHE_CAPACITY,
+            ttl=settings.COCKTAIL_EMPTY_SEARCH_CACHE_TTL,
+            false_positive_rate=settings.COCKTAIL_EMPTY_SEARCH_CACHE_FALSE_POSITIVE_RATE
+        )
+        self.favorites_cache = TTLCache(
+            maxsize=settings.COCKTAIL_CACHE_MAXSIZE,
+            ttl=settings.COCKTAIL_FAVORITES_CACHE_TTL
+        )
+        self.recipes_cache = TTLCache(
+            maxsize=settings.COCKTAIL_RECIPE_CACHE_MAXSIZE,
+            ttl=settings.COCKTAIL_RECIPE_CACHE_TTL,
+            stale_ttl=settings.COCKTAIL_RECIPE_CACHE_STALE_TTL,
+            is_stale_error=self._is_external_api_failure
+        )
+        self.telegram_user_ids_cache = TTLCache(
+            maxsize=settings.TELEGRAM_USER_CACHE_MAXSIZE,
+            ttl=settings.TELEGRAM_USER_CACHE_TTL
+        )
+        self.search_synonyms = normalize_synonyms(settings.COCKTAIL_SEARCH_SYNONYMS)
+        self.inline_results_cache = TTLCache(
+            maxsize=settings.COCKTAIL_INLINE_CACHE_MAXSIZE,
+            ttl=settings.COCKTAIL_INLINE_CACHE_TTL
+        )
+        self.messages_cache = TTLCache(
+            maxsize=settings.COCKTAIL_MESSAGE_CACHE_MAXSIZE,
+            ttl=settings.COCKTAIL_MESSAGE_CACHE_TTL
+        )
+        self.prefetcher = Prefetcher(max_tasks=settings.COCKTAIL_PREFETCH_MAX_TASKS)
+        self.catalog_index: Optional[CatalogIndex] = None
+        self.catalog_synchronizer = CatalogSynchronizer(
+            page_size=settings.COCKTAIL_CATALOG_PAGE_SIZE,
+            max_concurrency=settings.COCKTAIL_CATALOG_SYNC_CONCURRENCY,
+            fuzzy_threshold=settings.COCKTAIL_CATALOG_FUZZY_THRESHOLD,
+            similar_top_k=settings.COCKTAIL_SIMILAR_TOP_K
+        )
+        self._catalog_syncing: Optional[asyncio.Task] = None
+
+    async def startup(self):
+        """
+        Запускает фоновую синхронизацию каталога коктейлей с локальным поисковым индексом, если он включен
+
+        До завершения первой синхронизации поиск выполняется по снимку каталога, сохраненному предыдущей синхронизацией.
+        """
+        if settings.COCKTAIL_CATALOG_ENABLED and self._catalog_syncing is None:
+            self.restore_catalog_snapshot()
+            self._catalog_syncing = asyncio.create_task(self._sync_catalog_periodically())
+
+    async def shutdown(self):
+        """Останавливает фоновую синхронизацию каталога коктейлей и отменяет предзагрузку"""
+        if self._catalog_syncing is not None:
+            self._catalog_syncing.cancel()
+            await asyncio.gather(self._catalog_syncing, return_exceptions=True)
+            self._catalog_syncing = None
+        self.prefetcher.cancel()
+
+    async def sync_catalog(self):
+        """
+        Синхронизирует локальный поисковый индекс с каталогом коктейлей внешнего API
+
+        Индекс заменяется целиком, поэтому выполняющиеся поиски продолжают работать с предыдущей версией каталога.
+        Рецепты измененных и удаленных коктейлей удаляются из кэша. Если каталог изменился, сохраняется его снимок.
+
+        Raises:
+            TransportError: возбуждаемое исключение в случае ошибки соединения с внешним API
+            ResponseError: возбуждаемое исключение в случае ошибочного ответа внешнего API
+        """
+        previous_index = self.catalog_index
+        self.catalog_index = await self.catalog_synchronizer.sync(self.api_client, previous_index)
+        if self.catalog_index is not previous_index:
+            self.inline_results_cache.clear()
+        changes = self.catalog_synchronizer.last_changes
+        for cocktail_id in changes.changed | changes.removed:
+            self.invalidate_cocktail_recipe(cocktail_id)
+
+        if settings.COCKTAIL_CATALOG_SNAPSHOT_PATH and self.catalog_index is not previous_index:
+            try:
+                await asyncio.to_thread(write_snapshot, settings.COCKTAIL_CATALOG_SNAPSHOT_PATH, self.catalog_index)
+            except OSError:
+                logger.exception('Failed to write the cocktail catalog snapshot')
+
+    def restore_catalog_snapshot(self):
+        """Восстанавливает локальный поисковый индекс из снимка каталога коктейлей, если он существует"""
+        snapshot_path = settings.COCKTAIL_CATALOG_SNAPSHOT_PATH
+        if not snapshot_path or not os.path.exists(snapshot_path):
+            return
+
+        try:
+            snapshot = read_snapshot(snapshot_path, settings.COCKTAIL_CATALOG_FUZZY_THRESHOLD)
+        except (OSError, CatalogSnapshotError):
+            logger.exception('Failed to restore the cocktail catalog snapshot')
+            return
+
+        self.catalog_index = snapshot.index
+        self.catalog_synchronizer.restore(snapshot.index)
+        self.inline_results_cache.clear()
+        logger.info('Cocktail catalog index restored from the snapshot: %s cocktails, %.0f s old',
+                    len(snapshot.index), time.time() - snapshot.created_at)
+
+    async def _sync_catalog_periodically(self):
+        while True:
+            try:
+                await self.sync_catalog()
+            except Exception:
+                # Ошибка одной синхронизации не должна останавливать фоновую задачу: следующая попытка может пройти
+                logger.exception('Failed to synchronize the cocktail catalog')
+            await asyncio.sleep(settings.COCKTAIL_CATALOG_SYNC_INTERVAL)
+
+    @staticmethod
+    def _is_external_api_failure(ex: Exception) -> bool:
+        if isinstance(ex, cs_exception.TransportError):
+            return True
+
+        # Ошибки авторизации, ограничения частоты и другие ошибки 4xx не скрываются устаревшими данными
+        return (
+            isinstance(ex, cs_exception.ResponseError)
+            and ex.status_code is not None
+            and ex.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        )
 
     async def get_cocktail_message(self,
                                    search: Optional[str] = None,
-                                   page: int = 1) -> TelegramMessage:
+                                   page: int = 1,
+                                   chat_id: Optional[int] = None) -> TelegramMessage:
         """
         Получает сообщение, содержащее коктейль
 
+        Если каталог коктейлей загружен в локальный поисковый индекс, поиск выполняется по нему без обращения к
+        внешнему API. Иначе коктейли запрашиваются у внешнего API окнами по COCKTAIL_SEARCH_WINDOW_SIZE штук, страница
+        сообщения вырезается из закэшированного окна. Запросы, недавно вернувшие пустой список коктейлей, не
+        отправляются во внешний API повторно. Если указан чат, после получения сообщения в фоне предзагружаются
+        следующая страница и рецепт показанного коктейля. Предзагрузка предыдущего поиска чата при этом отменяется.
+
         Args:
             search: строка запроса поиска коктейлей
             page: номер страницы
+            chat_id: идентификатор чата, в котором выполняется поиск
 
         Raises:
             ConnectionToExternalAPIError: возбуждаемое исключение в случае ошибки соединения с внешним API
             CocktailNotFoundError: возбуждаемое исключение в случае отсутствия коктейля
         """
+        search = self.normalize_search_query(search)
+        if self.catalog_index is not None:
+            records = self.catalog_index.search(search)
+            if page > len(records):
+                raise exceptions.CocktailNotFoundError("The catalog index returned an empty cocktail list")
+            cocktail, total_pages = self._get_catalog_cocktail(records[page - 1]), len(records)
+            window_prefetch_factories = {}
+        else:
+            cocktail, total_pages, window_prefetch_factories = await self._get_cocktail_from_external_api(search, page)
+
+        message = self._get_cocktail_card_message(CocktailView.SEARCH, cocktail, page, total_pages)
+
+        if chat_id is not None:
+            self.prefetcher.schedule(('search', chat_id), {
+                ('recipe', cocktail.id): lambda: self._get_cocktail_recipe(cocktail.id),
+                **window_prefetch_factories
+            })
+
+        return message
+
+    async def _get_cocktail_from_external_api(
+            self,
+            search: Optional[str],
+            page: int
+    ) -> Tuple[Cocktail, int, Dict[Hashable, Callable[[], Awaitable]]]:
+        if search in self.empty_searches_cache:
+            raise exceptions.CocktailNotFoundError("The search query recently returned an empty cocktail list")
+
+        window_size = settings.COCKTAIL_SEARCH_WINDOW_SIZE
+        window_page, offset = divmod(page - 1, window_size)
         try:
-            response = await self.api_client.get_cocktails(search, page, COCKTAIL_PAGE_SIZE)
+            response = await self._get_cocktails_window(search, window_page + 1)
         except cs_exception.TransportError as ex:
             raise exceptions.ConnectionToExternalAPIError(ex)
 
-        if not response.results:
+        if not response.count:
+            self.empty_searches_cache.add(search)
+        if offset >= len(response.results):
             raise exceptions.CocktailNotFoundError("The external API returned an empty cocktail list")
 
-        cocktail = response.results[0]
-        text = self._build_cocktail_message_text(cocktail)
-        reply_markup = self._build_cocktail_reply_markup(cocktail.id, page, response.total_pages)
+        prefetch_factories = {}
+        next_window_page = page // window_size + 1
+        if page < response.count and next_window_page != window_page + 1:
+            prefetch_factories[('cocktails', next_window_page)] = lambda: self._get_cocktails_window(
+                search, next_window_page
+            )
+
+        return response.results[offset], response.count, prefetch_factories
+
+    async def _get_cocktails_window(self, search: Optional[str], window_page: int) -> PagePagination[Cocktail]:
+        window_size = settings.COCKTAIL_SEARCH_WINDOW_SIZE
+
+        return await self.cocktails_cache.get_or_set(
+            (search, window_page, window_size),
+            lambda: self._fetch_cocktails_window(search, window_page, window_size)
+        )
+
+    async def _fetch_cocktails_window(self,
+                                      search: Optional[str],
+                                      window_page: int,
+                                      window_size: int) -> PagePagination[Cocktail]:
+        response = await self.api_client.get_cocktails(search, window_page, window_size)
+        response.results = self.cocktail_store.put_many(response.results)
+
+        return response
+
+    def normalize_search_query(self, search: Optional[str]) -> Optional[str]:
+        """
+        Приводит строку запроса поиска коктейлей к нормализованному виду
+
+        Одинаковые по смыслу запросы, отличающиеся регистром, пробелами, буквой «ё», похожими латинскими и
+        кириллическими буквами или синонимами из COCKTAIL_SEARCH_SYNONYMS, приводятся к одной строке и разделяют записи
+        кэшей.
+
+        Args:
+            search: строка запроса поиска коктейлей
+
+        Returns:
+            Нормализованная строка запроса или None, если запрос пуст
+        """
+        return normalize_search_query(search, self.search_synonyms)
+
+    async def get_ingredient_cocktail_message(self,
+                                              ingredients: List[str],
+                                              page: int = 1,
+                                              chat_id: Optional[int] = None) -> TelegramMessage:
+        """
+        Получает сообщение, содержащее коктейль, который можно приготовить из имеющихся ингредиентов
+
+        Коктейли ищутся в локальном поисковом индексе. Если у коктейля не хватает не более
+        COCKTAIL_INGREDIENT_SEARCH_MAX_MISSING ингредиентов, недостающие ингредиенты перечисляются в сообщении. Если
+        указан чат, в фоне предзагружается рецепт показанного коктейля.
+
+        Args:
+            ingredients: названия имеющихся ингредиентов
+            page: номер страницы
+            chat_id: идентификатор чата, в котором выполняется поиск
+
+        Raises:
+            CatalogUnavailableError: возбуждаемое исключение в случае, если каталог коктейлей еще не загружен
+            CocktailNotFoundError: возбуждаемое исключение в случае отсутствия коктейля
+        """
+        if self.catalog_index is None:
+            raise exceptions.CatalogUnavailableError('The cocktail catalog is not loaded yet')
+
+        matches = self.catalog_index.ingredients.search(ingredients, settings.COCKTAIL_INGREDIENT_SEARCH_MAX_MISSING)
+        if page > len(matches):
+            raise exceptions.CocktailNotFoundError("The catalog index returned an empty cocktail list")
+
+        record, missing_ingredients = matches[page - 1]
+        cocktail = self._get_catalog_cocktail(record)
+        if missing_ingredients:
+            message = TelegramMessage(
+                self._build_cocktail_message_text(cocktail, missing_ingredients),
+                self._build_cocktail_reply_markup(cocktail.id, page, len(matches)),
+                ParseMode.HTML
+            )
+        else:
+            message = self._get_cocktail_card_message(CocktailView.SEARCH, cocktail, page, len(matches))
+
+        if chat_id is not None:
+            self.prefetcher.schedule(('search', chat_id), {
+                ('recipe', cocktail.id): lambda: self._get_cocktail_recipe(cocktail.id)
+            })
+
+        return message
+
+    def get_inline_search_results(self, search: str, offset: int = 0) -> InlineSearchResults:
+        """
+        Получает результаты inline-поиска коктейлей
+
+        Поиск выполняется только в локальном поисковом индексе, поскольку inline-запросы поступают при вводе каждого
+        символа. Результаты кэшируются по нормализованному запросу и смещению на COCKTAIL_INLINE_CACHE_TTL секунд, но не
+        дольше следующей синхронизации каталога. Если каталог еще не загружен, результаты пусты.
 
-        return TelegramMessage(text, reply_markup, ParseMode.HTML)
+        Args:
+            search: строка запроса поиска коктейлей
+            offset: смещение первого результата
+
+        Returns:
+            Не более COCKTAIL_INLINE_RESULTS_LIMIT результатов и смещение следующей страницы результатов
+        """
+        if self.catalog_index is None:
+            return InlineSearchResults([])
+
+        search = self.normalize_search_query(search)
+        if (inline_results := self.inline_results_cache.get((search, offset))) is not None:
+            return inline_results
+
+        records = self.catalog_index.search(search)
+        next_offset = offset + settings.COCKTAIL_INLINE_RESULTS_LIMIT
+        inline_results = InlineSearchResults(
+            [
+                self._build_inline_search_result(self._get_catalog_cocktail(record))
+                for record in records[offset:next_offset]
+            ],
+            str(next_offset) if next_offset < len(records) else ''
+        )
+        self.inline_results_cache.set((search, offset), inline_results)
+
+        return inline_results
+
+    def _get_catalog_cocktail(self, record: CocktailRecord) -> Cocktail:
+        cocktail = self.cocktail_store.get(record.id)
+        if cocktail is None or not record.describes(cocktail):
+            cocktail = self.cocktail_store.put(record.to_cocktail())
+
+        return cocktail
+
+    def _build_inline_search_result(self, cocktail: Cocktail) -> InlineQueryResultArticle:
+        return InlineQueryResultArticle(
+            id=str(cocktail.id),
+            title=cocktail.name,
+            description=', '.join(composition.ingredient_name for composition in cocktail.composition),
+            thumb_url=cocktail.image_url,
+            input_message_content=InputTextMessageContent(
+                message_text=self._build_cocktail_message_text(cocktail),
+                parse_mode=ParseMode.HTML
+            )
+        )
 
     async def get_favorite_cocktail_message(self,
                                             telegram_user_id: int,
@@ -78,7 +415,7 @@ class CocktailSearcherService:
                 Telegram
         """
         try:
-            response = await self.api_client.get_favorite_cocktails(telegram_user_id, page, COCKTAIL_PAGE_SIZE)
+            response = await self._get_favorite_cocktails(telegram_user_id, page)
         except cs_exception.TransportError as ex:
             raise exceptions.ConnectionToExternalAPIError(ex)
         except cs_exception.NotFoundError:
@@ -88,21 +425,61 @@ class CocktailSearcherService:
             raise exceptions.CocktailNotFoundError("The external API returned an empty favorite cocktail list")
 
         favorite = response.results[0]
-        text = self._build_cocktail_message_text(favorite.cocktail)
-        reply_markup = self._build_favorite_cocktail_reply_markup(
-            cocktail_id=favorite.cocktail.id,
-            favorite_id=favorite.id,
-            page=page,
-            total_pages=response.total_pages
+        cocktail_id = favorite.cocktail.id
+        message = self._get_cocktail_card_message(
+            CocktailView.FAVORITE, favorite.cocktail, page, response.total_pages, favorite.id
         )
 
-        return TelegramMessage(text, reply_markup, ParseMode.HTML)
+        prefetch_factories = {('recipe', cocktail_id): lambda: self._get_cocktail_recipe(cocktail_id)}
+        if page < response.total_pages:
+            prefetch_factories[('favorites', page + 1)] = lambda: self._get_favorite_cocktails(
+                telegram_user_id, page + 1
+            )
+        self.prefetcher.schedule(('favorites', telegram_user_id), prefetch_factories)
+
+        return message
+
+    async def _get_favorite_cocktails(self, telegram_user_id: int, page: int) -> PagePagination[TelegramUserFavorite]:
+        return await self.favorites_cache.get_or_set(
+            (telegram_user_id, page, COCKTAIL_PAGE_SIZE),
+            lambda: self._fetch_favorite_cocktails(telegram_user_id, page)
+        )
+
+    async def _fetch_favorite_cocktails(self, telegram_user_id: int, page: int) -> PagePagination[TelegramUserFavorite]:
+        response = await self.api_client.get_favorite_cocktails(telegram_user_id, page, COCKTAIL_PAGE_SIZE)
+        for favorite in response.results:
+            favorite.cocktail = self.cocktail_store.put(favorite.cocktail)
+
+        return response
+
+    def _get_cocktail_card_message(self,
+                                   view: CocktailView,
+                                   cocktail: Cocktail,
+                                   page: int,
+                                   total_pages: int,
+                                   favorite_id: Optional[int] = None) -> TelegramMessage:
+        text = self.cocktail_store.get_card(cocktail)
+        key = (TEMPLATES_VERSION, cocktail.id, page, total_pages, view, favorite_id)
+        message = self.messages_cache.get(key)
+        if message is not None and message.text is text:
+            return message
+
+        if view is CocktailView.FAVORITE:
+            reply_markup = self._build_favorite_cocktail_reply_markup(cocktail.id, favorite_id, page, total_pages)
+        else:
+            reply_markup = self._build_cocktail_reply_markup(cocktail.id, page, total_pages)
+        message = TelegramMessage(text, reply_markup, ParseMode.HTML)
+        self.messages_cache.set(key, message)
+
+        return message
+
+    def _build_cocktail_message_text(self, cocktail: Cocktail, missing_ingredients: Optional[List[str]] = None) -> str:
+        if not missing_ingredients:
+            return self.cocktail_store.get_card(cocktail)
 
-    @staticmethod
-    def _build_cocktail_message_text(cocktail: Cocktail) -> str:
         template = jinja2.get_template('cocktail.html')
 
-        return template.render(cocktail=cocktail)
+        return template.render(cocktail=cocktail, missing_ingredients=missing_ingredients)
 
     @staticmethod
     def _build_cocktail_reply_markup(cocktail_id: int, page: int, total_pages: int) -> InlinePaginationKeyboardMarkup:
@@ -113,7 +490,9 @@ class CocktailSearcherService:
                                  callback_data=AddFavoriteCallback(cocktail_id=cocktail_id).pack()),
         ]
 
-        return InlinePaginationKeyboardMarkup(total_pages, page, [additional_buttons])
+        return InlinePaginationKeyboardMarkup(
+            total_pages, page, [additional_buttons, *CocktailSearcherService._build_similar_buttons(cocktail_id)]
+        )
 
     @staticmethod
     def _build_favorite_cocktail_reply_markup(cocktail_id: int, favorite_id: int, page: int, total_pages: int):
@@ -124,12 +503,47 @@ class CocktailSearcherService:
                                  callback_data=RemoveFavorite(favorite_id=favorite_id).pack()),
         ]
 
-        return InlinePaginationKeyboardMarkup(total_pages, page, [additional_buttons])
+        return InlinePaginationKeyboardMarkup(
+            total_pages, page, [additional_buttons, *CocktailSearcherService._build_similar_buttons(cocktail_id)]
+        )
+
+    @staticmethod
+    def _build_similar_buttons(cocktail_id: int) -> List[List[InlineKeyboardButton]]:
+        if not settings.COCKTAIL_CATALOG_ENABLED:
+            return []
+
+        return [[InlineKeyboardButton(text='Похожие коктейли',
+                                      callback_data=SimilarCallback(cocktail_id=cocktail_id).pack())]]
+
+    def get_similar_cocktails_message(self, cocktail_id: int) -> TelegramMessage:
+        """
+        Получает сообщение, содержащее коктейли, похожие на коктейль по ингредиентам и категориям
+
+        Похожие коктейли вычисляются заранее при построении локального поискового индекса.
+
+        Args:
+            cocktail_id: идентификатор коктейля
+
+        Raises:
+            CatalogUnavailableError: возбуждаемое исключение в случае, если каталог коктейлей еще не загружен
+            CocktailNotFoundError: возбуждаемое исключение в случае отсутствия похожих коктейлей
+        """
+        if self.catalog_index is None:
+            raise exceptions.CatalogUnavailableError('The cocktail catalog is not loaded yet')
+
+        if not (cocktails := self.catalog_index.similar.similar(cocktail_id)):
+            raise exceptions.CocktailNotFoundError(f'There are no cocktails similar to the cocktail {cocktail_id}')
+
+        text = jinja2.get_template('similar.html').render(cocktails=cocktails)
+
+        return TelegramMessage(text, BACK_REPLY_MARKUP, ParseMode.HTML)
 
     async def get_cocktail_recipe_message(self, cocktail_id: int) -> TelegramMessage:
         """
         Получает сообщение, содержащее рецепт коктейля
 
+        Рецепты и их отрисованный текст кэшируются по идентификатору коктейля, в том числе отсутствие рецепта.
+
         Args:
             cocktail_id: идентификатор коктейля
 
@@ -139,21 +553,42 @@ class CocktailSearcherService:
             CocktailRecipeNotFoundError: возбуждаемое исключение в случае отсутствия рецепта у коктейля
         """
         try:
-            recipe = await self.api_client.get_cocktail_recipe(cocktail_id)
+            recipe = await self._get_cocktail_recipe(cocktail_id)
         except cs_exception.TransportError as ex:
             raise exceptions.ConnectionToExternalAPIError(ex)
         except cs_exception.NotFoundError:
             raise exceptions.CocktailNotFoundError(f'Cocktail with ID {cocktail_id} not found.')
 
-        if not recipe:
+        if not recipe.stages:
             raise exceptions.CocktailRecipeNotFoundError('There is no cocktail recipe yet')
 
-        text = self._build_recipe_message_text(recipe)
-        reply_markup = InlineKeyboardMarkup(
-            inline_keyboard=[[InlineKeyboardButton(text='Назад', callback_data='back')]]
+        return TelegramMessage(recipe.text, BACK_REPLY_MARKUP, ParseMode.HTML)
+
+    def invalidate_cocktail_recipe(self, cocktail_id: Optional[int] = None):
+        """
+        Удаляет рецепт коктейля из кэша
+
+        Args:
+            cocktail_id: идентификатор коктейля. Если не указан, из кэша удаляются все рецепты
+        """
+        if cocktail_id is None:
+            self.recipes_cache.invalidate_where(lambda key: True)
+        else:
+            self.recipes_cache.invalidate(cocktail_id)
+
+    async def _get_cocktail_recipe(self, cocktail_id: int) -> CocktailRecipe:
+        return await self.recipes_cache.get_or_set(
+            cocktail_id,
+            lambda: self._fetch_cocktail_recipe(cocktail_id),
+            lambda recipe: None if recipe.stages else settings.COCKTAIL_RECIPE_NOT_FOUND_CACHE_TTL
         )
 
-        return TelegramMessage(text, reply_markup, ParseMode.HTML)
+    async def _fetch_cocktail_recipe(self, cocktail_id: int) -> CocktailRecipe:
+        stages = await self.api_client.get_cocktail_recipe(cocktail_id)
+        if not stages:
+            return CocktailRecipe(stages)
+
+        return CocktailRecipe(stages, self._build_recipe_message_text(stages))
 
     @staticmethod
     def _build_recipe_message_text(recipe: List[CookingStage]) -> str:
@@ -175,6 +610,9 @@ class CocktailSearcherService:
         Returns:
             Идентификатор пользователя Telegram
         """
+        if (telegram_user_id := self.telegram_user_ids_cache.get(chat_id)) is not None:
+            return telegram_user_id
+
         try:
             response = await self.api_client.get_telegram_users(chat_id)
         except cs_exception.TransportError as ex:
@@ -183,7 +621,38 @@ class CocktailSearcherService:
         if not response.results:
             raise exceptions.TelegramUserNotFoundError(f'Telegram user with chat ID {chat_id} not found')
 
-        return response.results[0].id
+        telegram_user_id = response.results[0].id
+        self.telegram_user_ids_cache.set(chat_id, telegram_user_id)
+
+        return telegram_user_id
+
+    async def get_or_create_telegram_user_id(self, chat_id: int) -> int:
+        """
+        Получает идентификатор пользователя Telegram, создавая пользователя в случае его отсутствия
+
+        Одновременные вызовы для одного chat_id выполняют единственную операцию получения или создания пользователя.
+
+        Args:
+            chat_id: идентификатор чата пользователя Telegram
+
+        Raises:
+            ConnectionToExternalAPIError: возбуждаемое исключение в случае ошибки соединения с внешним API
+
+        Returns:
+            Идентификатор пользователя Telegram
+        """
+        return await self.telegram_user_ids_cache.get_or_set(chat_id, lambda: self._provision_telegram_user(chat_id))
+
+    async def _provision_telegram_user(self, chat_id: int) -> int:
+        try:
+            return await self.get_telegram_user_id(chat_id)
+        except exceptions.TelegramUserNotFoundError:
+            pass
+
+        try:
+            return await self.create_telegram_user(chat_id)
+        except exceptions.TelegramUserAlreadyExists:
+            return await self.get_telegram_user_id(chat_id)
 
     async def create_telegram_user(self, chat_id: int) -> int:
         """
@@ -213,6 +682,8 @@ class CocktailSearcherService:
                     raise exceptions.TelegramUserAlreadyExists(f'Telegram user with chat ID {chat_id} already exists.')
             raise
 
+        self.telegram_user_ids_cache.set(chat_id, telegram_user.id)
+
         return telegram_user.id
 
     async def add_cocktail_to_favorites(self, telegram_user_id: int, cocktail_id: int):
@@ -228,6 +699,7 @@ class CocktailSearcherService:
             CocktailAlreadyInFavoritesError: возбуждаемое исключение в случае наличия коктейля в избранном пользователя
                 Telegram
         """
+        self._invalidate_favorites(telegram_user_id)
         try:
             await self.api_client.add_cocktail_to_favorites(telegram_user_id, cocktail_id)
         except cs_exception.TransportError as ex:
@@ -240,21 +712,35 @@ class CocktailSearcherService:
                 if error == not_unique_set_error:
                     raise exceptions.CocktailAlreadyInFavoritesError('Cocktail already in the Telegram user favorites')
             raise
+        finally:
+            self._invalidate_favorites(telegram_user_id)
 
-    async def remove_cocktail_from_favorites(self, favorite_id: int):
+    async def remove_cocktail_from_favorites(self, favorite_id: int, telegram_user_id: int):
         """
         Удаляет коктейль из избранного
 
         Args:
             favorite_id: идентификатор избранного
+            telegram_user_id: идентификатор пользователя Telegram, которому принадлежит избранное
 
         Raises:
             ConnectionToExternalAPIError: возбуждаемое исключение в случае ошибки соединения с внешним API
             FavoriteNotFoundError: возбуждаемое исключение в случае отсутствия избранного с указанным favorite_id
         """
+        self._invalidate_favorites(telegram_user_id)
         try:
             await self.api_client.remove_cocktail_from_favorites(favorite_id)
         except cs_exception.TransportError as ex:
             raise exceptions.ConnectionToExternalAPIError(ex)
         except cs_exception.NotFoundError:
             raise exceptions.FavoriteNotFoundError(f'Favorites with ID {favorite_id} not found')
+        finally:
+            self._invalidate_favorites(telegram_user_id)
+
+    def _invalidate_favorites(self, telegram_user_id: int):
+        # Вызывается до и после изменения избранного: страница, полученная во время изменения, может быть устаревшей
+        self.prefetcher.schedule(('favorites', telegram_user_id), {})
+        self.favorites_cache.invalidate_where(lambda key: key[0] == telegram_user_id)
+
+
+cocktail_searcher_service = CocktailSearcherService()
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+from bot.clients.cocktail_searcher.models import Cocktail
+
+
+class CocktailEntry:
+    __slots__ = ('cocktail', 'card')
+
+    def __init__(self, cocktail: Cocktail, card: Optional[str] = None):
+        self.cocktail = cocktail
+        self.card = card
+
+
+class CocktailStore:
+    """Хранилище коктейлей, общее для результатов поиска, избранного и рекомендаций
+
+    Хранит по одному экземпляру коктейля на идентификатор вместе с отрисованной карточкой коктейля. Коктейли,
+    полученные разными путями, заменяются сохраненным экземпляром с тем же содержимым, а карточка отрисовывается один
+    раз, пока содержимое коктейля не изменится. При превышении размера вытесняются наиболее давно использованные
+    коктейли.
+
+    Attributes:
+        maxsize: максимальное количество коктейлей
+        render_card: функция отрисовки карточки коктейля
+        shared: количество коктейлей, замененных сохраненным экземпляром
+        renders: количество отрисовок карточек
+        card_hits: количество карточек, полученных без отрисовки
+    """
+
+    def __init__(self, maxsize: int, render_card: Callable[[Cocktail], str]):
+        self.maxsize = maxsize
+        self.render_card = render_card
+        self.shared = 0
+        self.renders = 0
+        self.card_hits = 0
+        self._entries: OrderedDict[int, CocktailEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, cocktail_id: int) -> bool:
+        return cocktail_id in self._entries
+
+    def get(self, cocktail_id: int) -> Optional[Cocktail]:
+        """Получает коктейль по идентификатору
+
+        Args:
+            cocktail_id: идентификатор коктейля
+        """
+        entry = self._entries.get(cocktail_id)
+
+        return entry.cocktail if entry is not None else None
+
+    def put(self, cocktail: Cocktail) -> Cocktail:
+        """Сохраняет коктейль, полученный из ответа внешнего API
+
+        Args:
+            cocktail: коктейль
+
+        Returns:
+            Сохраненный экземпляр коктейля с тем же содержимым, если он есть, иначе - переданный коктейль
+        """
+        entry = self._entries.get(cocktail.id)
+        if entry is not None and (entry.cocktail is cocktail or entry.cocktail == cocktail):
+            self._entries.move_to_end(cocktail.id)
+            if entry.cocktail is not cocktail:
+                self.shared += 1
+            return entry.cocktail
+
+        self._set_entry(CocktailEntry(cocktail))
+
+        return cocktail
+
+    def put_many(self, cocktails: Iterable[Cocktail]) -> List[Cocktail]:
+        """Сохраняет коктейли, полученные из ответа внешнего API
+
+        Args:
+            cocktails: коктейли
+
+        Returns:
+            Сохраненные экземпляры коктейлей
+        """
+        return [self.put(cocktail) for cocktail in cocktails]
+
+    def get_card(self, cocktail: Cocktail) -> str:
+        """Получает отрисованную карточку коктейля, отрисовывая ее при первом обращении
+
+        Args:
+            cocktail: коктейль
+        """
+        self.put(cocktail)
+        entry = self._entries.get(cocktail.id)
+        if entry is None:
+            self.renders += 1
+            return self.render_card(cocktail)
+
+        if entry.card is None:
+            self.renders += 1
+            entry.card = self.render_card(entry.cocktail)
+        else:
+            self.card_hits += 1
+
+        return entry.card
+
+    def clear(self):
+        """Удаляет все коктейли и сбрасывает счетчики"""
+        self._entries.clear()
+        self.shared = 0
+        self.renders = 0
+        self.card_hits = 0
+
+    def _set_entry(self, entry: CocktailEntry):
+        if self.maxsize <= 0:
+            return
+
+        self._entries[entry.cocktail.id] = entry
+        self._entries.move_to_end(entry.cocktail.id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional
+from typing import Optional, Dict, Literal
 
 import sentry_sdk
 from pydantic import BaseSettings, AnyHttpUrl
@@ -11,6 +11,57 @@ class Settings(BaseSettings):
     COCKTAIL_SEARCHER_URL: AnyHttpUrl
     COCKTAIL_SEARCHER_API_TOKEN: str
     SENTRY_DSN: Optional[AnyHttpUrl]
+    COCKTAIL_SEARCHER_MAX_CONNECTIONS: int = 100
+    COCKTAIL_SEARCHER_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    COCKTAIL_SEARCHER_KEEPALIVE_EXPIRY: float = 30.0
+    COCKTAIL_SEARCHER_MAX_RETRIES: int = 2
+    COCKTAIL_SEARCHER_RETRY_BACKOFF_BASE: float = 0.1
+    COCKTAIL_SEARCHER_RETRY_BACKOFF_MAX: float = 1.0
+    COCKTAIL_SEARCHER_RETRY_BUDGET_RATIO: float = 0.1
+    COCKTAIL_SEARCHER_RETRY_BUDGET_MAX_TOKENS: float = 10.0
+    COCKTAIL_SEARCHER_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    COCKTAIL_SEARCHER_CIRCUIT_RECOVERY_TIMEOUT: float = 30.0
+    COCKTAIL_SEARCHER_CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+    COCKTAIL_SEARCHER_STRICT_DECODING: bool = False
+    COCKTAIL_CACHE_MAXSIZE: int = 1024
+    COCKTAIL_CACHE_TTL: float = 300.0
+    COCKTAIL_CACHE_STALE_TTL: float = 3600.0
+    COCKTAIL_ENTITY_STORE_MAXSIZE: int = 10000
+    COCKTAIL_MESSAGE_CACHE_MAXSIZE: int = 4096
+    COCKTAIL_MESSAGE_CACHE_TTL: float = 3600.0
+    COCKTAIL_SEARCH_WINDOW_SIZE: int = 20
+    COCKTAIL_SEARCH_SYNONYMS: Dict[str, str] = {}
+    COCKTAIL_EMPTY_SEARCH_CACHE_CAPACITY: int = 10000
+    COCKTAIL_EMPTY_SEARCH_CACHE_TTL: float = 60.0
+    COCKTAIL_EMPTY_SEARCH_CACHE_FALSE_POSITIVE_RATE: float = 0.01
+    COCKTAIL_FAVORITES_CACHE_TTL: float = 60.0
+    COCKTAIL_PREFETCH_MAX_TASKS: int = 32
+    COCKTAIL_RECIPE_CACHE_MAXSIZE: int = 4096
+    COCKTAIL_RECIPE_CACHE_TTL: float = 86400.0
+    COCKTAIL_RECIPE_CACHE_STALE_TTL: float = 604800.0
+    COCKTAIL_RECIPE_NOT_FOUND_CACHE_TTL: float = 600.0
+    TELEGRAM_USER_CACHE_MAXSIZE: int = 100000
+    TELEGRAM_USER_CACHE_TTL: float = 604800.0
+    COCKTAIL_CATALOG_ENABLED: bool = False
+    COCKTAIL_CATALOG_PAGE_SIZE: int = 100
+    COCKTAIL_CATALOG_FUZZY_THRESHOLD: float = 0.5
+    COCKTAIL_CATALOG_SYNC_INTERVAL: float = 600.0
+    COCKTAIL_CATALOG_SYNC_CONCURRENCY: int = 4
+    COCKTAIL_CATALOG_SNAPSHOT_PATH: Optional[str] = None
+    COCKTAIL_INGREDIENT_SEARCH_MAX_MISSING: int = 2
+    COCKTAIL_SIMILAR_TOP_K: int = 5
+    COCKTAIL_INLINE_RESULTS_LIMIT: int = 20
+    COCKTAIL_INLINE_CACHE_MAXSIZE: int = 4096
+    COCKTAIL_INLINE_CACHE_TTL: float = 600.0
+    COCKTAIL_INLINE_CACHE_TIME: int = 300
+    COCKTAIL_INLINE_DEBOUNCE_DELAY: float = 0.0
+    FSM_STORAGE: Literal['memory', 'redis'] = 'memory'
+    FSM_REDIS_URL: Optional[str] = None
+    FSM_REDIS_MAX_CONNECTIONS: int = 10
+    FSM_REDIS_KEY_PREFIX: str = 'fsm'
+    FSM_STATE_TTL: Optional[float] = 2592000.0
+    FSM_MEMORY_MAXSIZE: int = 100000
+    FSM_MEMORY_MAX_BYTES: Optional[int] = 67108864
 
     class Config:
         env_file = '.env'
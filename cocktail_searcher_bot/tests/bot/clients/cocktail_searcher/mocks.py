@@ -27,6 +27,34 @@ COCKTAIL_RESPONSE = {
     ]
 }
 
+COCKTAIL_WINDOW_RESPONSE = {
+    "count": 3,
+    "total_pages": 1,
+    "next": None,
+    "previous": None,
+    "results": [
+        {
+            "id": cocktail_id,
+            "name": f"string {cocktail_id}",
+            "image_url": "https://example.com/cocktail_image.jpg",
+            "categories": [
+                {
+                    "id": 1,
+                    "name": "string"
+                }
+            ],
+            "composition": [
+                {
+                    "ingredient_name": "string",
+                    "amount": 32767,
+                    "unit_name": "string"
+                }
+            ]
+        }
+        for cocktail_id in range(1, 4)
+    ]
+}
+
 PAGINATION_EMPTY_RESPONSE_RESULT = {
     "count": 0,
     "total_pages": 1,
@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+import pytest
+
+from bot.clients.cocktail_searcher import exceptions
+from bot.clients.cocktail_searcher.circuit_breaker import CircuitBreaker, CircuitState
+
+
+class TestCircuitBreaker:
+    def setup_method(self):
+        self.circuit_breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30, half_open_max_calls=1)
+
+    def _open(self):
+        with patch('bot.clients.cocktail_searcher.circuit_breaker.time.monotonic', return_value=0):
+            for _ in range(self.circuit_breaker.failure_threshold):
+                self.circuit_breaker.before_request()
+                self.circuit_breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.circuit_breaker.record_failure()
+        self.circuit_breaker.record_success()
+        self.circuit_breaker.record_failure()
+        assert self.circuit_breaker.state == CircuitState.CLOSED
+
+        self.circuit_breaker.record_failure()
+        assert self.circuit_breaker.state == CircuitState.OPEN
+
+    def test_rejects_requests_when_open(self):
+        self._open()
+
+        with patch('bot.clients.cocktail_searcher.circuit_breaker.time.monotonic', return_value=29):
+            with pytest.raises(exceptions.CircuitOpenError):
+                self.circuit_breaker.before_request()
+        assert self.circuit_breaker.rejected == 1
+
+    @pytest.mark.parametrize('trial_succeeded, state', [(True, CircuitState.CLOSED), (False, CircuitState.OPEN)])
+    def test_half_open_trial_request(self, trial_succeeded, state):
+        self._open()
+
+        with patch('bot.clients.cocktail_searcher.circuit_breaker.time.monotonic', return_value=30):
+            self.circuit_breaker.before_request()
+            assert self.circuit_breaker.state == CircuitState.HALF_OPEN
+            with pytest.raises(exceptions.CircuitOpenError):
+                self.circuit_breaker.before_request()
+
+            if trial_succeeded:
+                self.circuit_breaker.record_success()
+            else:
+                self.circuit_breaker.record_failure()
+        assert self.circuit_breaker.state == state
+
+    def test_released_trial_request(self):
+        self._open()
+
+        with patch('bot.clients.cocktail_searcher.circuit_breaker.time.monotonic', return_value=30):
+            self.circuit_breaker.before_request()
+            self.circuit_breaker.release()
+            self.circuit_breaker.before_request()
+        assert self.circuit_breaker.state == CircuitState.HALF_OPEN
@@ -1,3 +1,4 @@
+import asyncio
 from http import HTTPStatus
 from typing import List
 from urllib.parse import urljoin
@@ -6,7 +7,9 @@ import pytest
 from pydantic import parse_obj_as
 
 from bot.clients.cocktail_searcher import exceptions
+from bot.clients.cocktail_searcher.circuit_breaker import CircuitBreaker, CircuitState, EndpointFamily
 from bot.clients.cocktail_searcher.client import CocktailSearcherClient
+from bot.clients.cocktail_searcher.retry import RetryPolicy, RetryBudget
 from bot.clients.cocktail_searcher.models import (
     PagePagination,
     Cocktail,
@@ -23,6 +26,13 @@ class TestCocktailSearcherClient:
     def setup_class(self):
         self.client = CocktailSearcherClient()
 
+    def setup_method(self):
+        self.client.retry_policy = RetryPolicy()
+        self.client.circuit_breakers = {
+            endpoint: CircuitBreaker(failure_threshold=3, recovery_timeout=60, half_open_max_calls=1)
+            for endpoint in EndpointFamily
+        }
+
     @pytest.mark.parametrize('response_mock', [mocks.COCKTAIL_RESPONSE, mocks.PAGINATION_EMPTY_RESPONSE_RESULT])
     @pytest.mark.parametrize('payload', [{}, {'search': 'test', 'page': 2, 'page_size': 1}])
     async def test_get_cocktails(self, httpx_mock, response_mock, payload):
@@ -206,3 +216,142 @@ class TestCocktailSearcherClient:
         )
         with pytest.raises(exceptions.TransportError):
             await self.client.remove_cocktail_from_favorites(favorite_id=favorite_id)
+
+    async def test_pooled_http_client(self, httpx_mock):
+        httpx_mock.add_response(
+            url=urljoin(self.client.base_url, self.client.cocktails_path),
+            status_code=HTTPStatus.OK,
+            json=mocks.COCKTAIL_RESPONSE
+        )
+        await CocktailSearcherClient.open_http_client()
+        http_client = CocktailSearcherClient.http_client
+        try:
+            await self.client.get_cocktails()
+            assert CocktailSearcherClient.http_client is http_client
+            assert not http_client.is_closed
+        finally:
+            await CocktailSearcherClient.close_http_client()
+
+        assert http_client.is_closed
+        assert CocktailSearcherClient.http_client is None
+
+    async def test_concurrent_identical_get_requests_coalesced(self, httpx_mock):
+        url = urljoin(self.client.base_url, self.client.cocktails_path)
+        payload = {'search': 'test', 'page': 1, 'page_size': 1}
+        httpx_mock.add_response(
+            url=add_query_params_in_url(url=url, query_params=payload),
+            status_code=HTTPStatus.OK,
+            json=mocks.COCKTAIL_RESPONSE
+        )
+        shared = self.client.in_flight_requests.shared
+
+        responses = await asyncio.gather(*(self.client.get_cocktails(**payload) for _ in range(5)))
+
+        assert len(httpx_mock.get_requests()) == 1
+        assert all(response == PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE) for response in responses)
+        assert self.client.in_flight_requests.shared - shared == 4
+
+    async def test_concurrent_identical_get_requests_coalesced_transport_error(self, httpx_mock):
+        httpx_mock.add_exception(
+            url=urljoin(self.client.base_url, self.client.cocktails_path),
+            exception=mocks.TRANSPORT_EXCEPTION
+        )
+
+        responses = await asyncio.gather(*(self.client.get_cocktails() for _ in range(3)), return_exceptions=True)
+
+        assert len(httpx_mock.get_requests()) == 1
+        assert all(isinstance(response, exceptions.TransportError) for response in responses)
+
+    @pytest.mark.parametrize('failure', [
+        {'exception': mocks.TRANSPORT_EXCEPTION},
+        {'status_code': HTTPStatus.SERVICE_UNAVAILABLE},
+    ])
+    async def test_idempotent_request_retried(self, httpx_mock, failure):
+        self.client.retry_policy = RetryPolicy(max_retries=2)
+        url = urljoin(self.client.base_url, self.client.cocktails_path)
+        if 'exception' in failure:
+            httpx_mock.add_exception(url=url, **failure)
+        else:
+            httpx_mock.add_response(url=url, **failure)
+        httpx_mock.add_response(url=url, status_code=HTTPStatus.OK, json=mocks.COCKTAIL_RESPONSE)
+
+        response = await self.client.get_cocktails()
+
+        assert response == PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE)
+        assert len(httpx_mock.get_requests()) == 2
+        assert sum(self.client.retry_policy.retries.values()) == 1
+
+    async def test_idempotent_request_retries_exhausted(self, httpx_mock):
+        self.client.retry_policy = RetryPolicy(max_retries=2)
+        httpx_mock.add_exception(
+            url=urljoin(self.client.base_url, self.client.cocktails_path),
+            exception=mocks.TRANSPORT_EXCEPTION
+        )
+
+        with pytest.raises(exceptions.TransportError):
+            await self.client.get_cocktails()
+        assert len(httpx_mock.get_requests()) == 3
+        assert self.client.retry_policy.retries == {'TransportError': 2}
+
+    async def test_non_idempotent_request_not_retried(self, httpx_mock):
+        self.client.retry_policy = RetryPolicy(max_retries=2)
+        httpx_mock.add_exception(
+            url=urljoin(self.client.base_url, self.client.telegram_user_path),
+            exception=mocks.TRANSPORT_EXCEPTION
+        )
+
+        with pytest.raises(exceptions.TransportError):
+            await self.client.create_telegram_user(chat_id=12345)
+        assert len(httpx_mock.get_requests()) == 1
+
+    async def test_client_error_not_retried(self, httpx_mock):
+        self.client.retry_policy = RetryPolicy(max_retries=2)
+        cocktail_id = 1
+        httpx_mock.add_response(
+            url=urljoin(self.client.base_url, self.client.cocktail_recipe_path.format(id=cocktail_id)),
+            status_code=HTTPStatus.NOT_FOUND
+        )
+
+        with pytest.raises(exceptions.NotFoundError):
+            await self.client.get_cocktail_recipe(cocktail_id=cocktail_id)
+        assert len(httpx_mock.get_requests()) == 1
+
+    async def test_retry_budget_exhausted(self, httpx_mock):
+        budget = RetryBudget(ratio=0, max_tokens=1)
+        self.client.retry_policy = RetryPolicy(max_retries=2, budget=budget)
+        httpx_mock.add_exception(
+            url=urljoin(self.client.base_url, self.client.cocktails_path),
+            exception=mocks.TRANSPORT_EXCEPTION
+        )
+
+        with pytest.raises(exceptions.TransportError):
+            await self.client.get_cocktails()
+        assert len(httpx_mock.get_requests()) == 2
+        assert budget.exhausted == 1
+
+    async def test_circuit_breaker_fails_fast_when_open(self, httpx_mock):
+        httpx_mock.add_exception(
+            url=urljoin(self.client.base_url, self.client.cocktails_path),
+            exception=mocks.TRANSPORT_EXCEPTION
+        )
+        for _ in range(3):
+            with pytest.raises(exceptions.TransportError):
+                await self.client.get_cocktails()
+
+        with pytest.raises(exceptions.CircuitOpenError):
+            await self.client.get_cocktails()
+        assert len(httpx_mock.get_requests()) == 3
+        assert self.client.circuit_breakers[EndpointFamily.COCKTAILS].state == CircuitState.OPEN
+        assert self.client.circuit_breakers[EndpointFamily.RECIPES].state == CircuitState.CLOSED
+
+    async def test_circuit_breaker_ignores_client_errors(self, httpx_mock):
+        favorite_id = 1
+        httpx_mock.add_response(
+            url=urljoin(self.client.base_url, f'{self.client.favorites_path}{favorite_id}/'),
+            status_code=HTTPStatus.NOT_FOUND
+        )
+        for _ in range(3):
+            with pytest.raises(exceptions.NotFoundError):
+                await self.client.remove_cocktail_from_favorites(favorite_id=favorite_id)
+
+        assert self.client.circuit_breakers[EndpointFamily.FAVORITES].state == CircuitState.CLOSED
@@ -0,0 +1,83 @@
+import copy
+from typing import List
+from unittest.mock import patch
+
+import orjson
+import pydantic.main
+import pytest
+from pydantic import AnyHttpUrl, ValidationError, parse_obj_as
+
+from bot.clients.cocktail_searcher.decoding import decode_response
+from bot.clients.cocktail_searcher.models import (
+    PagePagination,
+    Cocktail,
+    CookingStage,
+    TelegramUser,
+    TelegramUserFavorite,
+)
+from tests.bot.clients.cocktail_searcher import mocks
+
+
+@pytest.mark.parametrize('decoded_type, response_mock', [
+    (PagePagination[Cocktail], mocks.COCKTAIL_RESPONSE),
+    (PagePagination[Cocktail], mocks.PAGINATION_EMPTY_RESPONSE_RESULT),
+    (List[CookingStage], mocks.COCKTAIL_RECIPE_RESPONSE),
+    (PagePagination[TelegramUser], mocks.TELEGRAM_USER_RESPONSE),
+    (TelegramUser, mocks.CREATE_TELEGRAM_USER_RESPONSE),
+    (PagePagination[TelegramUserFavorite], mocks.TELEGRAM_USER_FAVORITE_RESPONSE),
+])
+@pytest.mark.parametrize('strict', [False, True])
+def test_decode_response(decoded_type, response_mock, strict):
+    response = decode_response(decoded_type, orjson.dumps(response_mock), strict)
+
+    assert response == parse_obj_as(decoded_type, response_mock)
+
+
+def test_decode_response_coerces_untyped_values():
+    response_mock = copy.deepcopy(mocks.COCKTAIL_RESPONSE)
+    response_mock['results'][0]['id'] = '1'
+
+    response = decode_response(PagePagination[Cocktail], orjson.dumps(response_mock))
+
+    assert response.results[0].id == 1
+
+
+@pytest.mark.parametrize('strict', [False, True])
+def test_decode_response_invalid(strict):
+    response_mock = copy.deepcopy(mocks.COCKTAIL_RESPONSE)
+    del response_mock['results'][0]['name']
+    response_mock['results'][0]['image_url'] = 'not a url'
+
+    with pytest.raises(ValidationError):
+        decode_response(PagePagination[Cocktail], orjson.dumps(response_mock), strict)
+
+
+def test_decode_response_url_types_match_strict_mode():
+    content = orjson.dumps(mocks.COCKTAIL_RESPONSE)
+
+    fast_response = decode_response(PagePagination[Cocktail], content)
+    strict_response = decode_response(PagePagination[Cocktail], content, strict=True)
+
+    assert type(fast_response.results[0].image_url) is type(strict_response.results[0].image_url) is AnyHttpUrl
+
+
+def test_decode_response_invalid_url():
+    response_mock = copy.deepcopy(mocks.COCKTAIL_RESPONSE)
+    response_mock['results'][0]['image_url'] = 'ftp://example.com/image.jpg'
+
+    with pytest.raises(ValidationError):
+        decode_response(PagePagination[Cocktail], orjson.dumps(response_mock))
+
+
+def test_fast_decoding_skips_model_validation():
+    cocktail = mocks.COCKTAIL_RESPONSE['results'][0]
+    content = orjson.dumps({**mocks.COCKTAIL_RESPONSE, 'results': [cocktail, {**cocktail, 'id': 2}]})
+
+    with patch('pydantic.main.validate_model', wraps=pydantic.main.validate_model) as validate_model:
+        decode_response(PagePagination[Cocktail], content, strict=True)
+        strict_validations = validate_model.call_count
+        validate_model.reset_mock()
+        decode_response(PagePagination[Cocktail], content)
+
+    assert strict_validations > 2
+    assert validate_model.call_count == 0
@@ -0,0 +1,112 @@
+import pytest
+
+from bot.clients.cocktail_searcher.models import Cocktail
+from bot.services.catalog.index import CatalogIndex
+from bot.services.catalog.records import CocktailRecord
+from bot.services.catalog.text import tokenize
+
+
+def build_cocktail(cocktail_id: int, name: str, categories: list, ingredients: list) -> Cocktail:
+    return Cocktail.parse_obj({
+        'id': cocktail_id,
+        'name': name,
+        'image_url': 'https://example.com/cocktail_image.jpg',
+        'categories': [{'name': category} for category in categories],
+        'composition': [
+            {'ingredient_name': ingredient, 'amount': 50, 'unit_name': 'мл'} for ingredient in ingredients
+        ],
+    })
+
+
+CATALOG = [
+    build_cocktail(1, 'Мохито', ['Освежающие'], ['Белый ром', 'Мята', 'Лайм', 'Содовая']),
+    build_cocktail(2, 'Куба Либре', ['Лонг дринки'], ['Белый ром', 'Кола', 'Лайм']),
+    build_cocktail(3, 'Маргарита', ['Классические'], ['Текила', 'Ликер трипл сек', 'Лайм']),
+    build_cocktail(4, 'Ёрш', ['Крепкие'], ['Водка', 'Пиво']),
+    build_cocktail(5, 'Ромовый пунш', ['Горячие'], ['Темный ром', 'Апельсиновый сок']),
+]
+RECORDS = [CocktailRecord.from_cocktail(cocktail) for cocktail in CATALOG]
+
+
+@pytest.mark.parametrize('text, tokens', [
+    ('Белый ром', ['бел', 'ром']),
+    ('ЁРШ', ['ерш']),
+    ('Ликеры, соки и лайм', ['ликер', 'сок', 'и', 'лайм']),
+])
+def test_tokenize(text, tokens):
+    assert tokenize(text) == tokens
+
+
+class TestCatalogIndex:
+    def setup_class(self):
+        self.index = CatalogIndex(RECORDS)
+
+    def search_ids(self, query):
+        return [cocktail.id for cocktail in self.index.search(query)]
+
+    @pytest.mark.parametrize('query', [None, '', '   '])
+    def test_search_without_query_returns_catalog(self, query):
+        assert self.search_ids(query) == [1, 2, 3, 4, 5]
+
+    def test_search_by_name(self):
+        assert self.search_ids('мохито') == [1]
+
+    def test_search_is_case_and_yo_insensitive(self):
+        assert self.search_ids('ерш') == self.search_ids('ЁРШ') == [4]
+
+    def test_search_by_category(self):
+        assert self.search_ids('классические') == [3]
+
+    def test_search_by_ingredient_in_another_word_form(self):
+        assert self.search_ids('текилой') == [3]
+
+    def test_search_by_prefix(self):
+        assert self.search_ids('марг') == [3]
+
+    def test_search_requires_all_query_words(self):
+        assert self.search_ids('ром кола') == [2]
+
+    def test_search_ranks_name_matches_first(self):
+        assert self.search_ids('ром') == [5, 1, 2]
+
+    def test_search_fuzzy_match_with_typo(self):
+        assert self.search_ids('махито') == [1]
+
+    def test_search_without_matches(self):
+        assert self.search_ids('абсент') == []
+
+    def test_search_results_cached_by_normalized_query(self):
+        index = CatalogIndex(RECORDS, search_cache_maxsize=1)
+
+        results = index.search('Ром  кола')
+
+        assert index.search('ром кола') is results
+        assert index.search(None) is index.search(None)
+
+        index.search('мохито')
+
+        assert index.search('ром кола') is not results
+        assert index.search('ром кола') == results
+
+    def test_update_reuses_unchanged_postings(self):
+        index = CatalogIndex(RECORDS)
+        changed_record = CocktailRecord.from_cocktail(CATALOG[1].copy(update={'name': 'Куба Либре Лайт'}))
+        added_record = CocktailRecord.from_cocktail(build_cocktail(6, 'Дайкири', [], ['Белый ром', 'Лайм']))
+        records = [RECORDS[0], changed_record, *RECORDS[3:], added_record]
+
+        updated_index = index.update(records, {changed_record.id, added_record.id})
+
+        assert updated_index.postings == CatalogIndex(records).postings
+        assert [record.id for record in updated_index.search('ром')] == [5, 1, 2, 6]
+        assert updated_index.similar.neighbours == CatalogIndex(records).similar.neighbours
+
+    def test_update_reuses_similar_when_features_unchanged(self):
+        index = CatalogIndex(RECORDS)
+        changed_record = CocktailRecord.from_cocktail(CATALOG[1].copy(update={'name': 'Куба Либре Лайт'}))
+        records = [RECORDS[0], changed_record, *RECORDS[2:]]
+
+        updated_index = index.update(records, {changed_record.id})
+
+        assert updated_index.similar.neighbours is index.similar.neighbours
+        assert updated_index.similar.similar(1)[0] is changed_record
+        assert [record.id for record in updated_index.search('лайт')] == [2]
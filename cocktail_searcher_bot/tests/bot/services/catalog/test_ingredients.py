@@ -0,0 +1,80 @@
+import pytest
+
+from bot.services.catalog.ingredients import IngredientIndex
+from bot.services.catalog.records import CocktailRecord
+from bot.services.catalog.text import split_ingredients
+from tests.bot.services.catalog.test_index import RECORDS, build_cocktail
+
+
+@pytest.mark.parametrize('text, ingredients', [
+    ('ром, лайм;мята\nсодовая', ['ром', 'лайм', 'мята', 'содовая']),
+    ('  Белый   ром ,, белый ром, ', ['Белый ром']),
+    (' , ', []),
+])
+def test_split_ingredients(text, ingredients):
+    assert split_ingredients(text) == ingredients
+
+
+class TestIngredientIndex:
+    def setup_class(self):
+        self.index = IngredientIndex(RECORDS)
+
+    def search(self, ingredients, max_missing=0):
+        return [(match.record.id, match.missing_ingredients) for match in self.index.search(ingredients, max_missing)]
+
+    def test_resolve(self):
+        assert self.index.resolve('ром') == {'бел ром', 'темн ром'}
+        assert self.index.resolve('белый ром') == {'бел ром'}
+        assert self.index.resolve('абсент') == set()
+
+    def test_resolve_by_prefix(self):
+        assert self.index.resolve('бел') == {'бел ром'}
+        assert self.index.resolve('р') == {'бел ром', 'темн ром'}
+        assert self.index.resolve('темн бел') == set()
+
+    def test_search_pages_by_index(self):
+        matches = self.index.search(['ром', 'лайм', 'текила'], max_missing=2)
+
+        assert len(matches) == 4
+        assert matches[-1] == (RECORDS[0], ['Мята', 'Содовая'])
+        assert [match.record.id for match in matches[1:3]] == [3, 5]
+
+    def test_search_fully_covered(self):
+        assert self.search(['ром', 'кола', 'лайм']) == [(2, [])]
+
+    def test_search_with_missing_ingredients(self):
+        assert self.search(['белый ром', 'лайм', 'мятой'], max_missing=1) == [
+            (1, ['Содовая']),
+            (2, ['Кола']),
+        ]
+
+    def test_search_ranks_by_coverage(self):
+        assert self.search(['ром', 'лайм', 'текила'], max_missing=2) == [
+            (2, ['Кола']),
+            (3, ['Ликер трипл сек']),
+            (5, ['Апельсиновый сок']),
+            (1, ['Мята', 'Содовая']),
+        ]
+
+    def test_search_requires_available_ingredient(self):
+        assert self.search(['абсент'], max_missing=2) == []
+        assert self.search([], max_missing=2) == []
+
+    def test_search_counts_duplicate_ingredients_once(self):
+        cocktail = build_cocktail(1, 'Двойной ром', [], ['Ром', 'ром', 'Лед'])
+        index = IngredientIndex([CocktailRecord.from_cocktail(cocktail)])
+
+        assert [match.missing_ingredients for match in index.search(['ром'], max_missing=1)] == [['Лед']]
+
+    def test_search_large_catalog(self):
+        records = [
+            CocktailRecord.from_cocktail(
+                build_cocktail(cocktail_id, f'Коктейль {cocktail_id}', [], [f'ингредиент{cocktail_id % 10}', 'лед'])
+            )
+            for cocktail_id in range(1000)
+        ]
+        index = IngredientIndex(records)
+
+        matches = index.search(['ингредиент3', 'лед'])
+
+        assert [match.record.id for match in matches] == list(range(3, 1000, 10))
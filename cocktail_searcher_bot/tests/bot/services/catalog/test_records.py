@@ -0,0 +1,47 @@
+import tracemalloc
+
+from bot.clients.cocktail_searcher.models import Cocktail
+from bot.services.catalog.records import CocktailRecord
+from tests.bot.services.catalog.test_index import CATALOG, build_cocktail
+
+
+class TestCocktailRecord:
+    def test_roundtrip(self):
+        for cocktail in CATALOG:
+            record = CocktailRecord.from_cocktail(cocktail)
+
+            assert record.to_cocktail() == cocktail
+            assert record.describes(cocktail)
+
+    def test_describes_changed_cocktail(self):
+        record = CocktailRecord.from_cocktail(CATALOG[0])
+
+        assert not record.describes(CATALOG[0].copy(update={'name': 'Мохито Лайт'}))
+        assert not record.describes(CATALOG[0].copy(update={'composition': CATALOG[0].composition[:-1]}))
+
+    def test_strings_interned(self):
+        first_record = CocktailRecord.from_cocktail(CATALOG[0])
+        second_record = CocktailRecord.from_cocktail(
+            Cocktail.parse_raw(CATALOG[1].json())
+        )
+
+        assert first_record.ingredient_names[0] is second_record.ingredient_names[0]
+        assert first_record.unit_names[0] is second_record.unit_names[0]
+
+    def test_memory_usage(self):
+        def measure(build):
+            tracemalloc.start()
+            try:
+                objects = build()
+                return tracemalloc.get_traced_memory()[0], objects
+            finally:
+                tracemalloc.stop()
+
+        models_size, cocktails = measure(lambda: [
+            build_cocktail(cocktail_id, f'Коктейль {cocktail_id}', ['Классические', 'Крепкие'],
+                           ['Белый ром', 'Лайм', 'Сахарный сироп', 'Мята', 'Содовая'])
+            for cocktail_id in range(1000)
+        ])
+        records_size, _ = measure(lambda: [CocktailRecord.from_cocktail(cocktail) for cocktail in cocktails])
+
+        assert records_size * 3 < models_size
@@ -0,0 +1,58 @@
+from bot.services.catalog.similarity import NO_NEIGHBOUR, SimilarityIndex
+from bot.services.catalog.records import CocktailRecord
+from tests.bot.services.catalog.test_index import RECORDS, build_cocktail
+
+
+class TestSimilarityIndex:
+    def setup_class(self):
+        self.index = SimilarityIndex(RECORDS, top_k=3)
+
+    def similar_ids(self, cocktail_id):
+        return [record.id for record in self.index.similar(cocktail_id)]
+
+    def test_similar(self):
+        assert self.similar_ids(2) == [1, 3]
+        assert self.similar_ids(1) == [2, 3]
+
+    def test_similar_without_common_ingredients(self):
+        assert self.similar_ids(4) == []
+
+    def test_similar_unknown_cocktail(self):
+        assert self.similar_ids(100) == []
+
+    def test_neighbours_layout(self):
+        assert len(self.index.neighbours) == len(RECORDS) * self.index.top_k
+        assert self.index.neighbours[3 * 3:4 * 3].tolist() == [NO_NEIGHBOUR] * 3
+
+    def test_rare_ingredients_weigh_more(self):
+        records = [
+            CocktailRecord.from_cocktail(build_cocktail(1, 'A', [], ['Лед', 'Абсент'])),
+            CocktailRecord.from_cocktail(build_cocktail(2, 'B', [], ['Лед', 'Сахар'])),
+            CocktailRecord.from_cocktail(build_cocktail(3, 'C', [], ['Абсент', 'Вода'])),
+            CocktailRecord.from_cocktail(build_cocktail(4, 'D', [], ['Лед', 'Вода'])),
+        ]
+
+        assert [record.id for record in SimilarityIndex(records, top_k=1).similar(1)] == [3]
+
+    def test_precomputed_neighbours(self):
+        index = SimilarityIndex(RECORDS, top_k=3, neighbours=self.index.neighbours)
+
+        assert [record.id for record in index.similar(2)] == self.similar_ids(2)
+
+    def test_candidates_found_by_rare_features_first(self):
+        records = [CocktailRecord.from_cocktail(build_cocktail(i, str(i), [], ['Лед'])) for i in range(1, 21)]
+        records += [
+            CocktailRecord.from_cocktail(build_cocktail(21, 'A', [], ['Лед', 'Абсент'])),
+            CocktailRecord.from_cocktail(build_cocktail(22, 'B', [], ['Лед', 'Абсент', 'Сахар'])),
+        ]
+
+        index = SimilarityIndex(records, top_k=1, max_candidates=1)
+
+        assert [record.id for record in index.similar(21)] == [22]
+
+    def test_candidates_bounded(self):
+        records = [CocktailRecord.from_cocktail(build_cocktail(i, str(i), [], ['Лед'])) for i in range(1, 51)]
+
+        index = SimilarityIndex(records, top_k=10, max_candidates=5)
+
+        assert all(len(index.similar(record.id)) == 5 for record in records)
@@ -0,0 +1,69 @@
+import hashlib
+import struct
+
+import pytest
+
+from bot.services.catalog.exceptions import CatalogSnapshotError
+from bot.services.catalog.index import CatalogIndex
+from bot.services.catalog.snapshot import SNAPSHOT_HEADER, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, read_snapshot, write_snapshot
+from bot.services.catalog.sync import CatalogSynchronizer
+from tests.bot.services.catalog.test_index import RECORDS
+
+
+class TestCatalogSnapshot:
+    def setup_method(self):
+        self.index = CatalogIndex(RECORDS)
+
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / 'catalog.snapshot'
+
+        write_snapshot(path, self.index)
+        snapshot = read_snapshot(path, fuzzy_threshold=self.index.fuzzy_threshold)
+
+        assert snapshot.created_at > 0
+        assert snapshot.index.records == self.index.records
+        assert snapshot.index.postings == self.index.postings
+        assert snapshot.index.similar.neighbours == self.index.similar.neighbours
+        for query in ('ром', 'махито', 'ерш', 'кола лайм'):
+            assert snapshot.index.search(query) == self.index.search(query)
+        assert not list(tmp_path.glob('*.tmp'))
+
+    def test_restored_snapshot_matches_next_sync(self, tmp_path):
+        path = tmp_path / 'catalog.snapshot'
+        write_snapshot(path, self.index)
+        synchronizer = CatalogSynchronizer(page_size=100, max_concurrency=1, fuzzy_threshold=0.5, similar_top_k=5)
+
+        synchronizer.restore(read_snapshot(path, fuzzy_threshold=0.5).index)
+
+        assert synchronizer._hashes == {
+            record.id: synchronizer._hash_record(record) for record in self.index.records
+        }
+
+    @pytest.mark.parametrize('corrupt', [
+        lambda data: data[:-1] + bytes([data[-1] ^ 1]),
+        lambda data: data[:-1],
+        lambda data: data[:SNAPSHOT_HEADER.size - 1],
+        lambda data: b'XXXX' + data[4:],
+        lambda data: data[:4] + struct.pack('<H', 999) + data[6:],
+    ], ids=['checksum', 'truncated payload', 'truncated header', 'magic', 'version'])
+    def test_corrupted_snapshot(self, tmp_path, corrupt):
+        path = tmp_path / 'catalog.snapshot'
+        write_snapshot(path, self.index)
+        path.write_bytes(corrupt(path.read_bytes()))
+
+        with pytest.raises(CatalogSnapshotError):
+            read_snapshot(path, fuzzy_threshold=0.5)
+
+    def test_snapshot_with_inconsistent_sections(self, tmp_path):
+        path = tmp_path / 'catalog.snapshot'
+        write_snapshot(path, self.index)
+        payload = path.read_bytes()[SNAPSHOT_HEADER.size:] + bytes(8)
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0.0, len(payload),
+                                      hashlib.sha256(payload).digest())
+        path.write_bytes(header + payload)
+
+        with pytest.raises(CatalogSnapshotError):
+            read_snapshot(path, fuzzy_threshold=0.5)
+
+        write_snapshot(path, self.index)
+        assert read_snapshot(path, fuzzy_threshold=0.5).index.records == self.index.records
@@ -0,0 +1,94 @@
+import asyncio
+from unittest.mock import create_autospec
+
+import pytest
+
+from bot.clients.cocktail_searcher import exceptions as client_exceptions
+from bot.clients.cocktail_searcher.client import CocktailSearcherClient
+from bot.clients.cocktail_searcher.models import PagePagination, Cocktail
+from bot.services.catalog.sync import CatalogSynchronizer
+from tests.bot.services.catalog.test_index import CATALOG, RECORDS
+
+
+def paginate(cocktails, page_size):
+    total_pages = max(1, -(-len(cocktails) // page_size))
+    return {
+        page: PagePagination[Cocktail](
+            count=len(cocktails),
+            total_pages=total_pages,
+            results=cocktails[(page - 1) * page_size:page * page_size]
+        )
+        for page in range(1, total_pages + 1)
+    }
+
+
+@pytest.mark.asyncio
+class TestCatalogSynchronizer:
+    def setup_method(self):
+        self.api_client = create_autospec(CocktailSearcherClient)
+        self.synchronizer = CatalogSynchronizer(page_size=2, max_concurrency=2, fuzzy_threshold=0.5, similar_top_k=5)
+        self.set_catalog(CATALOG)
+
+    def set_catalog(self, cocktails):
+        pages = paginate(cocktails, self.synchronizer.page_size)
+        self.api_client.get_cocktails.side_effect = lambda page, page_size: pages[page]
+
+    async def test_sync_builds_index(self):
+        index = await self.synchronizer.sync(self.api_client, None)
+
+        assert index.records == RECORDS
+        assert self.api_client.get_cocktails.call_count == 3
+        assert self.synchronizer.syncs == 1
+        assert self.synchronizer.last_changes.added == {cocktail.id for cocktail in CATALOG}
+        assert self.synchronizer.last_duration is not None
+        assert self.synchronizer.staleness >= 0
+
+    async def test_sync_bounds_concurrency(self):
+        self.synchronizer.page_size = 1
+        pages = paginate(CATALOG, 1)
+        active_requests = max_active_requests = 0
+
+        async def get_cocktails(page, page_size):
+            nonlocal active_requests, max_active_requests
+            active_requests += 1
+            max_active_requests = max(max_active_requests, active_requests)
+            await asyncio.sleep(0)
+            active_requests -= 1
+            return pages[page]
+
+        self.api_client.get_cocktails.side_effect = get_cocktails
+
+        index = await self.synchronizer.sync(self.api_client, None)
+
+        assert index.records == RECORDS
+        assert max_active_requests == self.synchronizer.max_concurrency
+
+    async def test_sync_without_changes_keeps_index(self):
+        index = await self.synchronizer.sync(self.api_client, None)
+
+        assert await self.synchronizer.sync(self.api_client, index) is index
+        assert not self.synchronizer.last_changes
+
+    async def test_sync_detects_changes(self):
+        index = await self.synchronizer.sync(self.api_client, None)
+        changed_cocktail = CATALOG[1].copy(update={'name': 'Куба Либре Лайт'})
+        added_cocktail = CATALOG[0].copy(update={'id': 6})
+        self.set_catalog([CATALOG[0], changed_cocktail, *CATALOG[3:], added_cocktail])
+
+        new_index = await self.synchronizer.sync(self.api_client, index)
+
+        assert self.synchronizer.last_changes.added == {6}
+        assert self.synchronizer.last_changes.changed == {2}
+        assert self.synchronizer.last_changes.removed == {3}
+        assert [record.id for record in new_index.search('лайт')] == [2]
+        assert new_index.records[0] is index.records[0]
+        assert [record.id for record in index.search('маргарита')] == [3]
+
+    async def test_sync_failure(self):
+        index = await self.synchronizer.sync(self.api_client, None)
+        self.api_client.get_cocktails.side_effect = client_exceptions.TransportError
+
+        with pytest.raises(client_exceptions.TransportError):
+            await self.synchronizer.sync(self.api_client, index)
+        assert self.synchronizer.failures == 1
+        assert self.synchronizer.syncs == 1
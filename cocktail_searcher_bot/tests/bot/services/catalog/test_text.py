@@ -0,0 +1,45 @@
+import pytest
+
+from bot.services.catalog.text import normalize_search_query, normalize_synonyms, normalize_text
+
+
+@pytest.mark.parametrize('text, normalized_text', [
+    ('Мохито', 'мохито'),
+    ('МОХИТО', 'мохито'),
+    ('мохитo', 'мохито'),
+    ('Ёрш', 'ерш'),
+    ('Mojitо', 'mojito'),
+    ('Ｍｏｊｉｔｏ', 'mojito'),
+    ('Blue Лагуна', 'blue лагуна'),
+])
+def test_normalize_text(text, normalized_text):
+    assert normalize_text(text) == normalized_text
+
+
+@pytest.mark.parametrize('search', ['Мохито', ' мохито ', 'МОХИТО', 'мохитo', 'mojito', 'МОХИТО\t'])
+def test_normalize_search_query(search):
+    synonyms = normalize_synonyms({'Mojito': 'Мохито'})
+
+    assert normalize_search_query(search, synonyms) == 'мохито'
+
+
+@pytest.mark.parametrize('search, normalized_search', [
+    (None, None),
+    ('   ', None),
+    ('Куба   Либре', 'куба либре'),
+])
+def test_normalize_search_query_without_synonyms(search, normalized_search):
+    assert normalize_search_query(search) == normalized_search
+
+
+@pytest.mark.parametrize('synonyms, normalized_synonyms', [
+    ({'a': 'b', 'b': 'c'}, {'a': 'c', 'b': 'c'}),
+    ({'лия': 'лонг айленд', 'лонг': 'long'}, {'лия': 'long айленд', 'лонг': 'long'}),
+    ({'a': 'b', 'b': 'a'}, {'a': 'a', 'b': 'a'}),
+])
+def test_normalize_synonyms_resolves_chains(synonyms, normalized_synonyms):
+    synonyms = normalize_synonyms(synonyms)
+    search = normalize_search_query(' '.join(synonyms), synonyms)
+
+    assert synonyms == normalized_synonyms
+    assert normalize_search_query(search, synonyms) == search
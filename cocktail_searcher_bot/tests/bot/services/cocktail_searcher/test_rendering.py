@@ -0,0 +1,29 @@
+from jinja2 import ChoiceLoader, PackageLoader
+
+from bot.services.cocktail_searcher.rendering import (
+    COMPILED_TEMPLATES_VERSION_FILE,
+    TEMPLATES_VERSION,
+    compile_templates,
+    create_environment,
+)
+from tests.bot.clients.cocktail_searcher import mocks
+
+
+class TestRendering:
+    def test_compiled_templates(self, tmp_path):
+        compile_templates(str(tmp_path))
+        environment = create_environment(str(tmp_path))
+
+        assert (tmp_path / COMPILED_TEMPLATES_VERSION_FILE).read_text() == TEMPLATES_VERSION
+        assert isinstance(environment.loader, ChoiceLoader)
+        assert environment.get_template('recipe.html').render(recipe=mocks.COCKTAIL_RECIPE_RESPONSE) == \
+            create_environment(None).get_template('recipe.html').render(recipe=mocks.COCKTAIL_RECIPE_RESPONSE)
+
+    def test_outdated_compiled_templates_ignored(self, tmp_path):
+        compile_templates(str(tmp_path))
+        (tmp_path / COMPILED_TEMPLATES_VERSION_FILE).write_text('outdated')
+
+        assert isinstance(create_environment(str(tmp_path)).loader, PackageLoader)
+
+    def test_missing_compiled_templates_ignored(self, tmp_path):
+        assert isinstance(create_environment(str(tmp_path / 'missing')).loader, PackageLoader)
@@ -1,5 +1,6 @@
+import asyncio
 from typing import List
-from unittest.mock import create_autospec
+from unittest.mock import create_autospec, patch
 
 import pytest
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
@@ -14,9 +15,13 @@ from bot.clients.cocktail_searcher.models import (
     CookingStage,
     TelegramUser,
 )
+from bot.services.catalog.index import CatalogIndex
+from bot.services.catalog.sync import CatalogSynchronizer
+from bot.services.catalog.text import normalize_synonyms
 from bot.services.cocktail_searcher import exceptions
-from bot.services.cocktail_searcher.dtos import TelegramMessage
-from bot.services.cocktail_searcher.service import CocktailSearcherService, COCKTAIL_PAGE_SIZE
+from bot.services.cocktail_searcher.dtos import TelegramMessage, CocktailRecipe
+from bot.services.cocktail_searcher.service import CocktailSearcherService, COCKTAIL_PAGE_SIZE, SimilarCallback
+from config import settings
 from tests.bot.clients.cocktail_searcher import mocks
 
 
@@ -28,28 +33,218 @@ class TestCocktailSearcherService:
 
     def setup_method(self):
         self.service.api_client.reset_mock(return_value=True, side_effect=True)
+        self.service.cocktails_cache.clear()
+        self.service.empty_searches_cache.clear()
+        self.service.favorites_cache.clear()
+        self.service.recipes_cache.clear()
+        self.service.telegram_user_ids_cache.clear()
+        self.service.inline_results_cache.clear()
+        self.service.cocktail_store.clear()
+        self.service.messages_cache.clear()
+        self.service.prefetcher.max_tasks = 0
+        self.service.catalog_index = None
+        self.service.catalog_synchronizer = CatalogSynchronizer(
+            page_size=100, max_concurrency=1, fuzzy_threshold=0.5, similar_top_k=5
+        )
 
     @pytest.mark.parametrize('payload', [{'search': None}, {'search': 'test'}, {'search': 'test', 'page': 2}])
     async def test_get_cocktail_message(self, payload):
-        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE)
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
 
         page = payload.get('page', 1)
         response = await self.service.get_cocktail_message(**payload)
 
         self.service.api_client.get_cocktails.assert_called_once_with(
-            **{'page': page, 'page_size': COCKTAIL_PAGE_SIZE, **payload}
+            payload['search'], 1, settings.COCKTAIL_SEARCH_WINDOW_SIZE
         )
         assert isinstance(response, TelegramMessage)
-        parsed_mock = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE)
-        cocktail = parsed_mock.results[0]
+        parsed_mock = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE)
+        cocktail = parsed_mock.results[page - 1]
         assert response.text == self.service._build_cocktail_message_text(cocktail=cocktail)
         assert response.reply_markup == self.service._build_cocktail_reply_markup(
             cocktail_id=cocktail.id,
             page=page,
-            total_pages=parsed_mock.total_pages
+            total_pages=parsed_mock.count
         )
         assert response.parse_mode == 'HTML'
 
+    async def test_get_cocktail_message_reused(self):
+        cocktails = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE).results
+        self.service.catalog_index = CatalogIndex.from_cocktails(cocktails)
+
+        response = await self.service.get_cocktail_message(search='string', page=2)
+
+        assert await self.service.get_cocktail_message(search='string', page=2) is response
+        assert await self.service.get_cocktail_message(search='string', page=3) is not response
+
+    async def test_get_cocktail_message_rebuilt_for_changed_cocktail(self):
+        cocktails = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE).results
+        self.service.catalog_index = CatalogIndex.from_cocktails(cocktails)
+        response = await self.service.get_cocktail_message(page=1)
+        changed_cocktail = cocktails[0].copy(update={'name': 'changed'})
+        self.service.catalog_index = CatalogIndex.from_cocktails([changed_cocktail, *cocktails[1:]])
+
+        changed_response = await self.service.get_cocktail_message(page=1)
+
+        assert changed_response.text == self.service._build_cocktail_message_text(changed_cocktail)
+        assert changed_response.text != response.text
+
+    async def test_get_cocktail_message_pages_served_from_window(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        search_query = 'test'
+
+        responses = [
+            await self.service.get_cocktail_message(search=search_query, page=page)
+            for page in range(1, mocks.COCKTAIL_WINDOW_RESPONSE['count'] + 1)
+        ]
+
+        self.service.api_client.get_cocktails.assert_called_once_with(
+            search_query, 1, settings.COCKTAIL_SEARCH_WINDOW_SIZE
+        )
+        assert len({response.text for response in responses}) == len(responses)
+
+    @pytest.mark.parametrize('page, window_page', [(1, 1), (20, 1), (21, 2), (45, 3)])
+    async def test_get_cocktail_message_window_page(self, page, window_page, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_SEARCH_WINDOW_SIZE', 20)
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.PAGINATION_EMPTY_RESPONSE_RESULT
+        )
+        search_query = 'test'
+
+        with pytest.raises(exceptions.CocktailNotFoundError):
+            await self.service.get_cocktail_message(search=search_query, page=page)
+        self.service.api_client.get_cocktails.assert_called_once_with(search_query, window_page, 20)
+
+    async def test_get_cocktail_message_prefetch_next_window(self, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_SEARCH_WINDOW_SIZE', 1)
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE)
+        self.service.api_client.get_cocktail_recipe.return_value = parse_obj_as(
+            List[CookingStage], mocks.COCKTAIL_RECIPE_RESPONSE
+        )
+        self.service.prefetcher.max_tasks = 2
+        search_query = 'test'
+
+        await self.service.get_cocktail_message(search=search_query, chat_id=1)
+        await self.service.prefetcher.wait()
+
+        assert self.service.api_client.get_cocktails.call_count == 2
+        self.service.api_client.get_cocktails.assert_any_call(search_query, 2, 1)
+        self.service.api_client.get_cocktail_recipe.assert_called_once_with(1)
+        assert (search_query, 2, 1) in self.service.cocktails_cache
+        assert 1 in self.service.recipes_cache
+
+    async def test_get_cocktail_message_prefetch_scoped_by_chat(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+        recipe_requested = asyncio.Event()
+
+        async def get_cocktail_recipe(cocktail_id):
+            await recipe_requested.wait()
+            return parse_obj_as(List[CookingStage], mocks.COCKTAIL_RECIPE_RESPONSE)
+
+        self.service.api_client.get_cocktail_recipe.side_effect = get_cocktail_recipe
+        self.service.prefetcher.max_tasks = 10
+
+        await self.service.get_cocktail_message(search=None, page=1, chat_id=1)
+        await self.service.get_cocktail_message(search=None, page=1, chat_id=2)
+        await self.service.get_cocktail_message(search=None, page=2, chat_id=2)
+
+        assert len(self.service.prefetcher) == 2
+        assert self.service.prefetcher.cancelled == 1
+
+        await self.service.get_cocktail_message(search='String  3', page=1, chat_id=1)
+
+        assert len(self.service.prefetcher) == 2
+        assert self.service.prefetcher.cancelled == 2
+        recipe_requested.set()
+        await self.service.prefetcher.wait()
+
+    @pytest.mark.parametrize('search_queries, normalized_search_query', [
+        (('test', 'test'), 'test'),
+        (('Test', ' test '), 'test'),
+        (('TEST  QUERY', 'test query'), 'test query'),
+        (('Мохито', 'мохитo'), 'мохито'),
+        (('ёрш', 'ЕРШ'), 'ерш'),
+    ])
+    async def test_get_cocktail_message_cached(self, search_queries, normalized_search_query):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE)
+        first_search_query, second_search_query = search_queries
+
+        first_response = await self.service.get_cocktail_message(search=first_search_query)
+        second_response = await self.service.get_cocktail_message(search=second_search_query)
+
+        self.service.api_client.get_cocktails.assert_called_once_with(
+            normalized_search_query, 1, settings.COCKTAIL_SEARCH_WINDOW_SIZE
+        )
+        assert first_response == second_response
+        assert self.service.cocktails_cache.hits == 1
+        assert self.service.cocktails_cache.misses == 1
+
+    async def test_get_cocktail_message_synonyms(self, monkeypatch):
+        monkeypatch.setattr(self.service, 'search_synonyms', {'mojito': 'мохито'})
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE)
+
+        await self.service.get_cocktail_message(search='Mojito')
+
+        self.service.api_client.get_cocktails.assert_called_once_with(
+            'мохито', 1, settings.COCKTAIL_SEARCH_WINDOW_SIZE
+        )
+
+    async def test_get_cocktail_message_synonyms_applied_once(self, monkeypatch):
+        synonyms = normalize_synonyms({'a': 'b', 'b': 'c', 'мохито': 'мохито лайм'})
+        monkeypatch.setattr(self.service, 'search_synonyms', synonyms)
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE)
+
+        await self.service.get_cocktail_message(search='A')
+        await self.service.get_cocktail_message(search='Мохито')
+
+        assert [call.args[0] for call in self.service.api_client.get_cocktails.call_args_list] == ['c', 'мохито лайм']
+
+    async def test_get_cocktail_message_stale_if_error(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        search_query = 'test'
+        with patch('utils.cache.time.monotonic', return_value=0):
+            cached_response = await self.service.get_cocktail_message(search=search_query)
+
+        self.service.api_client.get_cocktails.side_effect = client_exceptions.TransportError
+        with patch('utils.cache.time.monotonic', return_value=settings.COCKTAIL_CACHE_TTL + 1):
+            for _ in range(2):
+                assert await self.service.get_cocktail_message(search=search_query) == cached_response
+                await self.service.cocktails_cache.wait()
+
+        assert self.service.cocktails_cache.stale_hits == 2
+        assert self.service.cocktails_cache.refresh_failures == 2
+
+    @pytest.mark.parametrize('error, stale', [
+        (client_exceptions.TransportError(), True),
+        (client_exceptions.ResponseError('Service Unavailable', status_code=503), True),
+        (client_exceptions.ResponseError('Unauthorized', status_code=401), False),
+        (client_exceptions.ResponseError('Forbidden', status_code=403), False),
+        (client_exceptions.ResponseError('Too Many Requests', status_code=429), False),
+        (client_exceptions.NotFoundError('Not Found'), False),
+    ])
+    async def test_get_cocktail_message_stale_only_on_external_api_failure(self, error, stale):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        with patch('utils.cache.time.monotonic', return_value=0):
+            await self.service.get_cocktail_message(search='test')
+
+        self.service.api_client.get_cocktails.side_effect = error
+        with patch('utils.cache.time.monotonic', return_value=settings.COCKTAIL_CACHE_TTL + 1):
+            await self.service.get_cocktail_message(search='test')
+            await self.service.cocktails_cache.wait()
+
+        assert (('test', 1, settings.COCKTAIL_SEARCH_WINDOW_SIZE) in self.service.cocktails_cache._entries) is stale
+
     async def test_get_cocktail_message_cocktail_not_found(self):
         self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
             mocks.PAGINATION_EMPTY_RESPONSE_RESULT
@@ -59,7 +254,33 @@ class TestCocktailSearcherService:
 
         with pytest.raises(exceptions.CocktailNotFoundError):
             await self.service.get_cocktail_message(search=search_query, page=page)
-        self.service.api_client.get_cocktails.assert_called_once_with(search_query, page, COCKTAIL_PAGE_SIZE)
+        self.service.api_client.get_cocktails.assert_called_once_with(
+            search_query, page, settings.COCKTAIL_SEARCH_WINDOW_SIZE
+        )
+
+    async def test_get_cocktail_message_empty_search_cached(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.PAGINATION_EMPTY_RESPONSE_RESULT
+        )
+
+        for search_query in ('absent', 'ABSENT', 'absent '):
+            with pytest.raises(exceptions.CocktailNotFoundError):
+                await self.service.get_cocktail_message(search=search_query)
+
+        self.service.api_client.get_cocktails.assert_called_once_with(
+            'absent', 1, settings.COCKTAIL_SEARCH_WINDOW_SIZE
+        )
+        assert self.service.empty_searches_cache.hits == 2
+
+    async def test_get_cocktail_message_page_out_of_range_not_cached_as_empty(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+
+        with pytest.raises(exceptions.CocktailNotFoundError):
+            await self.service.get_cocktail_message(search='test', page=4)
+
+        assert 'test' not in self.service.empty_searches_cache
 
     async def test_get_cocktail_connection_error(self):
         self.service.api_client.get_cocktails.side_effect = client_exceptions.TransportError
@@ -68,7 +289,242 @@ class TestCocktailSearcherService:
 
         with pytest.raises(exceptions.ConnectionToExternalAPIError):
             await self.service.get_cocktail_message(search=search_query, page=page)
-        self.service.api_client.get_cocktails.assert_called_once_with(search_query, page, COCKTAIL_PAGE_SIZE)
+        self.service.api_client.get_cocktails.assert_called_once_with(
+            search_query, page, settings.COCKTAIL_SEARCH_WINDOW_SIZE
+        )
+
+    async def test_sync_catalog(self):
+        self.service.catalog_synchronizer.page_size = 1
+        parsed_mock = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE)
+        self.service.api_client.get_cocktails.side_effect = [
+            PagePagination[Cocktail](count=parsed_mock.count, total_pages=parsed_mock.count, results=[cocktail])
+            for cocktail in parsed_mock.results
+        ]
+
+        await self.service.sync_catalog()
+
+        assert self.service.api_client.get_cocktails.call_count == parsed_mock.count
+        self.service.api_client.get_cocktails.assert_called_with(page=parsed_mock.count, page_size=1)
+        assert self.service.catalog_index.records == CatalogIndex.from_cocktails(parsed_mock.results).records
+
+    async def test_sync_catalog_invalidates_changed_cocktail_recipes(self):
+        parsed_mock = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE)
+        self.service.api_client.get_cocktails.return_value = parsed_mock
+        await self.service.sync_catalog()
+        for cocktail in parsed_mock.results:
+            self.service.recipes_cache.set(cocktail.id, CocktailRecipe([]))
+
+        changed_mock = parsed_mock.copy(deep=True)
+        changed_mock.results[0].name = 'changed'
+        del changed_mock.results[1]
+        self.service.api_client.get_cocktails.return_value = changed_mock
+        await self.service.sync_catalog()
+
+        assert [cocktail_id in self.service.recipes_cache for cocktail_id in (1, 2, 3)] == [False, False, True]
+        assert self.service.catalog_index.records == CatalogIndex.from_cocktails(changed_mock.results).records
+
+    async def test_sync_catalog_snapshot(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_CATALOG_SNAPSHOT_PATH', str(tmp_path / 'catalog.snapshot'))
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+        synced_index = self.service.catalog_index
+        self.service.catalog_index = None
+
+        self.service.restore_catalog_snapshot()
+
+        assert self.service.catalog_index.records == synced_index.records
+        await self.service.sync_catalog()
+        assert not self.service.catalog_synchronizer.last_changes
+
+    async def test_restore_catalog_snapshot_corrupted(self, tmp_path, monkeypatch):
+        snapshot_path = tmp_path / 'catalog.snapshot'
+        snapshot_path.write_bytes(b'corrupted')
+        monkeypatch.setattr(settings, 'COCKTAIL_CATALOG_SNAPSHOT_PATH', str(snapshot_path))
+
+        self.service.restore_catalog_snapshot()
+
+        assert self.service.catalog_index is None
+
+    async def test_get_cocktail_message_from_catalog_index(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+        self.service.api_client.reset_mock()
+
+        response = await self.service.get_cocktail_message(search='String  2')
+
+        self.service.api_client.get_cocktails.assert_not_called()
+        cocktail = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE).results[1]
+        assert response.text == self.service._build_cocktail_message_text(cocktail=cocktail)
+        assert response.reply_markup == self.service._build_cocktail_reply_markup(
+            cocktail_id=cocktail.id,
+            page=1,
+            total_pages=1
+        )
+
+    @pytest.mark.parametrize('search, page', [('absent', 1), (None, 4)])
+    async def test_get_cocktail_message_from_catalog_index_not_found(self, search, page):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+
+        with pytest.raises(exceptions.CocktailNotFoundError):
+            await self.service.get_cocktail_message(search=search, page=page)
+
+    async def test_startup_catalog_sync_failure_falls_back_to_external_api(self, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_CATALOG_ENABLED', True)
+        self.service.api_client.get_cocktails.side_effect = client_exceptions.TransportError
+
+        await self.service.startup()
+        while not self.service.catalog_synchronizer.failures:
+            await asyncio.sleep(0)
+        await self.service.shutdown()
+
+        assert self.service.catalog_index is None
+        with pytest.raises(exceptions.ConnectionToExternalAPIError):
+            await self.service.get_cocktail_message()
+
+    async def test_catalog_sync_continues_after_failure(self, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_CATALOG_ENABLED', True)
+        monkeypatch.setattr(settings, 'COCKTAIL_CATALOG_SYNC_INTERVAL', 0)
+        self.service.api_client.get_cocktails.side_effect = [
+            client_exceptions.ResponseError('Internal Server Error', status_code=500),
+            PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE),
+        ]
+
+        await self.service.startup()
+        while self.service.catalog_index is None:
+            await asyncio.sleep(0)
+        await self.service.shutdown()
+
+        assert self.service.catalog_synchronizer.failures == 1
+        assert self.service.catalog_synchronizer.syncs == 1
+
+    async def test_get_ingredient_cocktail_message(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+
+        response = await self.service.get_ingredient_cocktail_message(['String'], page=2)
+
+        cocktail = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE).results[1]
+        assert response.text == self.service._build_cocktail_message_text(cocktail=cocktail)
+        assert response.reply_markup == self.service._build_cocktail_reply_markup(
+            cocktail_id=cocktail.id,
+            page=2,
+            total_pages=mocks.COCKTAIL_WINDOW_RESPONSE['count']
+        )
+
+    async def test_get_ingredient_cocktail_message_missing_ingredients(self, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_INGREDIENT_SEARCH_MAX_MISSING', 1)
+        cocktail = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE).results[0]
+        cocktail.composition.append(cocktail.composition[0].copy(update={'ingredient_name': 'lime'}))
+        self.service.catalog_index = CatalogIndex.from_cocktails([cocktail])
+
+        response = await self.service.get_ingredient_cocktail_message(['lime'])
+
+        assert response.text == self.service._build_cocktail_message_text(cocktail, missing_ingredients=['string'])
+        assert 'Не хватает:</b> string' in response.text
+
+    async def test_get_ingredient_cocktail_message_not_found(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+
+        with pytest.raises(exceptions.CocktailNotFoundError):
+            await self.service.get_ingredient_cocktail_message(['absent'])
+
+    async def test_get_ingredient_cocktail_message_catalog_unavailable(self):
+        with pytest.raises(exceptions.CatalogUnavailableError):
+            await self.service.get_ingredient_cocktail_message(['string'])
+        self.service.api_client.get_cocktails.assert_not_called()
+
+    async def test_get_similar_cocktails_message(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+
+        response = self.service.get_similar_cocktails_message(1)
+
+        assert response.text.count('string') == 4
+        assert '1. <a href="https://example.com/cocktail_image.jpg">string 2</a>' in response.text
+        assert '2. <a href="https://example.com/cocktail_image.jpg">string 3</a>' in response.text
+        assert response.reply_markup == InlineKeyboardMarkup(
+            inline_keyboard=[[InlineKeyboardButton(text='Назад', callback_data='back')]]
+        )
+
+    async def test_get_similar_cocktails_message_not_found(self):
+        self.service.catalog_index = CatalogIndex.from_cocktails(
+            PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_RESPONSE).results
+        )
+
+        with pytest.raises(exceptions.CocktailNotFoundError):
+            self.service.get_similar_cocktails_message(1)
+
+    async def test_get_similar_cocktails_message_catalog_unavailable(self):
+        with pytest.raises(exceptions.CatalogUnavailableError):
+            self.service.get_similar_cocktails_message(1)
+
+    @pytest.mark.parametrize('catalog_enabled', [False, True])
+    async def test_similar_cocktails_button(self, catalog_enabled, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_CATALOG_ENABLED', catalog_enabled)
+
+        reply_markups = [
+            self.service._build_cocktail_reply_markup(cocktail_id=1, page=1, total_pages=1),
+            self.service._build_favorite_cocktail_reply_markup(cocktail_id=1, favorite_id=1, page=1, total_pages=1),
+        ]
+
+        for reply_markup in reply_markups:
+            buttons = [button.callback_data for row in reply_markup.inline_keyboard for button in row]
+            assert (SimilarCallback(cocktail_id=1).pack() in buttons) is catalog_enabled
+
+    async def test_get_inline_search_results(self, monkeypatch):
+        monkeypatch.setattr(settings, 'COCKTAIL_INLINE_RESULTS_LIMIT', 2)
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+        self.service.api_client.reset_mock()
+
+        first_page = self.service.get_inline_search_results('Str')
+        second_page = self.service.get_inline_search_results('Str', offset=int(first_page.next_offset))
+
+        self.service.api_client.get_cocktails.assert_not_called()
+        assert [result.id for result in first_page.results] == ['1', '2']
+        assert first_page.next_offset == '2'
+        assert [result.id for result in second_page.results] == ['3']
+        assert second_page.next_offset == ''
+        cocktail = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE).results[0]
+        assert first_page.results[0].title == cocktail.name
+        assert first_page.results[0].input_message_content.message_text == (
+            self.service._build_cocktail_message_text(cocktail)
+        )
+
+    async def test_get_inline_search_results_cached(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_WINDOW_RESPONSE
+        )
+        await self.service.sync_catalog()
+
+        inline_results = self.service.get_inline_search_results('string')
+
+        assert self.service.get_inline_search_results(' STRING ') is inline_results
+        changed_mock = PagePagination[Cocktail].parse_obj(mocks.COCKTAIL_WINDOW_RESPONSE)
+        del changed_mock.results[0]
+        self.service.api_client.get_cocktails.return_value = changed_mock
+        await self.service.sync_catalog()
+        assert len(self.service.get_inline_search_results('string').results) == 2
+
+    async def test_get_inline_search_results_catalog_unavailable(self):
+        assert self.service.get_inline_search_results('string').results == []
+        self.service.api_client.get_cocktails.assert_not_called()
 
     async def test_get_favorite_cocktail_message(self):
         self.service.api_client.get_favorite_cocktails.return_value = PagePagination[TelegramUserFavorite].parse_obj(
@@ -92,6 +548,44 @@ class TestCocktailSearcherService:
         )
         assert response.parse_mode == 'HTML'
 
+    async def test_get_favorite_cocktail_message_prefetch(self):
+        self.service.api_client.get_favorite_cocktails.return_value = PagePagination[TelegramUserFavorite].parse_obj(
+            mocks.TELEGRAM_USER_FAVORITE_RESPONSE
+        )
+        self.service.api_client.get_cocktail_recipe.return_value = parse_obj_as(
+            List[CookingStage], mocks.COCKTAIL_RECIPE_RESPONSE
+        )
+        self.service.prefetcher.max_tasks = 2
+        page = telegram_user_id = cocktail_id = 1
+
+        await self.service.get_favorite_cocktail_message(telegram_user_id=telegram_user_id, page=page)
+        await self.service.prefetcher.wait()
+        await self.service.get_favorite_cocktail_message(telegram_user_id=telegram_user_id, page=page + 1)
+        await self.service.get_cocktail_recipe_message(cocktail_id=cocktail_id)
+
+        assert self.service.api_client.get_favorite_cocktails.call_count == 2
+        self.service.api_client.get_favorite_cocktails.assert_any_call(telegram_user_id, page + 1, COCKTAIL_PAGE_SIZE)
+        self.service.api_client.get_cocktail_recipe.assert_called_once_with(cocktail_id)
+        self.service.prefetcher.cancel()
+
+    async def test_search_and_favorites_share_cocktail(self):
+        self.service.api_client.get_cocktails.return_value = PagePagination[Cocktail].parse_obj(
+            mocks.COCKTAIL_RESPONSE
+        )
+        self.service.api_client.get_favorite_cocktails.return_value = PagePagination[TelegramUserFavorite].parse_obj(
+            mocks.TELEGRAM_USER_FAVORITE_RESPONSE
+        )
+
+        search_response = await self.service.get_cocktail_message(search='string')
+        favorite_response = await self.service.get_favorite_cocktail_message(telegram_user_id=1)
+        favorites = await self.service._get_favorite_cocktails(telegram_user_id=1, page=1)
+
+        assert favorite_response.text == search_response.text
+        assert favorites.results[0].cocktail is self.service.cocktail_store.get(1)
+        assert self.service.cocktail_store.shared == 1
+        assert self.service.cocktail_store.renders == 1
+        assert self.service.cocktail_store.card_hits == 1
+
     async def test_get_favorite_cocktail_message_telegram_user_not_found(self):
         self.service.api_client.get_favorite_cocktails.side_effect = client_exceptions.NotFoundError
         page = telegram_user_id = 1
@@ -154,6 +648,40 @@ class TestCocktailSearcherService:
             await self.service.get_cocktail_recipe_message(cocktail_id=cocktail_id)
         self.service.api_client.get_cocktail_recipe.assert_called_once_with(cocktail_id)
 
+    async def test_get_cocktail_recipe_message_cached(self):
+        self.service.api_client.get_cocktail_recipe.return_value = parse_obj_as(
+            List[CookingStage], mocks.COCKTAIL_RECIPE_RESPONSE
+        )
+        cocktail_id = 1
+
+        first_response = await self.service.get_cocktail_recipe_message(cocktail_id=cocktail_id)
+        second_response = await self.service.get_cocktail_recipe_message(cocktail_id=cocktail_id)
+
+        self.service.api_client.get_cocktail_recipe.assert_called_once_with(cocktail_id)
+        assert first_response == second_response
+
+    async def test_get_cocktail_recipe_message_recipe_not_found_cached(self):
+        self.service.api_client.get_cocktail_recipe.return_value = []
+        cocktail_id = 1
+
+        for _ in range(2):
+            with pytest.raises(exceptions.CocktailRecipeNotFoundError):
+                await self.service.get_cocktail_recipe_message(cocktail_id=cocktail_id)
+        self.service.api_client.get_cocktail_recipe.assert_called_once_with(cocktail_id)
+
+    @pytest.mark.parametrize('invalidated_cocktail_id', [1, None])
+    async def test_invalidate_cocktail_recipe(self, invalidated_cocktail_id):
+        self.service.api_client.get_cocktail_recipe.return_value = parse_obj_as(
+            List[CookingStage], mocks.COCKTAIL_RECIPE_RESPONSE
+        )
+        cocktail_id = 1
+
+        await self.service.get_cocktail_recipe_message(cocktail_id=cocktail_id)
+        self.service.invalidate_cocktail_recipe(invalidated_cocktail_id)
+        await self.service.get_cocktail_recipe_message(cocktail_id=cocktail_id)
+
+        assert self.service.api_client.get_cocktail_recipe.call_count == 2
+
     async def test_get_cocktail_recipe_message_connection_error(self):
         self.service.api_client.get_cocktail_recipe.side_effect = client_exceptions.TransportError
         cocktail_id = 1
@@ -188,6 +716,59 @@ class TestCocktailSearcherService:
             await self.service.get_telegram_user_id(chat_id=chat_id)
         self.service.api_client.get_telegram_users.assert_called_once_with(chat_id)
 
+    async def test_get_telegram_user_id_cached(self):
+        self.service.api_client.get_telegram_users.return_value = PagePagination[TelegramUser].parse_obj(
+            mocks.TELEGRAM_USER_RESPONSE
+        )
+        chat_id = 12345
+
+        assert await self.service.get_telegram_user_id(chat_id=chat_id) == 1
+        assert await self.service.get_telegram_user_id(chat_id=chat_id) == 1
+        self.service.api_client.get_telegram_users.assert_called_once_with(chat_id)
+
+    async def test_get_or_create_telegram_user_id_existing_user(self):
+        self.service.api_client.get_telegram_users.return_value = PagePagination[TelegramUser].parse_obj(
+            mocks.TELEGRAM_USER_RESPONSE
+        )
+        chat_id = 12345
+
+        assert await self.service.get_or_create_telegram_user_id(chat_id=chat_id) == 1
+        assert await self.service.get_or_create_telegram_user_id(chat_id=chat_id) == 1
+        self.service.api_client.get_telegram_users.assert_called_once_with(chat_id)
+        self.service.api_client.create_telegram_user.assert_not_called()
+
+    async def test_get_or_create_telegram_user_id_new_user(self):
+        self.service.api_client.get_telegram_users.return_value = PagePagination[TelegramUser].parse_obj(
+            mocks.PAGINATION_EMPTY_RESPONSE_RESULT
+        )
+        self.service.api_client.create_telegram_user.return_value = TelegramUser.parse_obj(
+            mocks.CREATE_TELEGRAM_USER_RESPONSE
+        )
+        chat_id = 12345
+
+        responses = await asyncio.gather(
+            *(self.service.get_or_create_telegram_user_id(chat_id=chat_id) for _ in range(5))
+        )
+
+        assert responses == [1] * 5
+        self.service.api_client.get_telegram_users.assert_called_once_with(chat_id)
+        self.service.api_client.create_telegram_user.assert_called_once_with(chat_id)
+        assert await self.service.get_telegram_user_id(chat_id=chat_id) == 1
+
+    async def test_get_or_create_telegram_user_id_created_concurrently(self):
+        self.service.api_client.get_telegram_users.side_effect = [
+            PagePagination[TelegramUser].parse_obj(mocks.PAGINATION_EMPTY_RESPONSE_RESULT),
+            PagePagination[TelegramUser].parse_obj(mocks.TELEGRAM_USER_RESPONSE),
+        ]
+        self.service.api_client.create_telegram_user.side_effect = client_exceptions.BadRequestError(
+            message='Bad request',
+            errors=mocks.CREATE_TELEGRAM_USER_BAD_REQUEST_RESPONSE
+        )
+        chat_id = 12345
+
+        assert await self.service.get_or_create_telegram_user_id(chat_id=chat_id) == 1
+        assert self.service.api_client.get_telegram_users.call_count == 2
+
     async def test_create_telegram_user(self):
         self.service.api_client.create_telegram_user.return_value = TelegramUser.parse_obj(
             mocks.CREATE_TELEGRAM_USER_RESPONSE
@@ -246,23 +827,64 @@ class TestCocktailSearcherService:
         self.service.api_client.add_cocktail_to_favorites.assert_called_once_with(telegram_user_id, cocktail_id)
 
     async def test_remove_cocktail_from_favorites(self):
-        favorite_id = 1
-        await self.service.remove_cocktail_from_favorites(favorite_id=favorite_id)
+        favorite_id = telegram_user_id = 1
+        await self.service.remove_cocktail_from_favorites(favorite_id=favorite_id, telegram_user_id=telegram_user_id)
 
         self.service.api_client.remove_cocktail_from_favorites.assert_called_once_with(favorite_id)
 
+    async def test_remove_cocktail_from_favorites_invalidates_cache(self):
+        self.service.api_client.get_favorite_cocktails.return_value = PagePagination[TelegramUserFavorite].parse_obj(
+            mocks.TELEGRAM_USER_FAVORITE_RESPONSE
+        )
+        favorite_id = telegram_user_id = 1
+
+        await self.service.get_favorite_cocktail_message(telegram_user_id=telegram_user_id)
+        await self.service.remove_cocktail_from_favorites(favorite_id=favorite_id, telegram_user_id=telegram_user_id)
+        await self.service.get_favorite_cocktail_message(telegram_user_id=telegram_user_id)
+
+        assert self.service.api_client.get_favorite_cocktails.call_count == 2
+
+    async def test_remove_cocktail_from_favorites_invalidates_page_fetched_during_removal(self):
+        self.service.api_client.get_favorite_cocktails.return_value = PagePagination[TelegramUserFavorite].parse_obj(
+            mocks.TELEGRAM_USER_FAVORITE_RESPONSE
+        )
+        removal_started = asyncio.Event()
+        removal_allowed = asyncio.Event()
+
+        async def remove_cocktail_from_favorites(favorite_id):
+            removal_started.set()
+            await removal_allowed.wait()
+
+        self.service.api_client.remove_cocktail_from_favorites.side_effect = remove_cocktail_from_favorites
+        favorite_id = telegram_user_id = 1
+
+        removal = asyncio.create_task(
+            self.service.remove_cocktail_from_favorites(favorite_id=favorite_id, telegram_user_id=telegram_user_id)
+        )
+        await removal_started.wait()
+        await self.service.get_favorite_cocktail_message(telegram_user_id=telegram_user_id)
+        removal_allowed.set()
+        await removal
+        await self.service.get_favorite_cocktail_message(telegram_user_id=telegram_user_id)
+
+        assert self.service.api_client.get_favorite_cocktails.call_count == 2
+
     async def test_remove_cocktail_from_favorites_not_found(self):
         self.service.api_client.remove_cocktail_from_favorites.side_effect = client_exceptions.NotFoundError
-        favorite_id = 1
+        favorite_id = telegram_user_id = 1
 
         with pytest.raises(exceptions.FavoriteNotFoundError):
-            await self.service.remove_cocktail_from_favorites(favorite_id=favorite_id)
+            await self.service.remove_cocktail_from_favorites(
+                favorite_id=favorite_id, telegram_user_id=telegram_user_id
+            )
         self.service.api_client.remove_cocktail_from_favorites.assert_called_once_with(favorite_id)
 
     async def test_remove_cocktail_from_favorites_connection_error(self):
         self.service.api_client.remove_cocktail_from_favorites.side_effect = client_exceptions.TransportError
-        favorite_id = 1
+        favorite_id = telegram_user_id = 1
 
         with pytest.raises(exceptions.ConnectionToExternalAPIError):
-            await self.service.remove_cocktail_from_favorites(favorite_id=favorite_id)
+            await self.service.remove_cocktail_from_favorites(
+                favorite_id=favorite_id, telegram_user_id=telegram_user_id
+            )
         self.service.api_client.remove_cocktail_from_favorites.assert_called_once_with(favorite_id)
@@ -0,0 +1,37 @@
+from bot.services.cocktail_searcher.store import CocktailStore
+from tests.bot.services.catalog.test_index import CATALOG
+
+
+class TestCocktailStore:
+    def setup_method(self):
+        self.store = CocktailStore(maxsize=3, render_card=lambda cocktail: cocktail.name)
+
+    def test_put_shares_equal_cocktail(self):
+        cocktail = self.store.put(CATALOG[0])
+
+        assert self.store.put(CATALOG[0].copy(deep=True)) is cocktail
+        assert self.store.get(CATALOG[0].id) is cocktail
+        assert self.store.shared == 1
+
+    def test_put_replaces_changed_cocktail(self):
+        self.store.get_card(CATALOG[0])
+        changed_cocktail = CATALOG[0].copy(update={'name': 'Мохито Лайт'})
+
+        assert self.store.put(changed_cocktail) is changed_cocktail
+        assert self.store.get_card(changed_cocktail) == 'Мохито Лайт'
+        assert self.store.renders == 2
+
+    def test_get_card_renders_once(self):
+        assert self.store.get_card(CATALOG[0]) == 'Мохито'
+        assert self.store.get_card(CATALOG[0].copy(deep=True)) == 'Мохито'
+        assert self.store.renders == 1
+        assert self.store.card_hits == 1
+
+    def test_evicts_least_recently_used(self):
+        self.store.put_many(CATALOG[:3])
+        self.store.put(CATALOG[0])
+        self.store.put(CATALOG[3])
+
+        assert len(self.store) == 3
+        assert CATALOG[1].id not in self.store
+        assert CATALOG[0].id in self.store
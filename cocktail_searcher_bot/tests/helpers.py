@@ -1,5 +1,7 @@
+import asyncio
 import json
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse, urlencode, parse_qsl
 
 
@@ -19,3 +21,107 @@ def add_query_params_in_url(url: str, query_params: Dict[str, Any]) -> str:
     parsed_url_query.update(query_params)
 
     return parsed_url._replace(query=urlencode(parsed_url_query)).geturl()
+
+
+class RespServerStub:
+    """
+    Локальный сервер, реализующий команды AUTH, SELECT, PING, GET, MGET, SET (с параметром PX) и DEL протокола Redis
+
+    Attributes:
+        values: значения и время истечения ключей
+        commands: полученные команды
+        batches: количество пакетов команд, прочитанных за одно чтение из соединения
+    """
+
+    def __init__(self, password: Optional[str] = None):
+        self.password = password
+        self.values: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands: List[List[bytes]] = []
+        self.batches = 0
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, '127.0.0.1', 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> 'RespServerStub':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    @property
+    def url(self) -> str:
+        return f'redis://127.0.0.1:{self.port}/0'
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        authenticated = self.password is None
+        try:
+            while True:
+                buffer = await reader.read(65536)
+                if not buffer:
+                    break
+                self.batches += 1
+                commands, replies = self._parse_commands(buffer), []
+                for command in commands:
+                    self.commands.append(command)
+                    name = command[0].upper()
+                    if name == b'AUTH':
+                        authenticated = command[1].decode() == self.password
+                        replies.append(b'+OK\r\n' if authenticated else b'-ERR invalid password\r\n')
+                    elif not authenticated:
+                        replies.append(b'-NOAUTH Authentication required\r\n')
+                    else:
+                        replies.append(self._execute(name, command[1:]))
+                writer.write(b''.join(replies))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _execute(self, name: bytes, arguments: List[bytes]) -> bytes:
+        if name in (b'SELECT', b'PING'):
+            return b'+OK\r\n'
+        if name == b'SET':
+            expires_at = time.monotonic() + int(arguments[3]) / 1000 if len(arguments) > 2 else None
+            self.values[arguments[0]] = (arguments[1], expires_at)
+            return b'+OK\r\n'
+        if name == b'DEL':
+            return b':%d\r\n' % sum(self.values.pop(key, None) is not None for key in arguments)
+        if name == b'GET':
+            return self._encode_value(self._get(arguments[0]))
+        if name == b'MGET':
+            return b'*%d\r\n' % len(arguments) + b''.join(self._encode_value(self._get(key)) for key in arguments)
+
+        return b'-ERR unknown command\r\n'
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[key]
+            return None
+
+        return value
+
+    @staticmethod
+    def _encode_value(value: Optional[bytes]) -> bytes:
+        return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+
+    @staticmethod
+    def _parse_commands(buffer: bytes) -> List[List[bytes]]:
+        commands, lines = [], iter(buffer.split(b'\r\n'))
+        for line in lines:
+            if not line:
+                continue
+            command = []
+            for _ in range(int(line[1:])):
+                next(lines)
+                command.append(next(lines))
+            commands.append(command)
+
+        return commands
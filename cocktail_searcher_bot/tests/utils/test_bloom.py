@@ -0,0 +1,37 @@
+from utils.bloom import BloomFilter
+
+
+class TestBloomFilter:
+    def test_sizing(self):
+        bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+
+        assert bloom_filter.size == 9586
+        assert bloom_filter.hash_count == 7
+
+    def test_add(self):
+        bloom_filter = BloomFilter(capacity=100, false_positive_rate=0.01)
+
+        bloom_filter.add('key')
+        bloom_filter.add(('tuple', 1))
+
+        assert 'key' in bloom_filter
+        assert ('tuple', 1) in bloom_filter
+        assert bloom_filter.count == 2
+
+    def test_no_false_negatives(self):
+        bloom_filter = BloomFilter(capacity=1000, false_positive_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(i)
+
+        assert all(i in bloom_filter for i in range(1000))
+        assert 0 < bloom_filter.estimated_false_positive_rate < 0.02
+
+    def test_clear(self):
+        bloom_filter = BloomFilter(capacity=100, false_positive_rate=0.01)
+        bloom_filter.add('key')
+
+        bloom_filter.clear()
+
+        assert 'key' not in bloom_filter
+        assert bloom_filter.count == 0
+        assert bloom_filter.estimated_false_positive_rate == 0
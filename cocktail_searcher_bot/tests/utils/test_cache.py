@@ -0,0 +1,185 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from utils.cache import TTLCache, NegativeCache
+
+
+@pytest.mark.asyncio
+class TestTTLCache:
+    async def test_get_or_set(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        factory = AsyncMock(return_value='value')
+
+        assert await cache.get_or_set('key', factory) == 'value'
+        assert await cache.get_or_set('key', factory) == 'value'
+        factory.assert_awaited_once()
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    async def test_ttl_expiration(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        with patch('utils.cache.time.monotonic', return_value=0):
+            cache.set('key', 'value')
+            assert cache.get('key') == 'value'
+        with patch('utils.cache.time.monotonic', return_value=60):
+            assert cache.get('key') is None
+        assert len(cache) == 0
+
+    async def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('first', 1)
+        cache.set('second', 2)
+        cache.get('first')
+        cache.set('third', 3)
+
+        assert 'first' in cache
+        assert 'second' not in cache
+        assert 'third' in cache
+        assert len(cache) == 2
+
+    async def test_concurrent_misses_call_factory_once(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 'value'
+
+        results = await asyncio.gather(*(cache.get_or_set('key', factory) for _ in range(10)))
+
+        assert results == ['value'] * 10
+        assert calls == 1
+
+    async def test_factory_exception_is_not_cached(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        factory = AsyncMock(side_effect=[ValueError, 'value'])
+
+        with pytest.raises(ValueError):
+            await cache.get_or_set('key', factory)
+        assert await cache.get_or_set('key', factory) == 'value'
+        assert factory.await_count == 2
+
+    async def test_factory_cancelled_when_no_waiters_left(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def factory():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.ensure_future(cache.get_or_set('key', factory))
+        await started.wait()
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+        assert 'key' not in cache
+
+    async def test_invalidate_where(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set((1, 1), 'first')
+        cache.set((1, 2), 'second')
+        cache.set((2, 1), 'third')
+
+        cache.invalidate_where(lambda key: key[0] == 1)
+
+        assert len(cache) == 1
+        assert (2, 1) in cache
+
+    async def test_ttl_resolver(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        with patch('utils.cache.time.monotonic', return_value=0):
+            await cache.get_or_set('key', AsyncMock(return_value=''), lambda value: None if value else 10)
+        with patch('utils.cache.time.monotonic', return_value=10):
+            assert 'key' not in cache
+
+    async def test_stale_while_revalidate(self):
+        cache = TTLCache(maxsize=10, ttl=60, stale_ttl=60)
+        with patch('utils.cache.time.monotonic', return_value=0):
+            cache.set('key', 'stale')
+
+        with patch('utils.cache.time.monotonic', return_value=90):
+            assert await cache.get_or_set('key', AsyncMock(return_value='fresh')) == 'stale'
+            await cache.wait()
+            assert cache.get('key') == 'fresh'
+        assert cache.stale_hits == 1
+
+    @pytest.mark.parametrize('is_stale_error, stale_kept', [(lambda ex: True, True), (lambda ex: False, False)])
+    async def test_stale_if_error(self, is_stale_error, stale_kept):
+        cache = TTLCache(maxsize=10, ttl=60, stale_ttl=60, is_stale_error=is_stale_error)
+        with patch('utils.cache.time.monotonic', return_value=0):
+            cache.set('key', 'stale')
+
+        with patch('utils.cache.time.monotonic', return_value=90):
+            assert await cache.get_or_set('key', AsyncMock(side_effect=ValueError)) == 'stale'
+            await cache.wait()
+            assert (cache._get_entry('key') is not None) == stale_kept
+        assert cache.refresh_failures == 1
+
+    async def test_stale_entry_expiration(self):
+        cache = TTLCache(maxsize=10, ttl=60, stale_ttl=60)
+        with patch('utils.cache.time.monotonic', return_value=0):
+            cache.set('key', 'stale')
+
+        with patch('utils.cache.time.monotonic', return_value=120):
+            assert await cache.get_or_set('key', AsyncMock(return_value='fresh')) == 'fresh'
+        assert cache.stale_hits == 0
+        assert cache.misses == 1
+
+
+class TestNegativeCache:
+    def test_add(self):
+        cache = NegativeCache(capacity=100, ttl=60, false_positive_rate=0.01)
+
+        cache.add('absent')
+
+        assert 'absent' in cache
+        assert 'present' not in cache
+        assert cache.hits == 1
+        assert cache.filter_rejections + cache.false_positives == 1
+
+    def test_ttl_expiration(self):
+        cache = NegativeCache(capacity=100, ttl=60, false_positive_rate=0.01)
+        with patch('utils.cache.time.monotonic', return_value=0):
+            cache.add('absent')
+        with patch('utils.cache.time.monotonic', return_value=60):
+            assert 'absent' not in cache
+        assert cache.false_positives == 1
+        assert cache.false_positive_rate == 1.0
+
+    def test_filter_rebuilt_over_capacity(self):
+        cache = NegativeCache(capacity=10, ttl=60, false_positive_rate=0.01)
+
+        for i in range(25):
+            cache.add(i)
+
+        assert all(i in cache for i in range(15, 25))
+        assert all(i not in cache for i in range(15))
+        assert cache._filter.count <= 2 * cache.capacity
+
+    def test_filter_rebuilds_amortized(self):
+        cache = NegativeCache(capacity=10, ttl=60, false_positive_rate=0.01)
+
+        for i in range(1000):
+            cache.add(i)
+
+        assert 0 < cache.rebuilds <= 1000 // cache.capacity
+        assert all(i in cache for i in range(990, 1000))
+
+    def test_false_positive_rate(self):
+        cache = NegativeCache(capacity=1000, ttl=60, false_positive_rate=0.01)
+        for i in range(1000):
+            cache.add(f'absent {i}')
+
+        for i in range(10000):
+            assert f'present {i}' not in cache
+
+        assert cache.false_positive_rate < 0.03
@@ -0,0 +1,166 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+from aiogram import Bot
+from aiogram.fsm.storage.base import StateType, StorageKey
+from aiogram.fsm.storage.memory import DisabledEventIsolation, MemoryStorage
+from aiogram.types import User
+
+from bot.states import SearchStates
+from tests.helpers import RespServerStub
+from utils.aiogram.context import BufferedFSMContext, BufferedFSMContextMiddleware
+from utils.aiogram.storage import KeyLockEventIsolation, KeyValueStorage
+from utils.resp import RespClient
+
+BOT = Bot(token='42:TEST')
+KEY = StorageKey(bot_id=BOT.id, chat_id=2, user_id=2)
+USER = User(id=2, is_bot=False, first_name='Test')
+
+
+class CountingStorage(MemoryStorage):
+    def __init__(self):
+        super().__init__()
+        self.calls: List[str] = []
+
+    async def set_state(self, bot: Bot, key: StorageKey, state: StateType = None):
+        self.calls.append('set_state')
+        await super().set_state(bot, key, state)
+
+    async def get_state(self, bot: Bot, key: StorageKey) -> Optional[str]:
+        self.calls.append('get_state')
+        return await super().get_state(bot, key)
+
+    async def set_data(self, bot: Bot, key: StorageKey, data: Dict[str, Any]):
+        self.calls.append('set_data')
+        await super().set_data(bot, key, data)
+
+    async def get_data(self, bot: Bot, key: StorageKey) -> Dict[str, Any]:
+        self.calls.append('get_data')
+        return await super().get_data(bot, key)
+
+
+@pytest.mark.asyncio
+class TestBufferedFSMContext:
+    async def test_load_and_flush_once(self):
+        storage = CountingStorage()
+        await storage.set_data(BOT, KEY, {'page': 1, 'paginated_message_id': 10})
+        storage.calls.clear()
+        context = BufferedFSMContext(BOT, storage, KEY)
+
+        await context.load()
+        data = await context.get_data()
+        await context.update_data(page=data['page'] + 1)
+        await context.update_data(paginated_message_id=None)
+        await context.set_state(SearchStates.COCKTAIL_DISPLAY_STATE)
+
+        assert await context.get_state() == SearchStates.COCKTAIL_DISPLAY_STATE.state
+        assert storage.calls == ['get_state', 'get_data']
+
+        await context.flush()
+
+        assert storage.calls == ['get_state', 'get_data', 'set_state', 'set_data']
+        assert await storage.get_data(BOT, KEY) == {'page': 2, 'paginated_message_id': None}
+
+    async def test_flush_skipped_without_changes(self):
+        storage = CountingStorage()
+        await storage.set_state(BOT, KEY, SearchStates.COCKTAIL_DISPLAY_STATE)
+        await storage.set_data(BOT, KEY, {'page': 1})
+        storage.calls.clear()
+        context = BufferedFSMContext(BOT, storage, KEY)
+
+        await context.load()
+        await context.update_data(page=1)
+        await context.set_state(SearchStates.COCKTAIL_DISPLAY_STATE)
+        await context.flush()
+
+        assert storage.calls == ['get_state', 'get_data']
+
+    async def test_flush_only_changed_part(self):
+        storage = CountingStorage()
+        context = BufferedFSMContext(BOT, storage, KEY)
+
+        await context.load()
+        await context.set_state(SearchStates.COCKTAIL_DISPLAY_STATE)
+        await context.flush()
+        await context.flush()
+
+        assert storage.calls == ['get_state', 'get_data', 'set_state']
+
+    async def test_returned_data_is_copy(self):
+        context = BufferedFSMContext(BOT, MemoryStorage(), KEY)
+        await context.load()
+
+        data = await context.get_data()
+        data['page'] = 1
+
+        assert await context.get_data() == {}
+
+    async def test_record_storage_single_round_trips(self):
+        async with RespServerStub() as server:
+            storage = KeyValueStorage(RespClient(port=server.port))
+            try:
+                await storage.set_record(KEY, SearchStates.COCKTAIL_DISPLAY_STATE, {'page': 1})
+                batches = server.batches
+                context = BufferedFSMContext(BOT, storage, KEY)
+
+                await context.load()
+                await context.update_data(page=2)
+                await context.update_data(paginated_message_id=None)
+                await context.clear()
+                await context.flush()
+
+                assert server.batches == batches + 2
+                assert await storage.get_record(KEY) == (None, {})
+            finally:
+                await storage.close()
+
+
+@pytest.mark.asyncio
+class TestBufferedFSMContextMiddleware:
+    def setup_method(self):
+        self.storage = CountingStorage()
+        self.middleware = BufferedFSMContextMiddleware(self.storage, KeyLockEventIsolation())
+
+    async def test_handler_receives_buffered_context(self):
+        await self.storage.set_state(BOT, KEY, SearchStates.COCKTAIL_DISPLAY_STATE)
+        self.storage.calls.clear()
+
+        async def handler(event, data):
+            assert isinstance(data['state'], BufferedFSMContext)
+            assert data['raw_state'] == SearchStates.COCKTAIL_DISPLAY_STATE.state
+            await data['state'].update_data(page=1)
+            return 'handled'
+
+        assert await self.middleware(handler, None, {'bot': BOT, 'event_from_user': USER}) == 'handled'
+        assert self.storage.calls == ['get_state', 'get_data', 'set_data']
+
+    async def test_changes_flushed_on_error(self):
+        async def handler(event, data):
+            await data['state'].set_state(SearchStates.COCKTAIL_DISPLAY_STATE)
+            raise ValueError
+
+        with pytest.raises(ValueError):
+            await self.middleware(handler, None, {'bot': BOT, 'event_from_user': USER})
+
+        assert await self.storage.get_state(BOT, KEY) == SearchStates.COCKTAIL_DISPLAY_STATE.state
+
+    async def test_event_without_user(self):
+        async def handler(event, data):
+            assert 'state' not in data
+            return 'handled'
+
+        assert await self.middleware(handler, None, {'bot': BOT}) == 'handled'
+        assert not self.storage.calls
+
+    async def test_concurrent_events_do_not_overwrite_changes(self):
+        middleware = BufferedFSMContextMiddleware(self.storage, KeyLockEventIsolation())
+
+        async def handler(event, data):
+            page = (await data['state'].get_data()).get('page', 0)
+            await asyncio.sleep(0)
+            await data['state'].update_data(page=page + 1)
+
+        await asyncio.gather(*(middleware(handler, None, {'bot': BOT, 'event_from_user': USER}) for _ in range(3)))
+
+        assert await self.storage.get_data(BOT, KEY) == {'page': 3}
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from utils.debouncer import Debouncer
+
+
+@pytest.mark.asyncio
+class TestDebouncer:
+    async def test_single_call(self):
+        debouncer = Debouncer(delay=0)
+
+        assert await debouncer.wait('key')
+        assert debouncer.superseded == 0
+
+    async def test_superseded_calls(self):
+        debouncer = Debouncer(delay=0.01)
+
+        results = await asyncio.gather(*(debouncer.wait('key') for _ in range(3)), debouncer.wait('other key'))
+
+        assert results == [False, False, True, True]
+        assert debouncer.superseded == 2
+
+    async def test_zero_delay_drops_only_pending_superseded_calls(self):
+        debouncer = Debouncer(delay=0)
+
+        results = await asyncio.gather(debouncer.wait('key'), debouncer.wait('key'))
+
+        assert results == [False, True]
+        assert await debouncer.wait('key')
+        assert debouncer.superseded == 1
+
+    async def test_cancelled_call_does_not_supersede(self):
+        debouncer = Debouncer(delay=60)
+        waiting = asyncio.ensure_future(debouncer.wait('key'))
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        debouncer.delay = 0
+        assert await debouncer.wait('key')
@@ -0,0 +1,54 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from utils.prefetcher import Prefetcher
+
+
+@pytest.mark.asyncio
+class TestPrefetcher:
+    async def test_schedule(self):
+        prefetcher = Prefetcher(max_tasks=2)
+        factory = AsyncMock()
+
+        prefetcher.schedule('scope', {'first': factory, 'second': factory})
+        await prefetcher.wait()
+
+        assert factory.await_count == 2
+        assert prefetcher.scheduled == 2
+        assert len(prefetcher) == 0
+
+    async def test_tasks_over_budget_are_dropped(self):
+        prefetcher = Prefetcher(max_tasks=1)
+        factory = AsyncMock()
+
+        prefetcher.schedule('scope', {'first': factory, 'second': factory})
+        await prefetcher.wait()
+
+        factory.assert_awaited_once()
+        assert prefetcher.dropped == 1
+
+    async def test_outdated_tasks_are_cancelled(self):
+        prefetcher = Prefetcher(max_tasks=2)
+        started = asyncio.Event()
+
+        async def slow_factory():
+            started.set()
+            await asyncio.sleep(60)
+
+        prefetcher.schedule('scope', {'first': slow_factory})
+        await started.wait()
+        prefetcher.schedule('scope', {'second': AsyncMock()})
+        await prefetcher.wait()
+
+        assert prefetcher.cancelled == 1
+        assert len(prefetcher) == 0
+
+    async def test_factory_exception_is_suppressed(self):
+        prefetcher = Prefetcher(max_tasks=1)
+
+        prefetcher.schedule('scope', {'key': AsyncMock(side_effect=ValueError)})
+        await prefetcher.wait()
+
+        assert len(prefetcher) == 0
@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Tuple
+
+import pytest
+
+from tests.helpers import RespServerStub
+from utils.resp import RespClient, RespError, encode_command
+
+
+def test_encode_command():
+    assert encode_command(['SET', 'key', b'value', 'PX', 1000]) == \
+        b'*5\r\n$3\r\nSET\r\n$3\r\nkey\r\n$5\r\nvalue\r\n$2\r\nPX\r\n$4\r\n1000\r\n'
+
+
+@pytest.mark.parametrize('url, host, port, db, password', [
+    ('redis://example.com', 'example.com', 6379, 0, None),
+    ('redis://:secret@example.com:6380/2', 'example.com', 6380, 2, 'secret'),
+])
+def test_from_url(url, host, port, db, password):
+    client = RespClient.from_url(url)
+
+    assert (client.host, client.port, client.db, client.password) == (host, port, db, password)
+
+
+def test_from_url_unsupported_scheme():
+    with pytest.raises(ValueError):
+        RespClient.from_url('http://example.com')
+
+
+@asynccontextmanager
+async def connect() -> AsyncIterator[Tuple[RespServerStub, RespClient]]:
+    async with RespServerStub(password='secret') as server:
+        client = RespClient(port=server.port, db=1, password='secret')
+        try:
+            yield server, client
+        finally:
+            await client.close()
+
+
+@pytest.mark.asyncio
+class TestRespClient:
+    async def test_execute(self):
+        async with connect() as (server, client):
+            assert await client.execute('SET', 'key', 'value') == 'OK'
+            assert await client.execute('GET', 'key') == b'value'
+            assert await client.execute('MGET', 'key', 'missing') == [b'value', None]
+            assert await client.execute('DEL', 'key', 'missing') == 1
+            assert server.commands[:2] == [[b'AUTH', b'secret'], [b'SELECT', b'1']]
+
+    async def test_pipeline_sends_commands_at_once(self):
+        async with connect() as (server, client):
+            await client.execute('PING')
+            batches = server.batches
+
+            replies = await client.pipeline([('SET', 'first', 1), ('SET', 'second', 2), ('MGET', 'first', 'second')])
+
+            assert replies == ['OK', 'OK', [b'1', b'2']]
+            assert server.batches == batches + 1
+
+    async def test_connections_reused(self):
+        async with connect() as (server, client):
+            await asyncio.gather(*(client.execute('PING') for _ in range(3)))
+            await client.execute('PING')
+
+            assert server.commands.count([b'AUTH', b'secret']) == 3
+            assert len(client._idle_connections) == 3
+
+    async def test_error_reply(self):
+        async with connect() as (server, client):
+            with pytest.raises(RespError):
+                await client.pipeline([('SET', 'key', 'value'), ('UNKNOWN',)])
+
+            assert await client.execute('GET', 'key') == b'value'
+
+    async def test_wrong_password(self):
+        async with RespServerStub(password='secret') as server:
+            client = RespClient(port=server.port, password='wrong')
+
+            with pytest.raises(RespError):
+                await client.execute('PING')
+
+    async def test_connection_error(self):
+        async with RespServerStub() as server:
+            port = server.port
+        client = RespClient(port=port, timeout=1)
+
+        with pytest.raises(ConnectionError):
+            await client.execute('PING')
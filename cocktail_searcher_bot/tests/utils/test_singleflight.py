@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    async def test_concurrent_calls_share_execution(self):
+        single_flight = SingleFlight()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(single_flight.run('key', factory) for _ in range(3)))
+
+        assert results == [1, 1, 1]
+        assert single_flight.executions == 1
+        assert single_flight.shared == 2
+        assert 'key' not in single_flight
+
+    async def test_forgotten_key_starts_new_execution(self):
+        single_flight = SingleFlight()
+        results = []
+        release = asyncio.Event()
+
+        async def slow_factory():
+            await release.wait()
+            return 'outdated'
+
+        async def factory():
+            return 'actual'
+
+        outdated = asyncio.ensure_future(single_flight.run('key', slow_factory, results.append))
+        await asyncio.sleep(0)
+        single_flight.forget('key')
+        assert await single_flight.run('key', factory, results.append) == 'actual'
+        release.set()
+
+        assert await outdated == 'outdated'
+        assert results == ['actual']
+
+    async def test_call_after_last_waiter_cancelled_starts_new_execution(self):
+        single_flight = SingleFlight()
+
+        async def slow_factory():
+            await asyncio.sleep(60)
+
+        async def factory():
+            return 'actual'
+
+        waiting = asyncio.ensure_future(single_flight.run('key', slow_factory))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.sleep(0)
+
+        assert await single_flight.run('key', factory) == 'actual'
+        assert single_flight.executions == 2
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
@@ -0,0 +1,182 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+
+from unittest.mock import patch
+
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+
+from bot.states import SearchStates
+from tests.helpers import RespServerStub
+from utils.aiogram.storage import BoundedMemoryStorage, KeyLockEventIsolation, KeyValueStorage
+from utils.resp import RespClient
+
+KEY = StorageKey(bot_id=1, chat_id=2, user_id=3)
+
+
+@asynccontextmanager
+async def connect(state_ttl: Optional[float] = None) -> AsyncIterator[Tuple[RespServerStub, KeyValueStorage]]:
+    async with RespServerStub() as server:
+        storage = KeyValueStorage(RespClient(port=server.port), state_ttl=state_ttl)
+        try:
+            yield server, storage
+        finally:
+            await storage.close()
+
+
+@pytest.mark.asyncio
+class TestKeyValueStorage:
+    async def test_state(self):
+        async with connect() as (server, storage):
+            assert await storage.get_state(None, KEY) is None
+
+            await storage.set_state(None, KEY, SearchStates.COCKTAIL_DISPLAY_STATE)
+
+            assert await storage.get_state(None, KEY) == SearchStates.COCKTAIL_DISPLAY_STATE.state
+            assert b'fsm:1:2:3:default:state' in server.values
+
+            await storage.set_state(None, KEY, None)
+
+            assert await storage.get_state(None, KEY) is None
+            assert not server.values
+
+    async def test_data(self):
+        data = {'search_query': 'мохито', 'page': 2, 'ingredients': None, 'paginated_message_id': 10}
+        async with connect() as (server, storage):
+            assert await storage.get_data(None, KEY) == {}
+
+            await storage.set_data(None, KEY, data)
+
+            assert await storage.get_data(None, KEY) == data
+            assert await storage.update_data(None, KEY, {'page': 3}) == {**data, 'page': 3}
+
+            await storage.set_data(None, KEY, {})
+
+            assert not server.values
+
+    async def test_record_pipelined(self):
+        async with connect() as (server, storage):
+            await storage.set_state(None, KEY, None)
+            batches = server.batches
+
+            await storage.set_record(KEY, SearchStates.COCKTAIL_DISPLAY_STATE, {'page': 1})
+
+            assert await storage.get_record(KEY) == (SearchStates.COCKTAIL_DISPLAY_STATE.state, {'page': 1})
+            assert server.batches == batches + 2
+
+    async def test_state_ttl(self):
+        async with connect(state_ttl=0.05) as (server, storage):
+            await storage.set_record(KEY, SearchStates.COCKTAIL_DISPLAY_STATE, {'page': 1})
+
+            assert [b'PX', b'50'] == server.commands[-1][-2:]
+
+            await asyncio.sleep(0.06)
+
+            assert await storage.get_record(KEY) == (None, {})
+
+
+@pytest.mark.asyncio
+class TestBoundedMemoryStorage:
+    async def test_state_and_data(self):
+        storage = BoundedMemoryStorage(maxsize=10)
+        data = {'search_query': 'мохито', 'page': 2, 'telegram_user_id': 5, 'paginated_message_id': 10}
+
+        await storage.set_state(None, KEY, SearchStates.COCKTAIL_DISPLAY_STATE)
+        await storage.set_data(None, KEY, data)
+
+        assert await storage.get_state(None, KEY) == SearchStates.COCKTAIL_DISPLAY_STATE.state
+        assert await storage.get_data(None, KEY) == data
+        assert await storage.update_data(None, KEY, {'page': 3}) == {**data, 'page': 3}
+        assert await storage.get_record(KEY) == (SearchStates.COCKTAIL_DISPLAY_STATE.state, {**data, 'page': 3})
+        assert len(storage) == 1
+
+        await storage.set_record(KEY, None, {})
+
+        assert await storage.get_record(KEY) == (None, {})
+        assert len(storage) == 0
+        assert storage.approximate_bytes == 0
+
+    async def test_lru_eviction(self):
+        storage = BoundedMemoryStorage(maxsize=2)
+        keys = [StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id) for chat_id in range(3)]
+        await storage.set_data(None, keys[0], {'page': 0})
+        await storage.set_data(None, keys[1], {'page': 1})
+
+        await storage.get_data(None, keys[0])
+        await storage.set_data(None, keys[2], {'page': 2})
+
+        assert await storage.get_data(None, keys[0]) == {'page': 0}
+        assert await storage.get_data(None, keys[1]) == {}
+        assert await storage.get_data(None, keys[2]) == {'page': 2}
+        assert storage.evictions == 1
+
+    async def test_max_bytes(self):
+        storage = BoundedMemoryStorage(maxsize=1000)
+        await storage.set_data(None, KEY, {'page': 1})
+        storage.max_bytes = storage.approximate_bytes * 10
+
+        for chat_id in range(100):
+            await storage.set_data(None, StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id), {'page': 1})
+
+        assert len(storage) == 10
+        assert storage.approximate_bytes <= storage.max_bytes
+        assert storage.evictions == 91
+
+    async def test_idle_ttl(self):
+        storage = BoundedMemoryStorage(maxsize=10, state_ttl=60)
+        other_key = StorageKey(bot_id=1, chat_id=5, user_id=5)
+        with patch('utils.aiogram.storage.time.monotonic', return_value=0):
+            await storage.set_data(None, KEY, {'page': 1})
+            await storage.set_data(None, other_key, {'page': 2})
+        with patch('utils.aiogram.storage.time.monotonic', return_value=50):
+            assert await storage.get_data(None, KEY) == {'page': 1}
+        with patch('utils.aiogram.storage.time.monotonic', return_value=100):
+            assert await storage.get_data(None, KEY) == {'page': 1}
+            assert await storage.get_data(None, other_key) == {}
+
+        assert len(storage) == 1
+        assert storage.expirations == 1
+
+    async def test_memory_stays_flat(self):
+        storage = BoundedMemoryStorage(maxsize=1000)
+
+        for chat_id in range(10000):
+            key = StorageKey(bot_id=1, chat_id=chat_id, user_id=chat_id)
+            await storage.set_state(None, key, SearchStates.COCKTAIL_DISPLAY_STATE)
+            await storage.update_data(None, key, {'search_query': 'мохито', 'page': 1, 'paginated_message_id': chat_id})
+            if chat_id == 999:
+                approximate_bytes = storage.approximate_bytes
+
+        assert len(storage) == 1000
+        assert abs(storage.approximate_bytes - approximate_bytes) < approximate_bytes * 0.01
+
+
+@pytest.mark.asyncio
+class TestKeyLockEventIsolation:
+    async def test_events_of_key_are_sequential(self):
+        isolation = KeyLockEventIsolation()
+        other_key = StorageKey(bot_id=1, chat_id=4, user_id=4)
+        events = []
+
+        async def handle(key, name):
+            async with isolation.lock(None, key):
+                events.append(f'{name} started')
+                await asyncio.sleep(0)
+                events.append(f'{name} finished')
+
+        await asyncio.gather(handle(KEY, 'first'), handle(KEY, 'second'), handle(other_key, 'other'))
+
+        assert events == ['first started', 'other started', 'first finished', 'other finished', 'second started',
+                          'second finished']
+        assert len(isolation) == 0
+
+    async def test_lock_removed_after_error(self):
+        isolation = KeyLockEventIsolation()
+
+        with pytest.raises(ValueError):
+            async with isolation.lock(None, KEY):
+                assert len(isolation) == 1
+                raise ValueError
+
+        assert len(isolation) == 0
@@ -71,3 +71,11 @@ class TestInclinePaginationKeyboardMarkup:
 
         assert isinstance(markup, InlinePaginationKeyboardMarkup)
         assert markup.inline_keyboard == additional_buttons
+
+    def test_pagination_buttons_memoized(self):
+        markup = InlinePaginationKeyboardMarkup(page_count=10, current_page=5)
+        other_markup = InlinePaginationKeyboardMarkup(page_count=10, current_page=5)
+
+        assert other_markup.inline_keyboard == markup.inline_keyboard
+        assert InlinePaginationKeyboardMarkup._build_pagination_buttons(10, 5)[0] is \
+            InlinePaginationKeyboardMarkup._build_pagination_buttons(10, 5)[0]
@@ -0,0 +1,99 @@
+from copy import deepcopy
+from typing import Any, Awaitable, Callable, Dict, Optional, cast
+
+from aiogram import Bot
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.middleware import FSMContextMiddleware
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.types import TelegramObject
+
+from utils.aiogram.storage import RecordStorage
+
+
+class BufferedFSMContext(FSMContext):
+    """Контекст FSM, буферизующий состояние и данные в пределах обработки одного события
+
+    Состояние и данные читаются из хранилища один раз при загрузке, после чего чтение и изменение выполняются в памяти.
+    Изменения записываются в хранилище методом flush, если состояние или данные отличаются от загруженных. Хранилища
+    RecordStorage читаются и записываются за один обмен.
+    """
+
+    def __init__(self, bot: Bot, storage: BaseStorage, key: StorageKey):
+        super().__init__(bot=bot, storage=storage, key=key)
+        self._state: Optional[str] = None
+        self._data: Dict[str, Any] = {}
+        self._loaded_state: Optional[str] = None
+        self._loaded_data: Dict[str, Any] = {}
+
+    async def load(self):
+        """Загружает состояние и данные из хранилища"""
+        if isinstance(self.storage, RecordStorage):
+            self._state, self._data = await self.storage.get_record(self.key)
+        else:
+            self._state = await self.storage.get_state(bot=self.bot, key=self.key)
+            self._data = await self.storage.get_data(bot=self.bot, key=self.key)
+        self._loaded_state, self._loaded_data = self._state, deepcopy(self._data)
+
+    async def flush(self):
+        """Записывает измененные состояние и данные в хранилище"""
+        state_changed = self._state != self._loaded_state
+        data_changed = self._data != self._loaded_data
+        if not state_changed and not data_changed:
+            return
+
+        if isinstance(self.storage, RecordStorage):
+            await self.storage.set_record(self.key, self._state, self._data)
+        else:
+            if state_changed:
+                await self.storage.set_state(bot=self.bot, key=self.key, state=self._state)
+            if data_changed:
+                await self.storage.set_data(bot=self.bot, key=self.key, data=self._data)
+        self._loaded_state, self._loaded_data = self._state, deepcopy(self._data)
+
+    async def set_state(self, state: StateType = None):
+        self._state = state.state if isinstance(state, State) else state
+
+    async def get_state(self) -> Optional[str]:
+        return self._state
+
+    async def set_data(self, data: Dict[str, Any]):
+        self._data = data.copy()
+
+    async def get_data(self) -> Dict[str, Any]:
+        return self._data.copy()
+
+    async def update_data(self, data: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Dict[str, Any]:
+        if data:
+            kwargs.update(data)
+        self._data.update(kwargs)
+
+        return self._data.copy()
+
+
+class BufferedFSMContextMiddleware(FSMContextMiddleware):
+    """
+    Middleware FSM, передающее обработчикам буферизующий контекст BufferedFSMContext
+
+    Состояние и данные загружаются один раз до обработки события и записываются одним обменом с хранилищем после
+    обработки, в том числе завершившейся исключением, если они изменились.
+    """
+
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        bot = cast(Bot, data['bot'])
+        data['fsm_storage'] = self.storage
+        context = self.resolve_event_context(bot, data)
+        if context is None:
+            return await handler(event, data)
+
+        buffered_context = BufferedFSMContext(bot=bot, storage=self.storage, key=context.key)
+        async with self.events_isolation.lock(bot=bot, key=context.key):
+            await buffered_context.load()
+            data.update({'state': buffered_context, 'raw_state': await buffered_context.get_state()})
+            try:
+                return await handler(event, data)
+            finally:
+                await buffered_context.flush()
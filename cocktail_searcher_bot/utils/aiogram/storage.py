@@ -0,0 +1,294 @@
+import asyncio
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Dict, List, NamedTuple, Optional, Tuple
+
+import orjson
+from aiogram import Bot
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, StateType, StorageKey
+
+from utils.resp import RespArgument, RespClient
+
+# Приблизительный размер узла OrderedDict и слота хеш-таблицы, приходящихся на одну запись хранилища
+ENTRY_OVERHEAD_BYTES = 100
+
+
+class RecordStorage(BaseStorage, ABC):
+    """Хранилище FSM, умеющее читать и записывать состояние и данные ключа вместе"""
+
+    @abstractmethod
+    async def get_record(self, key: StorageKey) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Читает состояние и данные
+
+        Args:
+            key: ключ FSM
+
+        Returns:
+            Состояние и данные
+        """
+
+    @abstractmethod
+    async def set_record(self, key: StorageKey, state: StateType, data: Dict[str, Any]):
+        """Записывает состояние и данные
+
+        Args:
+            key: ключ FSM
+            state: состояние
+            data: данные
+        """
+
+
+class KeyValueStorage(RecordStorage):
+    """Хранилище FSM в хранилище ключ-значение, совместимом с протоколом Redis
+
+    Состояние и данные каждого ключа FSM хранятся в отдельных ключах хранилища, данные сериализуются в компактный JSON.
+    Пустые состояние и данные удаляются из хранилища. При записи ключам устанавливается время жизни state_ttl, поэтому
+    данные неактивных пользователей удаляются самим хранилищем. Состояние и данные можно прочитать и записать вместе за
+    один обмен с хранилищем.
+
+    Attributes:
+        client: клиент хранилища ключ-значение
+        prefix: префикс ключей хранилища
+        state_ttl: время жизни состояния и данных в секундах с последней записи. Если не указано, не ограничено
+    """
+
+    def __init__(self, client: RespClient, prefix: str = 'fsm', state_ttl: Optional[float] = None):
+        self.client = client
+        self.prefix = prefix
+        self.state_ttl = state_ttl
+
+    async def set_state(self, bot: Bot, key: StorageKey, state: StateType = None):
+        await self.client.pipeline([self._build_state_command(key, state)])
+
+    async def get_state(self, bot: Bot, key: StorageKey) -> Optional[str]:
+        state = await self.client.execute('GET', self._build_key(key, 'state'))
+
+        return state.decode() if state is not None else None
+
+    async def set_data(self, bot: Bot, key: StorageKey, data: Dict[str, Any]):
+        await self.client.pipeline([self._build_data_command(key, data)])
+
+    async def get_data(self, bot: Bot, key: StorageKey) -> Dict[str, Any]:
+        data = await self.client.execute('GET', self._build_key(key, 'data'))
+
+        return orjson.loads(data) if data is not None else {}
+
+    async def get_record(self, key: StorageKey) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Читает состояние и данные за один обмен с хранилищем
+
+        Args:
+            key: ключ FSM
+
+        Returns:
+            Состояние и данные
+        """
+        state, data = await self.client.execute('MGET', self._build_key(key, 'state'), self._build_key(key, 'data'))
+
+        return state.decode() if state is not None else None, orjson.loads(data) if data is not None else {}
+
+    async def set_record(self, key: StorageKey, state: StateType, data: Dict[str, Any]):
+        """Записывает состояние и данные за один обмен с хранилищем
+
+        Args:
+            key: ключ FSM
+            state: состояние
+            data: данные
+        """
+        await self.client.pipeline([self._build_state_command(key, state), self._build_data_command(key, data)])
+
+    async def close(self):
+        await self.client.close()
+
+    def _build_key(self, key: StorageKey, part: str) -> str:
+        return f'{self.prefix}:{key.bot_id}:{key.chat_id}:{key.user_id}:{key.destiny}:{part}'
+
+    def _build_state_command(self, key: StorageKey, state: StateType) -> List[RespArgument]:
+        state = state.state if isinstance(state, State) else state
+        if state is None:
+            return ['DEL', self._build_key(key, 'state')]
+
+        return self._build_set_command(self._build_key(key, 'state'), state)
+
+    def _build_data_command(self, key: StorageKey, data: Dict[str, Any]) -> List[RespArgument]:
+        if not data:
+            return ['DEL', self._build_key(key, 'data')]
+
+        return self._build_set_command(self._build_key(key, 'data'), orjson.dumps(data))
+
+    def _build_set_command(self, storage_key: str, value: RespArgument) -> List[RespArgument]:
+        if self.state_ttl is None:
+            return ['SET', storage_key, value]
+
+        return ['SET', storage_key, value, 'PX', int(self.state_ttl * 1000)]
+
+
+class StateEntry(NamedTuple):
+    accessed_at: float
+    state: Optional[str]
+    data: bytes
+
+
+class BoundedMemoryStorage(RecordStorage):
+    """Хранилище FSM в памяти процесса с ограниченным временем простоя и объемом
+
+    В отличие от MemoryStorage, записи пользователей, не обращавшихся к боту дольше state_ttl секунд, удаляются, а при
+    превышении максимального количества записей или их приблизительного объема вытесняются давно использованные
+    записи. Запись хранит интернированную строку состояния и данные, сериализованные в компактный JSON. Пустые
+    состояние и данные не хранятся.
+
+    Attributes:
+        maxsize: максимальное количество записей
+        max_bytes: максимальный приблизительный объем записей в байтах. Если не указан, не ограничен
+        state_ttl: время жизни записи в секундах с последнего обращения. Если не указано, не ограничено
+        evictions: количество записей, вытесненных из-за ограничения количества или объема
+        expirations: количество записей, удаленных по истечении времени жизни
+    """
+
+    def __init__(self, maxsize: int, max_bytes: Optional[int] = None, state_ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.state_ttl = state_ttl
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[Tuple[int, int, int, str], StateEntry] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def approximate_bytes(self) -> int:
+        """Приблизительный объем памяти, занимаемый записями, в байтах"""
+        return self._bytes
+
+    async def set_state(self, bot: Bot, key: StorageKey, state: StateType = None):
+        entry = self._get_entry(key)
+        self._set_entry(key, state, entry.data if entry is not None else b'')
+
+    async def get_state(self, bot: Bot, key: StorageKey) -> Optional[str]:
+        entry = self._get_entry(key)
+
+        return entry.state if entry is not None else None
+
+    async def set_data(self, bot: Bot, key: StorageKey, data: Dict[str, Any]):
+        entry = self._get_entry(key)
+        self._set_entry(key, entry.state if entry is not None else None, orjson.dumps(data) if data else b'')
+
+    async def get_data(self, bot: Bot, key: StorageKey) -> Dict[str, Any]:
+        entry = self._get_entry(key)
+
+        return orjson.loads(entry.data) if entry is not None and entry.data else {}
+
+    async def get_record(self, key: StorageKey) -> Tuple[Optional[str], Dict[str, Any]]:
+        entry = self._get_entry(key)
+        if entry is None:
+            return None, {}
+
+        return entry.state, orjson.loads(entry.data) if entry.data else {}
+
+    async def set_record(self, key: StorageKey, state: StateType, data: Dict[str, Any]):
+        self._set_entry(key, state, orjson.dumps(data) if data else b'')
+
+    async def close(self):
+        pass
+
+    def _get_entry(self, key: StorageKey) -> Optional[StateEntry]:
+        self._remove_expired_entries()
+        storage_key = (key.bot_id, key.chat_id, key.user_id, key.destiny)
+        entry = self._entries.get(storage_key)
+        if entry is None:
+            return None
+
+        self._entries[storage_key] = entry = entry._replace(accessed_at=time.monotonic())
+        self._entries.move_to_end(storage_key)
+
+        return entry
+
+    def _set_entry(self, key: StorageKey, state: StateType, data: bytes):
+        state = state.state if isinstance(state, State) else state
+        storage_key = (key.bot_id, key.chat_id, key.user_id, key.destiny)
+        self._remove_entry(storage_key)
+        if state is None and not data:
+            return
+
+        entry = StateEntry(time.monotonic(), sys.intern(state) if state is not None else None, data)
+        self._entries[storage_key] = entry
+        self._bytes += self._get_entry_size(storage_key, entry)
+        while self._entries and (
+                len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._remove_entry(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove_expired_entries(self):
+        if self.state_ttl is None:
+            return
+
+        expired_at = time.monotonic() - self.state_ttl
+        while self._entries:
+            storage_key, entry = next(iter(self._entries.items()))
+            if entry.accessed_at > expired_at:
+                break
+            self._remove_entry(storage_key)
+            self.expirations += 1
+
+    def _remove_entry(self, storage_key: Tuple[int, int, int, str]):
+        entry = self._entries.pop(storage_key, None)
+        if entry is not None:
+            self._bytes -= self._get_entry_size(storage_key, entry)
+
+    @staticmethod
+    def _get_entry_size(storage_key: Tuple[int, int, int, str], entry: StateEntry) -> int:
+        # Строки состояний и идентификатор направления общие для всех записей и не учитываются
+        return (
+            ENTRY_OVERHEAD_BYTES
+            + sys.getsizeof(storage_key)
+            + sys.getsizeof(storage_key[1])
+            + sys.getsizeof(storage_key[2])
+            + sys.getsizeof(entry)
+            + sys.getsizeof(entry.accessed_at)
+            + sys.getsizeof(entry.data)
+        )
+
+
+class KeyLock:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.holders = 0
+
+
+class KeyLockEventIsolation(BaseEventIsolation):
+    """Изоляция событий блокировками по ключам FSM
+
+    События одного ключа обрабатываются последовательно, поэтому изменения состояния и данных, прочитанных до обработки
+    события, не перезаписывают изменения параллельного события. В отличие от SimpleEventIsolation, блокировка ключа
+    хранится, только пока ее удерживает или ожидает хотя бы одно событие, поэтому количество блокировок не растет с
+    количеством пользователей.
+    """
+
+    def __init__(self):
+        self._locks: Dict[StorageKey, KeyLock] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def lock(self, bot: Bot, key: StorageKey) -> AsyncGenerator[None, None]:
+        key_lock = self._locks.get(key)
+        if key_lock is None:
+            key_lock = self._locks[key] = KeyLock()
+        key_lock.holders += 1
+        try:
+            async with key_lock.lock:
+                yield
+        finally:
+            key_lock.holders -= 1
+            if not key_lock.holders:
+                del self._locks[key]
+
+    async def close(self):
+        self._locks.clear()
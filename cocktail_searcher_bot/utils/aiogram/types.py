@@ -1,10 +1,14 @@
 from enum import Enum
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 from aiogram.filters.callback_data import CallbackData
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 
+PAGINATION_BUTTONS_CACHE_MAXSIZE = 1024
+
+
 class PageLabelPattern(str, Enum):
     FIRST_PAGE = '« {}'
     PREVIOUS_PAGE = '‹ {}'
@@ -20,6 +24,9 @@ class PaginationCallback(CallbackData, prefix='pagination'):
 class InlinePaginationKeyboardMarkup(InlineKeyboardMarkup):
     """Класс разметки клавиатуры, реализующий страничную пагинацию
 
+    Кнопки пагинации запоминаются по количеству страниц и текущей странице, поэтому повторная разметка той же страницы
+    не создает кнопки и не упаковывает данные обратного вызова заново.
+
     Attributes:
         page_count: общее количество страниц пагинации
         current_page: текущая страница пагинации
@@ -41,6 +48,11 @@ class InlinePaginationKeyboardMarkup(InlineKeyboardMarkup):
 
     @staticmethod
     def _build_pagination_buttons(page_count: int, current_page: int) -> List[InlineKeyboardButton]:
+        return list(InlinePaginationKeyboardMarkup._get_pagination_buttons(page_count, current_page))
+
+    @staticmethod
+    @lru_cache(maxsize=PAGINATION_BUTTONS_CACHE_MAXSIZE)
+    def _get_pagination_buttons(page_count: int, current_page: int) -> Tuple[InlineKeyboardButton, ...]:
         buttons = []
         if 1 < page_count <= 5:
             buttons = [InlineKeyboardButton(text=str(i), callback_data=PaginationCallback(page=i).pack())
@@ -82,4 +94,4 @@ class InlinePaginationKeyboardMarkup(InlineKeyboardMarkup):
             if button.text == current_page_text:
                 button.text = PageLabelPattern.CURRENT_PAGE.value.format(current_page)
 
-        return buttons
+        return tuple(buttons)
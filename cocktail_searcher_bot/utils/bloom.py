@@ -0,0 +1,58 @@
+import hashlib
+import math
+from typing import Hashable, Iterator
+
+
+class BloomFilter:
+    """Фильтр Блума
+
+    Вероятностное множество: отсутствие ключа определяется точно, а наличие - с вероятностью ложноположительного
+    ответа не выше false_positive_rate, пока количество добавленных ключей не превышает capacity.
+
+    Attributes:
+        capacity: расчетное количество ключей фильтра
+        false_positive_rate: расчетная вероятность ложноположительного ответа
+        size: количество битов фильтра
+        hash_count: количество хэш-функций
+        count: количество добавленных ключей
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.size = max(8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return all(self._bits[position >> 3] & 1 << (position & 7) for position in self._positions(key))
+
+    def add(self, key: Hashable):
+        """Добавляет ключ в фильтр
+
+        Args:
+            key: ключ
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def clear(self):
+        """Удаляет все ключи фильтра"""
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        """Оценка вероятности ложноположительного ответа по доле установленных битов фильтра"""
+        set_bits = sum(bin(byte).count('1') for byte in self._bits)
+
+        return (set_bits / self.size) ** self.hash_count
+
+    def _positions(self, key: Hashable) -> Iterator[int]:
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], 'little')
+        second_hash = int.from_bytes(digest[8:], 'little') | 1
+
+        return ((first_hash + i * second_hash) % self.size for i in range(self.hash_count))
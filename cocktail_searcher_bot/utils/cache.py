@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterator, NamedTuple, Optional, Set
+
+from utils.bloom import BloomFilter
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    expires_at: float
+    stale_expires_at: float
+    value: Any
+
+
+class TTLCache:
+    """Асинхронный кэш с вытеснением записей по времени жизни (TTL) и давности использования (LRU)
+
+    Одновременные промахи по одному ключу приводят к единственному вызову фабрики значения, остальные вызывающие
+    ожидают его результат. Вычисление значения отменяется, если его перестали ожидать все вызывающие.
+
+    Запись с истекшим временем жизни остается устаревшей еще stale_ttl секунд: устаревшее значение возвращается
+    немедленно, а запись обновляется в фоне. Если фоновое обновление завершилось ошибкой, удовлетворяющей условию
+    is_stale_error, устаревшее значение продолжает возвращаться, иначе запись удаляется.
+
+    Attributes:
+        maxsize: максимальное количество записей кэша
+        ttl: время жизни записи кэша в секундах
+        stale_ttl: время в секундах, в течение которого запись возвращается после истечения ее времени жизни
+        is_stale_error: условие, при котором ошибка фонового обновления не приводит к удалению устаревшей записи
+        hits: количество попаданий в кэш
+        stale_hits: количество попаданий в кэш, вернувших устаревшее значение
+        misses: количество промахов кэша
+        refresh_failures: количество фоновых обновлений, завершившихся ошибкой
+    """
+
+    def __init__(self,
+                 maxsize: int,
+                 ttl: float,
+                 stale_ttl: float = 0.0,
+                 is_stale_error: Callable[[Exception], bool] = lambda ex: True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.is_stale_error = is_stale_error
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._pending = SingleFlight()
+        self._refreshes: Set[asyncio.Future] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def __iter__(self) -> Iterator[Hashable]:
+        now = time.monotonic()
+
+        return iter([key for key, entry in self._entries.items() if entry.expires_at > now])
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Получает актуальное значение из кэша без вызова фабрики
+
+        Args:
+            key: ключ записи
+            default: значение, возвращаемое в случае отсутствия актуальной записи
+        """
+        entry = self._get_entry(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return default
+
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Помещает значение в кэш, вытесняя наиболее давно использованные записи при превышении размера
+
+        Args:
+            key: ключ записи
+            value: значение записи
+            ttl: время жизни записи в секундах, по умолчанию - время жизни записей кэша
+        """
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = CacheEntry(expires_at, expires_at + self.stale_ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Удаляет запись из кэша. Выполняющееся вычисление значения записи не будет сохранено в кэш
+
+        Args:
+            key: ключ записи
+        """
+        self._entries.pop(key, None)
+        self._pending.forget(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+        """Удаляет из кэша записи, ключи которых удовлетворяют условию
+
+        Args:
+            predicate: условие удаления записи по ее ключу
+        """
+        for key in [key for key in (*self._entries, *self._pending) if predicate(key)]:
+            self.invalidate(key)
+
+    def clear(self):
+        """Удаляет все записи кэша и сбрасывает счетчики"""
+        self._entries.clear()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+
+    async def get_or_set(self,
+                         key: Hashable,
+                         factory: Callable[[], Awaitable[Any]],
+                         ttl_resolver: Optional[Callable[[Any], Optional[float]]] = None) -> Any:
+        """Получает значение из кэша, а в случае его отсутствия - вычисляет и сохраняет его
+
+        Args:
+            key: ключ записи
+            factory: фабрика, возвращающая корутину вычисления значения
+            ttl_resolver: функция, определяющая время жизни записи по вычисленному значению
+
+        Returns:
+            Значение записи кэша
+
+        Raises:
+            Любое исключение, возбужденное фабрикой значения
+        """
+        def on_success(result: Any):
+            self.set(key, result, ttl_resolver(result) if ttl_resolver else None)
+
+        entry = self._get_entry(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self.hits += 1
+                return entry.value
+
+            self.stale_hits += 1
+            if key not in self._pending:
+                refresh = asyncio.ensure_future(self._pending.run(key, factory, on_success))
+                refresh.add_done_callback(lambda done_refresh: self._on_refresh_done(key, entry, done_refresh))
+                self._refreshes.add(refresh)
+            return entry.value
+
+        self.misses += 1
+
+        return await self._pending.run(key, factory, on_success)
+
+    async def wait(self):
+        """Ожидает завершения выполняющихся фоновых обновлений записей"""
+        await asyncio.gather(*self._refreshes, return_exceptions=True)
+
+    def _get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.stale_expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _on_refresh_done(self, key: Hashable, entry: CacheEntry, refresh: asyncio.Future):
+        self._refreshes.discard(refresh)
+        if refresh.cancelled() or (exception := refresh.exception()) is None:
+            return
+
+        self.refresh_failures += 1
+        logger.debug('Cache entry refresh failed', exc_info=exception)
+        if not self.is_stale_error(exception) and self._entries.get(key) is entry:
+            del self._entries[key]
+
+
+class NegativeCache:
+    """Кэш ключей, для которых известно отсутствие данных (например, поисковых запросов без результатов)
+
+    Перед точным множеством ключей с коротким временем жизни стоит фильтр Блума: ключи, отсутствие которых
+    подтверждает фильтр, не требуют обращения к точному множеству. Фильтр рассчитан на удвоенное максимальное
+    количество ключей и перестраивается по актуальным ключам точного множества при достижении расчетного количества
+    ключей. После перестроения в фильтре не больше половины расчетного количества ключей, поэтому перестроения
+    происходят не чаще одного раза на capacity добавлений.
+
+    Attributes:
+        capacity: максимальное количество ключей
+        ttl: время жизни ключа в секундах
+        hits: количество ключей, найденных в кэше
+        rebuilds: количество перестроений фильтра Блума
+        filter_rejections: количество ключей, отсутствие которых подтвердил фильтр Блума
+        false_positives: количество ключей, пропущенных фильтром Блума, но отсутствующих в точном множестве
+    """
+
+    def __init__(self, capacity: int, ttl: float, false_positive_rate: float):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.filter_rejections = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+        self._filter = BloomFilter(2 * capacity, false_positive_rate)
+        self._entries = TTLCache(maxsize=capacity, ttl=ttl)
+
+    def __contains__(self, key: Hashable) -> bool:
+        if key not in self._filter:
+            self.filter_rejections += 1
+            return False
+
+        if key not in self._entries:
+            self.false_positives += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def add(self, key: Hashable):
+        """Добавляет ключ в кэш
+
+        Args:
+            key: ключ
+        """
+        self._entries.set(key, True)
+        if self._filter.count < self._filter.capacity:
+            self._filter.add(key)
+            return
+
+        self._filter.clear()
+        for live_key in self._entries:
+            self._filter.add(live_key)
+        self.rebuilds += 1
+
+    def invalidate(self, key: Hashable):
+        """Удаляет ключ из кэша
+
+        Args:
+            key: ключ
+        """
+        self._entries.invalidate(key)
+
+    def clear(self):
+        """Удаляет все ключи кэша и сбрасывает счетчики"""
+        self._filter.clear()
+        self._entries.clear()
+        self.hits = 0
+        self.filter_rejections = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Наблюдаемая доля ложноположительных ответов фильтра Блума среди ключей, отсутствующих в кэше"""
+        negatives = self.filter_rejections + self.false_positives
+
+        return self.false_positives / negatives if negatives else 0.0
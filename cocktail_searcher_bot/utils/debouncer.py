@@ -0,0 +1,43 @@
+import asyncio
+from typing import Dict, Hashable
+
+
+class Debouncer:
+    """Подавитель устаревших вызовов
+
+    Вызов ожидает delay секунд и выполняется, только если за это время не поступил более новый вызов с тем же ключом.
+    При нулевой задержке вызов лишь уступает управление циклу событий и подавляется, только если более новый вызов с
+    тем же ключом уже ожидает выполнения.
+
+    Attributes:
+        delay: время ожидания более нового вызова в секундах
+        superseded: количество вызовов, подавленных более новыми вызовами
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.superseded = 0
+        self._generations: Dict[Hashable, int] = {}
+
+    async def wait(self, key: Hashable) -> bool:
+        """Ожидает более новый вызов с тем же ключом
+
+        Args:
+            key: ключ вызова
+
+        Returns:
+            Признак того, что вызов не был подавлен более новым вызовом и должен быть выполнен
+        """
+        generation = self._generations[key] = self._generations.get(key, 0) + 1
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            is_latest = self._generations.get(key) == generation
+            if is_latest:
+                del self._generations[key]
+
+        if not is_latest:
+            self.superseded += 1
+            return False
+
+        return True
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Планировщик фоновой спекулятивной предзагрузки данных
+
+    Задачи предзагрузки группируются по областям (например, по поисковому запросу). Новое планирование в области
+    отменяет задачи этой области, которые больше не нужны. Задачи сверх бюджета не ставятся в очередь, а
+    отбрасываются.
+
+    Attributes:
+        max_tasks: максимальное количество одновременно выполняемых задач предзагрузки
+        scheduled: количество запущенных задач предзагрузки
+        dropped: количество задач, отброшенных из-за исчерпания бюджета
+        cancelled: количество задач, отмененных из-за перехода пользователя к другим данным
+    """
+
+    def __init__(self, max_tasks: int):
+        self.max_tasks = max_tasks
+        self.scheduled = 0
+        self.dropped = 0
+        self.cancelled = 0
+        self._tasks: Dict[Hashable, Dict[Hashable, asyncio.Task]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(scope_tasks) for scope_tasks in self._tasks.values())
+
+    def schedule(self, scope: Hashable, factories: Dict[Hashable, Callable[[], Awaitable]]):
+        """Планирует задачи предзагрузки области, отменяя ее задачи, отсутствующие среди новых
+
+        Args:
+            scope: область предзагрузки
+            factories: фабрики корутин предзагрузки, сгруппированные по ключам задач
+        """
+        scope_tasks = self._tasks.setdefault(scope, {})
+        for key in [key for key in scope_tasks if key not in factories]:
+            scope_tasks.pop(key).cancel()
+            self.cancelled += 1
+
+        for key, factory in factories.items():
+            if key in scope_tasks:
+                continue
+            if len(self) >= self.max_tasks:
+                self.dropped += 1
+                continue
+
+            task = asyncio.ensure_future(self._run(factory))
+            task.add_done_callback(lambda done_task, task_key=key: self._on_task_done(scope, task_key, done_task))
+            scope_tasks[key] = task
+            self.scheduled += 1
+
+        if not scope_tasks:
+            del self._tasks[scope]
+
+    async def wait(self):
+        """Ожидает завершения всех запущенных задач предзагрузки"""
+        tasks = [task for scope_tasks in self._tasks.values() for task in scope_tasks.values()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cancel(self):
+        """Отменяет все запущенные задачи предзагрузки"""
+        for scope_tasks in self._tasks.values():
+            for task in scope_tasks.values():
+                task.cancel()
+        self._tasks.clear()
+
+    @staticmethod
+    async def _run(factory: Callable[[], Awaitable]):
+        try:
+            await factory()
+        except Exception:
+            logger.debug('Prefetch task failed', exc_info=True)
+
+    def _on_task_done(self, scope: Hashable, key: Hashable, task: asyncio.Task):
+        scope_tasks = self._tasks.get(scope)
+        if scope_tasks is None or scope_tasks.get(key) is not task:
+            return
+
+        del scope_tasks[key]
+        if not scope_tasks:
+            del self._tasks[scope]
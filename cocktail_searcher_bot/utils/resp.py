@@ -0,0 +1,207 @@
+import asyncio
+from typing import Any, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+RespArgument = Union[bytes, str, int, float]
+
+CRLF = b'\r\n'
+
+
+class RespError(Exception):
+    """Ошибка, возвращенная сервером в ответ на команду"""
+
+
+class RespConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def execute(self, commands: Sequence[Sequence[RespArgument]]) -> List[Any]:
+        self.writer.write(b''.join(encode_command(command) for command in commands))
+        await self.writer.drain()
+
+        return [await read_reply(self.reader) for _ in commands]
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class RespClient:
+    """Асинхронный клиент хранилища ключ-значение, совместимого с протоколом Redis (RESP2)
+
+    Соединения открываются по требованию и переиспользуются, одновременно открыто не более max_connections соединений.
+    Соединение, на котором произошла ошибка ввода-вывода, закрывается.
+
+    Attributes:
+        host: хост сервера
+        port: порт сервера
+        db: номер базы данных
+        password: пароль сервера
+        max_connections: максимальное количество одновременно открытых соединений
+        timeout: таймаут подключения и выполнения команд в секундах
+    """
+
+    def __init__(self,
+                 host: str = 'localhost',
+                 port: int = 6379,
+                 db: int = 0,
+                 password: Optional[str] = None,
+                 max_connections: int = 10,
+                 timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle_connections: List[RespConnection] = []
+        self._connections_semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'RespClient':
+        """Создает клиент по URL-адресу вида redis://[:password@]host[:port][/db]
+
+        Args:
+            url: URL-адрес сервера
+            **kwargs: параметры клиента
+        """
+        parsed_url = urlparse(url)
+        if parsed_url.scheme != 'redis':
+            raise ValueError(f'Unsupported URL scheme {parsed_url.scheme!r}')
+
+        return cls(
+            host=parsed_url.hostname or 'localhost',
+            port=parsed_url.port or 6379,
+            db=int(parsed_url.path.lstrip('/') or 0),
+            password=parsed_url.password,
+            **kwargs
+        )
+
+    async def execute(self, *command: RespArgument) -> Any:
+        """Выполняет команду
+
+        Args:
+            *command: имя и аргументы команды
+
+        Returns:
+            Ответ сервера
+
+        Raises:
+            RespError: возбуждаемое исключение в случае ошибки выполнения команды
+            ConnectionError: возбуждаемое исключение в случае ошибки соединения
+        """
+        reply, = await self.pipeline([command])
+
+        return reply
+
+    async def pipeline(self, commands: Sequence[Sequence[RespArgument]]) -> List[Any]:
+        """Выполняет команды за один обмен с сервером
+
+        Args:
+            commands: команды с аргументами
+
+        Returns:
+            Ответы сервера в порядке команд
+
+        Raises:
+            RespError: возбуждаемое исключение в случае ошибки выполнения одной из команд. Остальные команды
+                выполняются
+            ConnectionError: возбуждаемое исключение в случае ошибки соединения
+        """
+        if not commands:
+            return []
+
+        if self._connections_semaphore is None:
+            self._connections_semaphore = asyncio.Semaphore(self.max_connections)
+        async with self._connections_semaphore:
+            connection = self._idle_connections.pop() if self._idle_connections else await self._connect()
+            try:
+                replies = await asyncio.wait_for(connection.execute(commands), self.timeout)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as ex:
+                await connection.close()
+                raise ConnectionError(f'The connection to {self.host}:{self.port} failed') from ex
+            except BaseException:
+                await connection.close()
+                raise
+            self._idle_connections.append(connection)
+
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+
+        return replies
+
+    async def close(self):
+        """Закрывает открытые соединения"""
+        connections, self._idle_connections = self._idle_connections, []
+        for connection in connections:
+            await connection.close()
+
+    async def _connect(self) -> RespConnection:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        except (OSError, asyncio.TimeoutError) as ex:
+            raise ConnectionError(f'Failed to connect to {self.host}:{self.port}') from ex
+
+        connection = RespConnection(reader, writer)
+        handshake: List[Tuple[RespArgument, ...]] = []
+        if self.password:
+            handshake.append(('AUTH', self.password))
+        if self.db:
+            handshake.append(('SELECT', self.db))
+        if handshake:
+            for reply in await connection.execute(handshake):
+                if isinstance(reply, RespError):
+                    await connection.close()
+                    raise reply
+
+        return connection
+
+
+def encode_command(command: Sequence[RespArgument]) -> bytes:
+    """Кодирует команду массивом строк RESP
+
+    Args:
+        command: имя и аргументы команды
+    """
+    parts = [b'*%d\r\n' % len(command)]
+    for argument in command:
+        if isinstance(argument, str):
+            argument = argument.encode()
+        elif not isinstance(argument, bytes):
+            argument = repr(argument).encode()
+        parts.append(b'$%d\r\n%s\r\n' % (len(argument), argument))
+
+    return b''.join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Читает ответ RESP. Ошибки сервера возвращаются объектами RespError
+
+    Args:
+        reader: поток чтения соединения
+    """
+    line = await reader.readuntil(CRLF)
+    reply_type, payload = line[:1], line[1:-2]
+    if reply_type == b'+':
+        return payload.decode()
+    if reply_type == b'-':
+        return RespError(payload.decode())
+    if reply_type == b':':
+        return int(payload)
+    if reply_type == b'$':
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if reply_type == b'*':
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+
+    raise ConnectionError(f'Unexpected RESP reply type {reply_type!r}')
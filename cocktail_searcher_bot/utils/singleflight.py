@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Группа вызовов, разделяющих между собой единственное выполнение по ключу
+
+    Одновременные вызовы с одним ключом ожидают результат (или исключение) первого из них. Выполнение отменяется,
+    если его перестали ожидать все вызывающие.
+
+    Attributes:
+        executions: количество запущенных выполнений
+        shared: количество вызовов, присоединившихся к уже запущенному выполнению
+    """
+
+    def __init__(self):
+        self.executions = 0
+        self.shared = 0
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    def __iter__(self):
+        return iter(list(self._tasks))
+
+    def forget(self, key: Hashable):
+        """Отвязывает выполняющийся вызов от ключа: его результат не будет передан в on_success, а новые вызовы
+        запустят новое выполнение
+
+        Args:
+            key: ключ выполнения
+        """
+        self._tasks.pop(key, None)
+
+    async def run(self,
+                  key: Hashable,
+                  factory: Callable[[], Awaitable[Any]],
+                  on_success: Optional[Callable[[Any], None]] = None) -> Any:
+        """Выполняет корутину или присоединяется к уже запущенному выполнению с тем же ключом
+
+        Args:
+            key: ключ выполнения
+            factory: фабрика, возвращающая выполняемую корутину
+            on_success: функция, вызываемая с результатом успешного выполнения, если ключ не был отвязан
+
+        Returns:
+            Результат выполнения
+
+        Raises:
+            Любое исключение, возбужденное выполняемой корутиной
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done_task: self._on_done(key, done_task, on_success))
+            self.executions += 1
+        else:
+            self.shared += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                # Отменяемое выполнение отвязывается от ключа сразу, чтобы новые вызовы не присоединялись к нему
+                if self._tasks.get(key) is task:
+                    del self._tasks[key]
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _on_done(self, key: Hashable, task: asyncio.Task, on_success: Optional[Callable[[Any], None]]):
+        if self._tasks.get(key) is not task:
+            return
+
+        del self._tasks[key]
+        if task.cancelled():
+            return
+        if task.exception() is None and on_success is not None:
+            on_success(task.result())